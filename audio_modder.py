@@ -1,21 +1,23 @@
-import json
+import mmap
 import numpy
 import os
-import platform
 import pyaudio
+import io
 import subprocess
-import struct
+import tempfile
+import threading
+import time
 import tkinter
 import shutil
+import struct
 import wave
-import sys
 import pathlib
-import xml.etree.ElementTree as etree
+
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from functools import partial
 from functools import cmp_to_key
-from itertools import takewhile
-from math import ceil
 from tkinterdnd2 import *
 from tkinter import *
 from tkinter import ttk
@@ -30,78 +32,20 @@ from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 import config as cfg
+import core
 import db
-import log
 import fileutil
 
+from core import *
 from log import logger
 
 # constants
-MUSIC_TRACK = 11
-SOUND = 2
-BANK = 0
-PREFETCH_STREAM = 1
-STREAM = 2
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
-VORBIS = 0x00040001
-REV_AUDIO = 0x01A01052
-WWISE_BANK = 6006249203084351385
-WWISE_DEP = 12624162998411505776
-WWISE_STREAM = 5785811756662211598
-STRING = 979299457696010195
-LANGUAGE_MAPPING = ({
-    "English (US)" : 0x03f97b57,
-    "English (UK)" : 0x6f4515cb,
-    "Français" : 4271961631,
-    "Português 1": 1861586415,
-    "Português 2": 1244441033,
-    "Polski": 260593578,
-    "日本語": 2427891497,
-    "中文（繁體）": 2663028010,
-    "中文（简体）": 2189905090,
-    "Nederlands": 291057413,
-    "한국어": 3151476177,
-    "Español 1": 830498882,
-    "Español 2": 3854981686,
-    "Deutsch": 3124347884,
-    "Italiano": 3808107213,
-    "Русский": 3317373165
-})
-
-# constants (set once on runtime)
-DIR = os.path.dirname(__file__)
-if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-    DIR = os.path.dirname(sys.argv[0])
-FFMPEG = ""
-VGMSTREAM = ""
-GAME_FILE_LOCATION = ""
-WWISE_CLI = ""
-WWISE_VERSION = ""
-DEFAULT_WWISE_PROJECT = os.path.join(DIR, "AudioConversionTemplate/AudioConversionTemplate.wproj") 
-DEFAULT_CONVERSION_SETTING = "Vorbis Quality High"
-SYSTEM = ""
-CACHE = os.path.join(DIR, ".cache")
 
 # global variables
-language = 0
 num_segments = 0
 
-def language_lookup(lang_string):
-    try:
-        return LANGUAGE_MAPPING[lang_string]
-    except:
-        return int(lang_string)
-    
-def strip_patch_index(filename):
-    split = filename.split(".")
-    for n in range(len(split)):
-        if "patch_" in split[n]:
-            del split[n]
-            break
-    filename = ".".join(split)
-    return filename
-    
 class WorkspaceEventHandler(FileSystemEventHandler):
 
     # TO-DO: Change get_item_by_path to return all matches, not just the first
@@ -201,2738 +145,870 @@ def list_files_recursive(path="."):
         return files
 
 
-class MemoryStream:
-    '''
-    Modified from https://github.com/kboykboy2/io_scene_helldivers2 with permission from kboykboy
-    '''
-    def __init__(self, Data=b"", io_mode = "read"):
-        self.location = 0
-        self.data = bytearray(Data)
-        self.io_mode = io_mode
-        self.endian = "<"
+class PCMData:
+    """
+    Decoded interleaved PCM and its format. `data` is bytes or a memoryview 
+    over a memory mapped cache file.
+    """
 
-    def open(self, Data, io_mode = "read"): # Open Stream
-        self.data = bytearray(Data)
-        self.io_mode = io_mode
+    def __init__(self, data, channels, sample_width, frame_rate):
+        self.data = data
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+        self.frame_size = channels * sample_width
 
-    def set_read_mode(self):
-        self.io_mode = "read"
+class PCMReader:
+    """
+    Play back already decoded PCM through the same interface as 
+    StreamDecoder.
+    """
 
-    def set_write_mode(self):
-        self.io_mode = "write"
+    def __init__(self, pcm: PCMData):
+        self.pcm = pcm
+        self.channels = pcm.channels
+        self.sample_width = pcm.sample_width
+        self.frame_rate = pcm.frame_rate
+        self.frame_size = pcm.frame_size
+        self.max_frames = len(pcm.data) // pcm.frame_size
+        self.position = 0
 
-    def is_reading(self):
-        return self.io_mode == "read"
+    def read(self, frame_count, pad=True):
+        """
+        @return (tuple[bytes, bool]): up to `frame_count` frames and whether 
+        the stream is exhausted
+        """
+        end = self.position + frame_count * self.frame_size
+        data = bytes(self.pcm.data[self.position:end])
+        self.position += len(data)
+        return data, self.position >= len(self.pcm.data)
 
-    def is_writing(self):
-        return self.io_mode == "write"
+    def wait(self, timeout):
+        """
+        @return (bool): True, every frame is available
+        """
+        return True
 
-    def seek(self, location): # Go To Position In Stream
-        self.location = location
-        if self.location > len(self.data):
-            missing_bytes = self.location - len(self.data)
-            self.data += bytearray(missing_bytes)
+    def seek(self, frame):
+        """
+        @return (int): the frame actually seeked to
+        """
+        frame = min(max(0, frame), self.max_frames)
+        self.position = frame * self.frame_size
+        return frame
 
-    def tell(self): # Get Position In Stream
-        return self.location
+    def close(self):
+        pass
 
-    def read(self, length=-1): # read Bytes From Stream
-        if length == -1:
-            length = len(self.data) - self.location
-        if self.location + length > len(self.data):
-            raise Exception("reading past end of stream")
+class PCMCache:
+    """
+    Decoded PCM keyed by the content hash of the wem it was decoded from, 
+    so swapping or re-importing audio can never replay stale data.
 
-        newData = self.data[self.location:self.location+length]
-        self.location += length
-        return bytearray(newData)
-        
-    def advance(self, offset):
-        self.location += offset
-        if self.location < 0:
-            self.location = 0
-        if self.location > len(self.data):
-            missing_bytes = self.location - len(self.data)
-            self.data += bytearray(missing_bytes)
-
-    def write(self, bytes): # Write Bytes To Stream
-        length = len(bytes)
-        if self.location + length > len(self.data):
-            missing_bytes = (self.location + length) - len(self.data)
-            self.data += bytearray(missing_bytes)
-        self.data[self.location:self.location+length] = bytearray(bytes)
-        self.location += length
-
-    def read_format(self, format, size):
-        format = self.endian+format
-        return struct.unpack(format, self.read(size))[0]
-        
-    def bytes(self, value, size = -1):
-        if size == -1:
-            size = len(value)
-        if len(value) != size:
-            value = bytearray(size)
-
-        if self.is_reading():
-            return bytearray(self.read(size))
-        elif self.is_writing():
-            self.write(value)
-            return bytearray(value)
-        return value
-        
-    def int8_read(self):
-        return self.read_format('b', 1)
+    Recently played entries stay in memory (LRU within `memory_budget` 
+    bytes). Every entry is also written to `folder` and memory mapped on a 
+    later miss; the least recently used files are removed once the folder 
+    exceeds `disk_budget` bytes.
+    """
 
-    def uint8_read(self):
-        return self.read_format('B', 1)
+    header = struct.Struct("<4sHHI")
+    magic = b"PCM1"
+    memory_budget = 256 << 20
+    disk_budget = 2 << 30
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.entries: OrderedDict[bytes, PCMData] = OrderedDict()
+        self.memory_used = 0
+        self.lock = threading.Lock()
+
+    def get_path(self, key: bytes):
+        return os.path.join(self.folder, f"{key.hex()}.pcm")
+
+    def contains(self, key: bytes):
+        with self.lock:
+            if key in self.entries:
+                return True
+        return os.path.exists(self.get_path(key))
+
+    def get(self, key: bytes) -> PCMData | None:
+        with self.lock:
+            pcm = self.entries.get(key)
+            if pcm is not None:
+                self.entries.move_to_end(key)
+                return pcm
+        pcm = self.read_file(key)
+        if pcm is not None:
+            self.remember(key, pcm)
+        return pcm
+
+    def put(self, key: bytes, pcm: PCMData):
+        self.remember(key, pcm)
+        self.write_file(key, pcm)
+
+    def remember(self, key: bytes, pcm: PCMData):
+        size = len(pcm.data)
+        if size > self.memory_budget:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.memory_used -= len(old.data)
+            self.entries[key] = pcm
+            self.memory_used += size
+            while self.memory_used > self.memory_budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.memory_used -= len(evicted.data)
+
+    def read_file(self, key: bytes) -> PCMData | None:
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if len(mapping) < self.header.size:
+            return None
+        magic, channels, sample_width, frame_rate = self.header.unpack_from(mapping)
+        if magic != self.magic or channels == 0 or sample_width == 0:
+            return None
+        return PCMData(memoryview(mapping)[self.header.size:], 
+                       channels, sample_width, frame_rate)
 
-    def int16_read(self):
-        return self.read_format('h', 2)
+    def write_file(self, key: bytes, pcm: PCMData):
+        path = self.get_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(self.header.pack(self.magic, pcm.channels, 
+                                         pcm.sample_width, pcm.frame_rate))
+                f.write(pcm.data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache decoded audio: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.trim_disk()
 
-    def uint16_read(self):
-        return self.read_format('H', 2)
+    def trim_disk(self):
+        try:
+            files = []
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith(".pcm"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
 
-    def int32_read(self):
-        return self.read_format('i', 4)
+class PCMPrefetcher:
+    """
+    Decode wems into a PCMCache on a small worker pool ahead of playback. 
+    Every call to `prefetch` supersedes the previous one: queued jobs are 
+    cancelled and vgmstream processes decoding audio that is no longer 
+    wanted are killed.
+    """
 
-    def uint32_read(self):
-        return self.read_format('I', 4)
+    def __init__(self, pcm_cache: PCMCache, workers: int = 2):
+        self.pcm_cache = pcm_cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, 
+                                           thread_name_prefix="prefetch")
+        self.futures = []
+        self.processes: dict[subprocess.Popen, AudioSource] = {}
+        self.pending: set[AudioSource] = set()
+        self.wanted: set[AudioSource] = set()
+        # re-entrant: cancelling a future runs its done callback right away
+        self.lock = threading.RLock()
+
+    def prefetch(self, sources):
+        """
+        @param sources (list[AudioSource]): sources to decode in priority 
+        order. Hashing and the cache lookup happen on the workers, so this 
+        is cheap enough to call on every selection change.
+        """
+        with self.lock:
+            self.wanted = set(sources)
+            for future in self.futures:
+                future.cancel()
+            for process, source in self.processes.items():
+                if source not in self.wanted and process.poll() is None:
+                    process.kill()
+            self.futures = []
+            for source in sources:
+                if source in self.pending:
+                    continue
+                self.pending.add(source)
+                future = self.executor.submit(self.decode, source)
+                future.add_done_callback(partial(self.discard_pending, source))
+                self.futures.append(future)
 
-    def int64_read(self):
-        return self.read_format('q', 8)
+    def discard_pending(self, source, _):
+        with self.lock:
+            self.pending.discard(source)
 
-    def uint64_read(self):
-        return self.read_format('Q', 8)
-        
-def pad_to_16_byte_align(data):
-    b = bytearray(data)
-    l = len(b)
-    new_len = ceil(l/16)*16
-    return b + bytearray(new_len-l)
-    
-def _16_byte_align(addr):
-    return ceil(addr/16)*16
-    
-def bytes_to_long(bytes):
-    assert len(bytes) == 8
-    return sum((b << (k * 8) for k, b in enumerate(bytes)))
+    def decode(self, source: AudioSource):
+        if source not in self.wanted or not os.path.exists(core.VGMSTREAM):
+            return
+        key = source.get_content_hash()
+        if self.pcm_cache.contains(key):
+            return
+        fd, wem_file = tempfile.mkstemp(suffix=".wem", dir=CACHE)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(source.get_data())
+            with self.lock:
+                if source not in self.wanted:
+                    return
+                process = subprocess.Popen(
+                    [core.VGMSTREAM, "-p", wem_file],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+                self.processes[process] = source
+            try:
+                output, _ = process.communicate()
+            finally:
+                with self.lock:
+                    del self.processes[process]
+            if process.returncode != 0:
+                return
+            with wave.open(io.BytesIO(output)) as wave_file:
+                pcm = PCMData(wave_file.readframes(wave_file.getnframes()),
+                              wave_file.getnchannels(),
+                              wave_file.getsampwidth(),
+                              wave_file.getframerate())
+            self.pcm_cache.put(key, pcm)
+        except (OSError, wave.Error, EOFError) as e:
+            logger.warning(f"Failed to pre-decode audio for playback: {e}")
+        finally:
+            try:
+                os.remove(wem_file)
+            except OSError:
+                pass
 
-def murmur64_hash(data, seed = 0):
+    def shutdown(self):
+        self.prefetch([])
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
-    m = 0xc6a4a7935bd1e995
-    r = 47
+class StreamDecoder:
+    """
+    Decode a wem with vgmstream on a background thread and hand out PCM 
+    frames as soon as they arrive, instead of waiting for a full .wav on disk.
 
-    MASK = 2 ** 64 - 1
+    vgmstream needs a seekable input, so the (compressed) wem is still 
+    written to CACHE; the decoded wav is read from vgmstream's stdout.
+    """
 
-    data_as_bytes = bytearray(data)
+    chunk_size = 1 << 14
+    max_buffered = 1 << 22
+    max_kept = 1 << 29
 
-    h = seed ^ ((m * len(data_as_bytes)) & MASK)
+    def __init__(self, sound_data, on_complete=None):
+        """
+        @param on_complete (Callable[[PCMData], None] | None): called from the 
+        decode thread with the full PCM once vgmstream finished successfully
+        """
+        self.on_complete = on_complete
+        self.kept = []
+        self.kept_size = 0
+        self.buffer = deque()
+        self.buffered = 0
+        self.finished = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+        fd, self.wem_file = tempfile.mkstemp(suffix=".wem", dir=CACHE)
+        with os.fdopen(fd, "wb") as f:
+            f.write(sound_data)
+        self.process = subprocess.Popen(
+            [core.VGMSTREAM, "-p", self.wem_file],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            self.wave_file = wave.open(self.process.stdout)
+        except (wave.Error, EOFError):
+            self.close()
+            self.cleanup()
+            raise
+
+        self.channels = self.wave_file.getnchannels()
+        self.sample_width = self.wave_file.getsampwidth()
+        self.frame_rate = self.wave_file.getframerate()
+        self.max_frames = self.wave_file.getnframes()
+        self.frame_size = self.channels * self.sample_width
 
-    off = int(len(data_as_bytes)/8)*8
-    for ll in range(0, off, 8):
-        k = bytes_to_long(data_as_bytes[ll:ll + 8])
-        k = (k * m) & MASK
-        k = k ^ ((k >> r) & MASK)
-        k = (k * m) & MASK
-        h = (h ^ k)
-        h = (h * m) & MASK
+        self.thread = threading.Thread(target=self.decode, daemon=True)
+        self.thread.start()
 
-    l = len(data_as_bytes) & 7
+    def decode(self):
+        frames_per_chunk = max(1, self.chunk_size // self.frame_size)
+        complete = False
+        try:
+            while True:
+                data = self.wave_file.readframes(frames_per_chunk)
+                if not data:
+                    complete = True
+                    break
+                with self.condition:
+                    while self.buffered >= self.max_buffered and not self.closed:
+                        self.condition.wait()
+                    if self.closed:
+                        break
+                    self.buffer.append(data)
+                    self.buffered += len(data)
+                if self.on_complete is not None:
+                    self.keep(data)
+        except (OSError, ValueError, EOFError):
+            pass
+        finally:
+            with self.condition:
+                self.finished = True
+                self.condition.notify_all()
+            self.cleanup()
+        if complete and not self.closed and self.process.returncode == 0 \
+           and self.on_complete is not None:
+            self.on_complete(PCMData(b"".join(self.kept), self.channels, 
+                                     self.sample_width, self.frame_rate))
+        self.kept = []
+
+    def keep(self, data):
+        """
+        Hold on to decoded chunks for `on_complete`. Tracks beyond `max_kept` 
+        bytes are not worth caching and give up.
+        """
+        if self.kept_size + len(data) > self.max_kept:
+            self.on_complete = None
+            self.kept = []
+            return
+        self.kept.append(data)
+        self.kept_size += len(data)
 
-    if l >= 7:
-        h = (h ^ (data_as_bytes[off+6] << 48))
+    def cleanup(self):
+        self.process.stdout.close()
+        self.process.wait()
+        try:
+            os.remove(self.wem_file)
+        except OSError:
+            pass
 
-    if l >= 6:
-        h = (h ^ (data_as_bytes[off+5] << 40))
+    def read(self, frame_count, pad=True):
+        """
+        Never blocks, so it is safe to call from the output stream callback.
 
-    if l >= 5:
-        h = (h ^ (data_as_bytes[off+4] << 32))
+        @param pad (bool): pad an underrun with silence up to `frame_count` 
+        frames. Without padding only the frames decoded so far are returned.
+        @return (tuple[bytes, bool]): up to `frame_count` frames and whether 
+        the stream is exhausted
+        """
+        size = frame_count * self.frame_size
+        out = bytearray()
+        with self.condition:
+            while len(out) < size and self.buffer:
+                chunk = self.buffer.popleft()
+                need = size - len(out)
+                if len(chunk) > need:
+                    self.buffer.appendleft(chunk[need:])
+                    chunk = chunk[:need]
+                out += chunk
+                self.buffered -= len(chunk)
+            exhausted = self.finished and not self.buffer
+            self.condition.notify_all()
+        if pad and not exhausted and len(out) < size:
+            out += bytes(size - len(out))
+        return bytes(out), exhausted
+
+    def wait(self, timeout):
+        """
+        Block until decoded frames are available or decoding stopped.
 
-    if l >= 4:
-        h = (h ^ (data_as_bytes[off+3] << 24))
+        @return (bool): False if nothing arrived within `timeout` seconds
+        """
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.buffered > 0 or self.finished, timeout=timeout
+            )
 
-    if l >= 3:
-        h = (h ^ (data_as_bytes[off+2] << 16))
+    def close(self):
+        """
+        Stop decoding. The decode thread drains the killed process and 
+        removes the temporary wem on its own.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.process.poll() is None:
+            self.process.kill()
 
-    if l >= 2:
-        h = (h ^ (data_as_bytes[off+1] << 8))
+class Voice:
+    """
+    One sound in the Mixer. Reads a PCMReader or StreamDecoder, downmixes 
+    it to stereo and resamples it to the mixer rate.
+
+    Times are in seconds on the voice's own timeline: the source becomes 
+    audible after `delay`, starting `begin` seconds into the source and 
+    stopping at `end` (or the end of the source). A negative delay means the 
+    source started before the timeline did, so that much more of its start 
+    is skipped.
+
+    Rendering never blocks on a streaming source; an underrun plays silence.
+    Voices that must stay aligned with others are pre-buffered (see 
+    prebuffer) before they join the mixer.
+    """
 
-    if l >= 1:
-        h = (h ^ data_as_bytes[off])
-        h = (h * m) & MASK
+    def __init__(self, source, matrix, rate, delay=0.0, begin=0.0, end=None, 
+                 on_finish=None):
+        if delay < 0:
+            begin -= delay
+            delay = 0.0
+        self.source = source
+        self.delay = delay
+        self.matrix = matrix
+        self.rate = rate
+        self.step = source.frame_rate / rate
+        self.begin_frame = max(0, round(begin * source.frame_rate))
+        self.end_frame = None if end is None else max(self.begin_frame, round(end * source.frame_rate))
+        self.on_finish = on_finish
+        self.finished = False
+        self.exhausted = False
+        self.position = 0
+        if isinstance(source, PCMReader):
+            source.seek(self.begin_frame)
+            self.position = self.begin_frame
+        # source frames before skip_to are read and dropped
+        self.skip_to = self.begin_frame
+        self.delay_frames = round(delay * rate)
+        self.tail = numpy.zeros((0, 2), dtype=numpy.float32)
+        self.phase = 0.0
+
+    def fill(self, frames, pad=True):
+        """
+        Read from the source until `frames` stereo frames are buffered or the 
+        source (or its end trim) is exhausted.
 
-    h = h ^ ((h >> r) & MASK)
-    h = (h * m) & MASK
-    h = h ^ ((h >> r) & MASK)
+        @param pad (bool): let a streaming source pad an underrun with 
+        silence. Without padding, stop at the first underrun instead.
+        """
+        parts = [self.tail]
+        buffered = len(self.tail)
+        while buffered < frames and not self.exhausted:
+            data, exhausted = self.source.read(max(frames - buffered, 256), pad)
+            if len(data) == 0 and not exhausted:
+                break
+            samples = pcm_to_float(data, self.source.sample_width, self.source.channels)
+            first = self.position
+            self.position += len(samples)
+            lo = min(len(samples), max(0, self.skip_to - first))
+            hi = len(samples)
+            if self.end_frame is not None:
+                hi = max(lo, min(hi, self.end_frame - first))
+                exhausted = exhausted or self.position >= self.end_frame
+            if hi > lo:
+                parts.append(samples[lo:hi] @ self.matrix)
+                buffered += hi - lo
+            self.exhausted = exhausted
+        if len(parts) > 1:
+            self.tail = numpy.concatenate(parts)
+
+    def prebuffer(self, frames, timeout):
+        """
+        Decode up to the first audible source frame plus `frames` more before
+        the voice joins the mixer, so the output callback never has to pad 
+        the start of the voice with silence. Runs off the Tk thread and the 
+        output callback.
 
-    return h
+        @param timeout (float): seconds to wait for the decoder in total
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.fill(frames, pad=False)
+            if self.exhausted or len(self.tail) >= frames:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.source.wait(remaining):
+                return
 
-class Subscriber:
-    def __init__(self):
-        pass
-        
-    def update(self, content):
-        pass
-        
-    def raise_modified(self):
-        pass
-        
-    def lower_modified(self):
-        pass
-        
-class AudioSource:
+    def seek(self, seconds):
+        """
+        Reposition the voice to `seconds` on its timeline. Decoded PCM can be
+        seeked anywhere. A source still streaming from vgmstream only moves
+        forward: frames it already handed out are gone.
 
-    def __init__(self):
-        self.data = b""
-        self.size = 0
-        self.resource_id = 0
-        self.short_id = 0
-        self.modified = False
-        self.data_OLD = b""
-        self.subscribers = set()
-        self.stream_type = 0
-        self.track_info = None
-        
-    def set_data(self, data, notify_subscribers=True, set_modified=True):
-        if not self.modified and set_modified:
-            self.data_OLD = self.data
-        self.data = data
-        self.size = len(self.data)
-        if notify_subscribers:
-            for item in self.subscribers:
-                item.update(self)
-                if not self.modified:
-                    item.raise_modified()
-        if set_modified:
-            self.modified = True
-            
-    def get_id(self):
-        if self.stream_type == BANK:
-            return self.get_short_id()
+        @return (bool): False if the voice cannot reach `seconds`
+        """
+        offset = seconds - self.delay
+        frame = self.begin_frame + max(0, round(offset * self.source.frame_rate))
+        if self.end_frame is not None:
+            frame = min(frame, self.end_frame)
+        if isinstance(self.source, PCMReader):
+            self.position = self.skip_to = self.source.seek(frame)
+            self.tail = self.tail[:0]
+            self.exhausted = False
         else:
-            return self.get_resource_id()
-            
-    def is_modified(self):
-        return self.modified
-            
-    def set_track_info(self, track_info,  notify_subscribers=True, set_modified=True):
-        if not self.modified and set_modified:
-            self.track_info_old = self.track_info
-        self.track_info = track_info
-        if notify_subscribers:
-            for item in self.subscribers:
-                item.update(self)
-                if not self.modified:
-                    item.raise_modified()
-        if set_modified:
-            self.modified = True
-            
-    def get_track_info(self):
-        return self.track_info
-        
-    def get_data(self):
-        return self.data
-        
-    def get_resource_id(self):
-        return self.resource_id
-        
-    def get_short_id(self):
-        return self.short_id
-        
-    def revert_modifications(self, notify_subscribers=True):
-        if self.track_info is not None:
-            self.track_info.revert_modifications()
-        if self.modified:
-            self.modified = False
-            if self.data_OLD != b"":
-                self.data = self.data_OLD
-                self.data_OLD = b""
-            self.size = len(self.data)
-            if notify_subscribers:
-                for item in self.subscribers:
-                    item.lower_modified()
-                    item.update(self)
-                
-class TocHeader:
-
-    def __init__(self):
-        pass
-        
-    def from_memory_stream(self, stream):
-        self.file_id             = stream.uint64_read()
-        self.type_id             = stream.uint64_read()
-        self.toc_data_offset     = stream.uint64_read()
-        self.stream_file_offset  = stream.uint64_read()
-        self.gpu_resource_offset = stream.uint64_read()
-        self.unknown1            = stream.uint64_read() #seems to contain duplicate entry index
-        self.unknown2            = stream.uint64_read()
-        self.toc_data_size       = stream.uint32_read()
-        self.stream_size         = stream.uint32_read()
-        self.gpu_resource_size   = stream.uint32_read()
-        self.unknown3            = stream.uint32_read()
-        self.unknown4            = stream.uint32_read()
-        self.entry_index         = stream.uint32_read()
-        
-    def get_data(self):
-        return (struct.pack("<QQQQQQQIIIIII",
-            self.file_id,
-            self.type_id,
-            self.toc_data_offset,
-            self.stream_file_offset,
-            self.gpu_resource_offset,
-            self.unknown1,
-            self.unknown2,
-            self.toc_data_size,
-            self.stream_size,
-            self.gpu_resource_size,
-            self.unknown3,
-            self.unknown4,
-            self.entry_index))
-                
-class WwiseDep:
-
-    def __init__(self):
-        self.data = ""
-        
-    def from_memory_stream(self, stream):
-        self.offset = stream.tell()
-        self.tag = stream.uint32_read()
-        self.data_size = stream.uint32_read()
-        self.data = stream.read(self.data_size).decode('utf-8')
-        
-    def get_data(self):
-        return (self.tag.to_bytes(4, byteorder='little')
-                + self.data_size.to_bytes(4, byteorder='little')
-                + self.data.encode('utf-8'))
-                
-class DidxEntry:
-    def __init__(self):
-        self.id = self.offset = self.size = 0
-        
-    @classmethod
-    def from_bytes(cls, bytes):
-        e = DidxEntry()
-        e.id, e.offset, e.size = struct.unpack("<III", bytes)
-        return e
-        
-    def get_data(self):
-        return struct.pack("<III", self.id, self.offset, self.size)
-        
-class MediaIndex:
+            # source frames [decoded - len(tail), decoded) are in tail
+            decoded = self.position
+            if self.end_frame is not None:
+                decoded = min(decoded, self.end_frame)
+            playing = max(decoded - len(self.tail), self.skip_to)
+            if frame < playing:
+                return False
+            if frame <= decoded:
+                self.tail = self.tail[len(self.tail) - (decoded - frame):]
+            else:
+                self.tail = self.tail[:0]
+                self.skip_to = frame
+        self.phase = 0.0
+        self.delay_frames = max(0, round(-offset * self.rate))
+        self.finished = False
+        return True
 
-    def __init__(self):
-        self.entries = {}
-        self.data = {}
-        
-    def load(self, didxChunk, dataChunk):
-        for n in range(int(len(didxChunk)/12)):
-            entry = DidxEntry.from_bytes(didxChunk[12*n : 12*(n+1)])
-            self.entries[entry.id] = entry
-            self.data[entry.id] = dataChunk[entry.offset:entry.offset+entry.size]
-        
-    def get_data(self):
-        arr = [x.get_data() for x in self.entries.values()]
-        data_arr = self.data.values()
-        return b"".join(arr) + b"".join(data_arr)
-                
-class HircEntry:
-    
-    def __init__(self):
-        self.size = self.hierarchy_type = self.hierarchy_id = self.misc = 0
-        self.sources = []
-        self.track_info = []
-        self.soundbank = None
-    
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = HircEntry()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        entry.hierarchy_id = stream.uint32_read()
-        entry.misc = stream.read(entry.size - 4)
-        return entry
-        
-    def get_id(self):
-        return self.hierarchy_id
-        
-    def raise_modified(self):
-        self.soundbank.raise_modified()
-        
-    def lower_modified(self):
-        self.soundbank.lower_modified()
-        
-    def get_data(self):
-        return self.hierarchy_type.to_bytes(1, byteorder="little") + self.size.to_bytes(4, byteorder="little") + self.hierarchy_id.to_bytes(4, byteorder="little") + self.misc
-        
-class MusicRandomSequence(HircEntry):
-    
-    def __init__(self):
-        super().__init__()
-    
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = MusicRandomSequence()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        entry.hierarchy_id = stream.uint32_read()
-        return entry
-        
-    def get_data(self):
-        pass
-        
-class RandomSequenceContainer(HircEntry):
-    def __init__(self):
-        super().__init__()
-        self.unused_sections = []
-        self.contents = []
-        
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = RandomSequenceContainer()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        start_position = stream.tell()
-        entry.hierarchy_id = stream.uint32_read()
-
-        # ---------------------------------------
-        section_start = stream.tell()
-        stream.advance(1)
-        n = stream.uint8_read() #num fx
-        if n == 0:
-            stream.advance(12)
-        else:
-            stream.advance(7*n + 13)
-        stream.advance(5*stream.uint8_read()) #number of props
-        stream.advance(9*stream.uint8_read()) #number of props (again)
-        if stream.uint8_read() & 0b0000_0010: #positioning bit vector
-            if stream.uint8_read() & 0b0100_0000: # relative pathing bit vector
-                stream.advance(5)
-                stream.advance(16*stream.uint32_read())
-                stream.advance(20*stream.uint32_read())
-        if stream.uint8_read() & 0b0000_1000: #I forget what this is for
-            stream.advance(26)
+    def render(self, frame_count):
+        """
+        @return (numpy.ndarray): (frame_count, 2) float32 frames, padded with 
+        silence before the delay ends and after the voice finishes
+        """
+        out = numpy.zeros((frame_count, 2), dtype=numpy.float32)
+        start = min(self.delay_frames, frame_count)
+        self.delay_frames -= start
+        n = frame_count - start
+        if n == 0 or self.finished:
+            return out
+        if self.step == 1.0:
+            self.fill(n)
+            count = min(n, len(self.tail))
+            out[start:start+count] = self.tail[:count]
+            self.tail = self.tail[count:]
         else:
-           stream.advance(10)
-        stream.advance(3*stream.uint8_read()) #num state props
-        for _ in range(stream.uint8_read()): #num state groups
-            stream.advance(5)
-            stream.advance(8*stream.uint8_read())
-        for _ in range(stream.uint16_read()):  # num RTPC
-            stream.advance(12)
-            stream.advance(stream.uint16_read()*12)
-        section_end = stream.tell()
-        # ---------------------------------------
-
-        stream.seek(section_start)
-        entry.unused_sections.append(stream.read(section_end-section_start+24))
-
-        for _ in range(stream.uint32_read()): #number of children (tracks)
-            entry.contents.append(stream.uint32_read())
-
-        entry.unused_sections.append(stream.read(entry.size - (stream.tell()-start_position)))
-        return entry
-        
-    def get_data(self):
-        return (
-            b"".join([
-                struct.pack("<BII", self.hierarchy_type, self.size, self.hierarchy_id),
-                self.unused_sections[0],
-                len(self.contents).to_bytes(4, byteorder="little"),
-                b"".join([x.to_bytes(4, byteorder="little") for x in self.contents]),
-                self.unused_sections[1]
-            ])
-        )
-    
-class MusicSegment(HircEntry):
+            # linear interpolation between neighbouring source frames
+            self.fill(int(self.phase + n * self.step) + 2)
+            positions = self.phase + numpy.arange(n) * self.step
+            count = n
+            if self.exhausted:
+                count = int(numpy.searchsorted(positions, len(self.tail) - 1))
+            index = positions[:count].astype(numpy.int64)
+            frac = (positions[:count] - index)[:, None].astype(numpy.float32)
+            out[start:start+count] = self.tail[index] * (1 - frac) + self.tail[index + 1] * frac
+            advance = self.phase + count * self.step
+            consumed = min(int(advance), len(self.tail))
+            self.tail = self.tail[consumed:]
+            self.phase = advance - consumed
+        if count < n and self.exhausted:
+            self.finished = True
+        return out
+
+    def close(self):
+        self.source.close()
 
-    def __init__(self):
-        super().__init__()
-        self.tracks = []
-        self.duration = 0
-        self.entry_marker = None
-        self.exit_marker = None
-        self.unused_sections = []
-        self.markers = []
-        self.modified = False
-    
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = MusicSegment()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        entry.hierarchy_id = stream.uint32_read()
-        entry.unused_sections.append(stream.read(15))
-        n = stream.uint8_read() #number of props
-        stream.seek(stream.tell()-1)
-        entry.unused_sections.append(stream.read(5*n + 1))
-        n = stream.uint8_read() #number of props (again)
-        stream.seek(stream.tell()-1)
-        entry.unused_sections.append(stream.read(5*n + 1 + 12 + 4)) #the 4 is the count of state props, state chunks, and RTPC, which are currently always 0
-        n = stream.uint32_read() #number of children (tracks)
-        for _ in range(n):
-            entry.tracks.append(stream.uint32_read())
-        entry.unused_sections.append(stream.read(23)) #meter info
-        n = stream.uint32_read() #number of stingers
-        stream.seek(stream.tell()-4)
-        entry.unused_sections.append(stream.read(24*n + 4))
-        entry.duration = struct.unpack("<d", stream.read(8))[0]
-        n = stream.uint32_read() #number of markers
-        for i in range(n):
-            id = stream.uint32_read()
-            position = struct.unpack("<d", stream.read(8))[0]
-            name = []
-            temp = b"1"
-            while temp != b"\x00":
-                temp = stream.read(1)
-                name.append(temp)
-            name = b"".join(name)
-            marker = [id, position, name]
-            entry.markers.append(marker)
-            if i == 0:
-                entry.entry_marker = marker
-            elif i == n-1:
-                entry.exit_marker = marker
-        return entry
-        
-    def set_data(self, duration=None, entry_marker=None, exit_marker=None):
-        if not self.modified:
-            self.duration_old = self.duration
-            self.entry_marker_old = self.entry_marker[1]
-            self.exit_marker_old = self.exit_marker[1]
-            self.raise_modified()
-        if duration is not None: self.duration = duration
-        if entry_marker is not None: self.entry_marker[1] = entry_marker
-        if exit_marker is not None: self.exit_marker[1] = exit_marker
-        self.modified = True
-        
-    def revert_modifications(self):
-        if self.modified:
-            self.lower_modified()
-            self.entry_marker[1] = self.entry_marker_old
-            self.exit_marker[1] = self.exit_marker_old
-            self.duration = self.duration_old
-            self.modified = False
-        
-    def get_data(self):
-        return (
-            b"".join([
-                struct.pack("<BII", self.hierarchy_type, self.size, self.hierarchy_id),
-                self.unused_sections[0],
-                self.unused_sections[1],
-                self.unused_sections[2],
-                len(self.tracks).to_bytes(4, byteorder="little"),
-                b"".join([x.to_bytes(4, byteorder="little") for x in self.tracks]),
-                self.unused_sections[3],
-                self.unused_sections[4],
-                struct.pack("<d", self.duration),
-                len(self.markers).to_bytes(4, byteorder="little"),
-                b"".join([b"".join([x[0].to_bytes(4, byteorder="little"), struct.pack("<d", x[1]), x[2]]) for x in self.markers])
-            ])
-        )
-        
-class HircEntryFactory:
-    
-    @classmethod
-    def from_memory_stream(cls, stream):
-        hierarchy_type = stream.uint8_read()
-        stream.seek(stream.tell()-1)
-        if hierarchy_type == 2: #sound
-            return Sound.from_memory_stream(stream)
-        elif hierarchy_type == 11: #music track
-            return MusicTrack.from_memory_stream(stream)
-        elif hierarchy_type == 0x0A: #music segment
-            return MusicSegment.from_memory_stream(stream)
-        elif hierarchy_type == 0x05: #random sequence container
-            return RandomSequenceContainer.from_memory_stream(stream)
-        else:
-            return HircEntry.from_memory_stream(stream)
-        
-class HircReader:
-    
-    def __init__(self, soundbank = None):
-        self.entries = {}
-        self.soundbank = soundbank
-        
-    def load(self, hierarchy_data):
-        self.entries.clear()
-        reader = MemoryStream()
-        reader.write(hierarchy_data)
-        reader.seek(0)
-        num_items = reader.uint32_read()
-        for item in range(num_items):
-            entry = HircEntryFactory.from_memory_stream(reader)
-            entry.soundbank = self.soundbank
-            self.entries[entry.get_id()] = entry
-            
-    def get_data(self):
-        arr = [entry.get_data() for entry in self.entries.values()]
-        return len(arr).to_bytes(4, byteorder="little") + b"".join(arr)
-            
-class BankParser:
-    
-    def __init__(self):
-        self.chunks = {}
-        
-    def load(self, bank_data):
-        self.chunks.clear()
-        reader = MemoryStream()
-        reader.write(bank_data)
-        reader.seek(0)
-        while True:
-            tag = ""
-            try:
-                tag = reader.read(4).decode('utf-8')
-            except:
-                break
-            size = reader.uint32_read()
-            self.chunks[tag] = reader.read(size)
-            
-    def GetChunk(self, chunk_tag):
-        try:
-            return self.chunks[chunk_tag]
-        except:
-            return None
-            
-class BankSourceStruct:
+class SoundHandler:
 
-    def __init__(self):
-        self.plugin_id = 0
-        self.stream_type = self.source_id = self.mem_size = self.bit_flags = 0
-        
-    @classmethod
-    def from_bytes(cls, bytes):
-        b = BankSourceStruct()
-        b.plugin_id, b.stream_type, b.source_id, b.mem_size, b.bit_flags = struct.unpack("<IBIIB", bytes)
-        return b
-        
-    def get_data(self):
-        return struct.pack("<IBIIB", self.plugin_id, self.stream_type, self.source_id, self.mem_size, self.bit_flags)
-        
-class TrackInfoStruct:
-    
-    def __init__(self):
-        self.track_id = self.source_id = self.event_id = self.play_at = self.begin_trim_offset = self.end_trim_offset = self.source_duration = 0
-        self.play_at_old = self.begin_trim_offset_old = self.end_trim_offset_old = self.source_duration_old = 0
-        self.modified = False
-        self.soundbanks = set()
-        
-    @classmethod
-    def from_bytes(cls, bytes):
-        t = TrackInfoStruct()
-        t.track_id, t.source_id, t.event_id, t.play_at, t.begin_trim_offset, t.end_trim_offset, t.source_duration = struct.unpack("<IIIdddd", bytes)
-        return t
-        
-    def get_id(self):
-        if self.source_id != 0:
-            return self.source_id
-        else:
-            return self.event_id
-            
-    def is_modified(self):
-        return self.modified
-            
-    def set_data(self, play_at=None, begin_trim_offset=None, end_trim_offset=None, source_duration=None):
-        if not self.modified:
-            self.play_at_old = self.play_at
-            self.begin_trim_offset_old = self.begin_trim_offset
-            self.end_trim_offset_old = self.end_trim_offset
-            self.source_duration_old = self.source_duration
-            self.raise_modified()
-        if play_at is not None: self.play_at = play_at
-        if begin_trim_offset is not None: self.begin_trim_offset = begin_trim_offset
-        if end_trim_offset is not None: self.end_trim_offset = end_trim_offset
-        if source_duration is not None: self.source_duration = source_duration
-        self.modified = True
-        
-    def revert_modifications(self):
-        if self.modified:
-            self.lower_modified()
-            self.play_at = self.play_at_old
-            self.begin_trim_offset = self.begin_trim_offset_old
-            self.end_trim_offset = self.end_trim_offset_old
-            self.source_duration = self.source_duration_old
-            self.modified = False
-            
-    def raise_modified(self):
-        for bank in self.soundbanks:
-            bank.raise_modified()
-        
-    def lower_modified(self):
-        for bank in self.soundbanks:
-            bank.lower_modified()
-        
-    def get_data(self):
-        return struct.pack("<IIIdddd", self.track_id, self.source_id, self.event_id, self.play_at, self.begin_trim_offset, self.end_trim_offset, self.source_duration)
-            
-class MusicTrack(HircEntry):
-    
-    def __init__(self):
-        super().__init__()
-        self.bit_flags = 0
-        
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = MusicTrack()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        start_position = stream.tell()
-        entry.hierarchy_id = stream.uint32_read()
-        entry.bit_flags = stream.uint8_read()
-        num_sources = stream.uint32_read()
-        for _ in range(num_sources):
-            source = BankSourceStruct.from_bytes(stream.read(14))
-            entry.sources.append(source)
-        num_track_info = stream.uint32_read()
-        for _ in range(num_track_info):
-            track = TrackInfoStruct.from_bytes(stream.read(44))
-            entry.track_info.append(track)
-        entry.misc = stream.read(entry.size - (stream.tell()-start_position))
-        return entry
-
-    def get_data(self):
-        b = b"".join([source.get_data() for source in self.sources])
-        t = b"".join([track.get_data() for track in self.track_info])
-        return struct.pack("<BIIBI", self.hierarchy_type, self.size, self.hierarchy_id, self.bit_flags, len(self.sources)) + b + len(self.track_info).to_bytes(4, byteorder="little") + t + self.misc
+    sample_rate = 48000
+    prebuffer_seconds = 0.5
+    prebuffer_timeout = 10.0
     
-class Sound(HircEntry):
-    
-    def __init__(self):
-        super().__init__()
-    
-    @classmethod
-    def from_memory_stream(cls, stream):
-        entry = Sound()
-        entry.hierarchy_type = stream.uint8_read()
-        entry.size = stream.uint32_read()
-        entry.hierarchy_id = stream.uint32_read()
-        entry.sources.append(BankSourceStruct.from_bytes(stream.read(14)))
-        entry.misc = stream.read(entry.size - 18)
-        return entry
-
-    def get_data(self):
-        return struct.pack(f"<BII14s{len(self.misc)}s", self.hierarchy_type, self.size, self.hierarchy_id, self.sources[0].get_data(), self.misc)
-        
-class WwiseBank(Subscriber):
-    
-    def __init__(self):
-        self.data = b""
-        self.bank_header = b""
-        self.toc_data_header = b""
-        self.bank_misc_data = b""
-        self.modified = False
-        self.toc_header = None
-        self.dep = None
-        self.modified_count = 0
-        self.hierarchy = None
-        self.content = []
-        
-    def add_content(self, content):
-        content.subscribers.add(self)
-        if content.track_info is not None:
-            content.track_info.soundbanks.add(self)
-        self.content.append(content)
-        
-    def remove_content(self, content):
-        try:
-            content.subscribers.remove(self)
-        except:
-            pass
-            
-        try:
-            self.content.remove(content)
-        except:
-            pass
-            
-        try:
-            content.track_info.soundbanks.remove(self)
-        except:
-            pass
-  
-    def get_content(self):
-        return self.content
-        
-    def raise_modified(self):
-        self.modified = True
-        self.modified_count += 1
-        
-    def lower_modified(self):
-        if self.modified:
-            self.modified_count -= 1
-            if self.modified_count == 0:
-                self.modified = False
-        
-    def get_name(self):
-        return self.dep.data
-        
-    def get_id(self):
-        try:
-            return self.toc_header.file_id
-        except:
-            return 0
-            
-    def get_type_id(self):
-        try:
-            return self.toc_header.type_id
-        except:
-            return 0
-            
-    def get_data(self):
-        return self.data
-            
-    def generate(self, audio_sources, eventTrackInfo):
-        data = bytearray()
-        data += self.bank_header
-        
-        didx_section = b""
-        data_section = b""
-        offset = 0
-        
-        #regenerate soundbank from the hierarchy information
-        max_progress = 0
-        for entry in self.hierarchy.entries.values():
-            if entry.hierarchy_type == SOUND:
-                max_progress += 1
-            elif entry.hierarchy_type == MUSIC_TRACK:
-                max_progress += len(entry.sources)
-                    
-        
-        bank_generation_progress_window = ProgressWindow("Generating Soundbanks", max_progress)
-        bank_generation_progress_window.show()
-        bank_generation_progress_window.set_text(f"Generating {self.dep.data}")
-        
-        didx_array = []
-        data_array = []
-        
-        added_sources = set()
-        
-        for entry in self.hierarchy.entries.values():
-            for index, info in enumerate(entry.track_info):
-                if info.event_id != 0:
-                    entry.track_info[index] = eventTrackInfo[info.event_id]
-            for source in entry.sources:
-                bank_generation_progress_window.step()
-                if source.plugin_id == VORBIS:
-                    try:
-                        audio = audio_sources[source.source_id]
-                    except KeyError:
-                        continue
-                    try:
-                        count = 0
-                        for info in entry.track_info:
-                            if info.source_id == source.source_id:
-                                break
-                            count += 1
-                        if audio.get_track_info() is not None: #is this needed?
-                            entry.track_info[count] = audio.get_track_info()
-                    except: #exception because there may be no original track info struct
-                        pass
-                    if source.stream_type == PREFETCH_STREAM and source.source_id not in added_sources:
-                        data_array.append(audio.get_data()[:source.mem_size])
-                        didx_array.append(struct.pack("<III", source.source_id, offset, source.mem_size))
-                        offset += source.mem_size
-                        added_sources.add(source.source_id)
-                    elif source.stream_type == BANK and source.source_id not in added_sources:
-                        data_array.append(audio.get_data())
-                        didx_array.append(struct.pack("<III", source.source_id, offset, audio.size))
-                        offset += audio.size
-                        added_sources.add(source.source_id)
-                elif source.plugin_id == REV_AUDIO:
-                    try:
-                        custom_fx_entry = self.hierarchy.entries[source.source_id]
-                        fx_data = custom_fx_entry.get_data()
-                        plugin_param_size = int.from_bytes(fx_data[13:17], byteorder="little")
-                        media_index_id = int.from_bytes(fx_data[19+plugin_param_size:23+plugin_param_size], byteorder="little")
-                        audio = audio_sources[media_index_id]
-                    except KeyError:
-                        continue
-                    if source.stream_type == BANK and source.source_id not in added_sources:
-                        data_array.append(audio.get_data())
-                        didx_array.append(struct.pack("<III", media_index_id, offset, audio.size))
-                        offset += audio.size
-                        added_sources.add(media_index_id)
-        if len(didx_array) > 0:
-            data += "DIDX".encode('utf-8') + (12*len(didx_array)).to_bytes(4, byteorder="little")
-            data += b"".join(didx_array)
-            data += "DATA".encode('utf-8') + sum([len(x) for x in data_array]).to_bytes(4, byteorder="little")
-            data += b"".join(data_array)
-            
-        hierarchy_section = self.hierarchy.get_data()
-        data += "HIRC".encode('utf-8') + len(hierarchy_section).to_bytes(4, byteorder="little")
-        data += hierarchy_section
-        data += self.bank_misc_data
-        self.toc_header.toc_data_size = len(data) + len(self.toc_data_header)
-        self.toc_data_header[4:8] = len(data).to_bytes(4, byteorder="little")
-        self.data = data
-        bank_generation_progress_window.destroy()
-                     
-    def get_entry_index(self):
-        try:
-            return self.toc_header.entry_index
-        except:
-            return 0
-        
-class WwiseStream(Subscriber):
-
     def __init__(self):
-        self.content = None
-        self.modified = False
-        self.toc_header = None
-        self.TocData = bytearray()
-        
-    def set_content(self, content):
-        try:
-            self.content.subscribers.remove(self)
-        except:
-            pass
-        self.content = content
-        content.subscribers.add(self)
-        
-    def update(self, content):
-        self.toc_header.stream_size = content.size
-        self.TocData[8:12] = content.size.to_bytes(4, byteorder='little')
-        
-    def raise_modified(self):
-        self.modified = True
-        
-    def lower_modified(self):
-        self.modified = False
-        
-    def get_id(self):
-        try:
-            return self.toc_header.file_id
-        except:
-            return 0
-        
-    def get_type_id(self):
-        try:
-            return self.toc_header.type_id
-        except:
-            return 0
-            
-    def get_entry_index(self):
-        try:
-            return self.toc_header.entry_index
-        except:
-            return 0
-            
-    def get_data(self):
-        return self.content.get_data()
-
-class StringEntry:
-
-    def __init__(self):
-        self.text = ""
-        self.text_old = ""
-        self.string_id = 0
-        self.modified = False
-        
-    def get_id(self):
-        return self.string_id
-        
-    def get_text(self):
-        return self.text
-        
-    def set_text(self, text):
-        if not self.modified:
-            self.text_old = self.text
-        self.modified = True
-        self.text = text
-        
-    def revert_modifications(self):
-        if self.modified:
-            self.text = self.text_old
-            self.modified = False
-        
-class TextBank:
-    
-    def __init__(self):
-        self.toc_header = None
-        self.data = b''
-        self.string_ids = []
-        self.language = 0
-        self.modified = False
-        
-    def set_data(self, data):
-        self.string_ids.clear()
-        num_entries = int.from_bytes(data[8:12], byteorder='little')
-        id_section_start = 16
-        offset_section_start = id_section_start + 4 * num_entries
-        data_section_start = offset_section_start + 4 * num_entries
-        ids = data[id_section_start:offset_section_start]
-        offsets = data[offset_section_start:data_section_start]
-        for n in range(num_entries):
-            string_id = int.from_bytes(ids[4*n:+4*(n+1)], byteorder="little")
-            self.string_ids.append(string_id)
-            
-    def update(self):
-        pass
-        
-    def get_data(self):
-        return self.data
-        
-    def GetLanguage(self):
-        return self.language
-        
-    def is_modified(self):
-        return self.modified
-        
-    def generate(self, string_entries):
-        entries = string_entries[self.language]
-        stream = MemoryStream()
-        stream.write(b'\xae\xf3\x85\x3e\x01\x00\x00\x00')
-        stream.write(len(self.string_ids).to_bytes(4, byteorder="little"))
-        stream.write(self.language.to_bytes(4, byteorder="little"))
-        offset = 16 + 8*len(self.string_ids)
-        for i in self.string_ids:
-            stream.write(entries[i].get_id().to_bytes(4, byteorder="little"))
-        for i in self.string_ids:
-            stream.write(offset.to_bytes(4, byteorder="little"))
-            initial_position = stream.tell()
-            stream.seek(offset)
-            text_bytes = entries[i].text.encode('utf-8') + b'\x00'
-            stream.write(text_bytes)
-            offset += len(text_bytes)
-            stream.seek(initial_position)
-        self.data = stream.data
-        self.toc_header.toc_data_size = len(self.data)
-        
-    def Rebuild(self, string_id, offset_difference):
-        pass
-        
-    def get_id(self):
-        try:
-            return self.toc_header.file_id
-        except:
-            return 0
-        
-    def get_type_id(self):
-        try:
-            return self.toc_header.type_id
-        except:
-            return 0
-            
-    def get_entry_index(self):
-        try:
-            return self.toc_header.entry_index
-        except:
-            return 0
-
-class FileReader:
-    
-    def __init__(self):
-        self.wwise_streams = {}
-        self.wwise_banks = {}
-        self.audio_sources = {}
-        self.text_banks = {}
-        self.music_track_events = {}
-        self.string_entries = {}
-        self.music_segments = {}
-        
-    def from_file(self, path):
-        self.name = os.path.basename(path)
-        self.path = path
-        toc_file = MemoryStream()
-        with open(path, 'r+b') as f:
-            toc_file = MemoryStream(f.read())
-
-        stream_file = MemoryStream()
-        if os.path.isfile(path+".stream"):
-            with open(path+".stream", 'r+b') as f:
-                stream_file = MemoryStream(f.read())
-        self.load(toc_file, stream_file)
-        
-    def to_file(self, path):
-        toc_file = MemoryStream()
-        stream_file = MemoryStream()
-        self.num_files = len(self.wwise_streams) + 2*len(self.wwise_banks) + len(self.text_banks)
-        self.num_types = 0
-        if len(self.wwise_streams) > 0: self.num_types += 1
-        if len(self.wwise_banks) > 0: self.num_types += 2
-        if len(self.text_banks) > 0: self.num_types += 1
-        
-        toc_file.write(self.magic.to_bytes(4, byteorder="little"))
-        
-        toc_file.write(self.num_types.to_bytes(4, byteorder="little"))
-        toc_file.write(self.num_files.to_bytes(4, byteorder="little"))
-        toc_file.write(self.unknown.to_bytes(4, byteorder="little"))
-        toc_file.write(self.unk4Data)
-        
-        if len(self.wwise_streams) > 0:
-            unk = 0
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = WWISE_STREAM
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = len(self.wwise_streams)
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = 16
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            unk = 64
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            
-        if len(self.wwise_banks) > 0:
-            unk = 0
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = WWISE_BANK
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = len(self.wwise_banks)
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = 16
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            unk = 64
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            
-            #deps
-            unk = 0
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = WWISE_DEP
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = len(self.wwise_banks)
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = 16
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            unk = 64
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            
-        if len(self.text_banks) > 0:
-            unk = 0
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = STRING
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = len(self.text_banks)
-            toc_file.write(unk.to_bytes(8, byteorder='little'))
-            unk = 16
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-            unk = 64
-            toc_file.write(unk.to_bytes(4, byteorder='little'))
-        
-        file_position = toc_file.tell()
-        for key in self.wwise_streams.keys():
-            toc_file.seek(file_position)
-            file_position += 80
-            stream = self.wwise_streams[key]
-            toc_file.write(stream.toc_header.get_data())
-            toc_file.seek(stream.toc_header.toc_data_offset)
-            toc_file.write(pad_to_16_byte_align(stream.TocData))
-            stream_file.seek(stream.toc_header.stream_file_offset)
-            stream_file.write(pad_to_16_byte_align(stream.content.get_data()))
-            
-        for key in self.wwise_banks.keys():
-            toc_file.seek(file_position)
-            file_position += 80
-            bank = self.wwise_banks[key]
-            toc_file.write(bank.toc_header.get_data())
-            toc_file.seek(bank.toc_header.toc_data_offset)
-            toc_file.write(pad_to_16_byte_align(bank.toc_data_header + bank.get_data()))
-            
-        for key in self.wwise_banks.keys():
-            toc_file.seek(file_position)
-            file_position += 80
-            bank = self.wwise_banks[key]
-            toc_file.write(bank.dep.toc_header.get_data())
-            toc_file.seek(bank.dep.toc_header.toc_data_offset)
-            toc_file.write(pad_to_16_byte_align(bank.dep.get_data()))
-            
-        for key in self.text_banks.keys():
-            toc_file.seek(file_position)
-            file_position += 80
-            entry = self.text_banks[key]
-            toc_file.write(entry.toc_header.get_data())
-            toc_file.seek(entry.toc_header.toc_data_offset)
-            toc_file.write(pad_to_16_byte_align(entry.get_data()))
-            
-        with open(os.path.join(path, self.name), 'w+b') as f:
-            f.write(toc_file.data)
-            
-        if len(stream_file.data) > 0:
-            with open(os.path.join(path, self.name+".stream"), 'w+b') as f:
-                f.write(stream_file.data)
-
-    def rebuild_headers(self):
-        self.num_types = 0
-        if len(self.wwise_streams) > 0: self.num_types += 1
-        if len(self.wwise_banks) > 0: self.num_types += 2
-        if len(self.text_banks) > 0: self.num_types += 1
-        self.num_files = len(self.wwise_streams) + 2*len(self.wwise_banks) + len(self.text_banks)
-        stream_file_offset = 0
-        toc_file_offset = 80 + self.num_types * 32 + 80 * self.num_files
-        for key, value in self.wwise_streams.items():
-            value.toc_header.stream_file_offset = stream_file_offset
-            value.toc_header.toc_data_offset = toc_file_offset
-            stream_file_offset += _16_byte_align(value.toc_header.stream_size)
-            toc_file_offset += _16_byte_align(value.toc_header.toc_data_size)
-        
-        for key, value in self.wwise_banks.items():
-            value.generate(self.audio_sources, self.music_track_events)
-            
-            value.toc_header.toc_data_offset = toc_file_offset
-            toc_file_offset += _16_byte_align(value.toc_header.toc_data_size)
-            
-        for key, value in self.wwise_banks.items():
-            value.dep.toc_header.toc_data_offset = toc_file_offset
-            toc_file_offset += _16_byte_align(value.toc_header.toc_data_size)
-            
-        for key, value in self.text_banks.items():
-            value.generate(string_entries=self.string_entries)
-            value.toc_header.toc_data_offset = toc_file_offset
-            toc_file_offset += _16_byte_align(value.toc_header.toc_data_size)
-        
-    def load(self, toc_file, stream_file):
-        self.wwise_streams.clear()
-        self.wwise_banks.clear()
-        self.audio_sources.clear()
-        self.text_banks.clear()
-        self.music_track_events.clear()
-        self.string_entries.clear()
-        self.music_segments.clear()
-        
-        media_index = MediaIndex()
-        
-        self.magic      = toc_file.uint32_read()
-        if self.magic != 4026531857: return False
-
-        self.num_types   = toc_file.uint32_read()
-        self.num_files   = toc_file.uint32_read()
-        self.unknown    = toc_file.uint32_read()
-        self.unk4Data   = toc_file.read(56)
-        toc_file.seek(toc_file.tell() + 32 * self.num_types)
-        toc_start = toc_file.tell()
-        for n in range(self.num_files):
-            toc_file.seek(toc_start + n*80)
-            toc_header = TocHeader()
-            toc_header.from_memory_stream(toc_file)
-            entry = None
-            if toc_header.type_id == WWISE_STREAM:
-                audio = AudioSource()
-                audio.stream_type = STREAM
-                entry = WwiseStream()
-                entry.toc_header = toc_header
-                toc_file.seek(toc_header.toc_data_offset)
-                entry.TocData = toc_file.read(toc_header.toc_data_size)
-                stream_file.seek(toc_header.stream_file_offset)
-                audio.set_data(stream_file.read(toc_header.stream_size), notify_subscribers=False, set_modified=False)
-                audio.resource_id = toc_header.file_id
-                entry.set_content(audio)
-                self.wwise_streams[entry.get_id()] = entry
-            elif toc_header.type_id == WWISE_BANK:
-                entry = WwiseBank()
-                entry.toc_header = toc_header
-                toc_data_offset = toc_header.toc_data_offset
-                toc_data_size = toc_header.toc_data_size
-                toc_file.seek(toc_data_offset)
-                entry.toc_data_header = toc_file.read(16)
-                bank = BankParser()
-                bank.load(toc_file.read(toc_header.toc_data_size-16))
-                entry.bank_header = "BKHD".encode('utf-8') + len(bank.chunks["BKHD"]).to_bytes(4, byteorder="little") + bank.chunks["BKHD"]
-                
-                hirc = HircReader(soundbank=entry)
-                try:
-                    hirc.load(bank.chunks['HIRC'])
-                except KeyError:
-                    pass
-                entry.hierarchy = hirc
-                #Add all bank sources to the source list
-                if "DIDX" in bank.chunks.keys():
-                    bank_id = entry.toc_header.file_id
-                    media_index.load(bank.chunks["DIDX"], bank.chunks["DATA"])
-                
-                entry.bank_misc_data = b''
-                for chunk in bank.chunks.keys():
-                    if chunk not in ["BKHD", "DATA", "DIDX", "HIRC"]:
-                        entry.bank_misc_data = entry.bank_misc_data + chunk.encode('utf-8') + len(bank.chunks[chunk]).to_bytes(4, byteorder='little') + bank.chunks[chunk]
-                        
-                self.wwise_banks[entry.get_id()] = entry
-            elif toc_header.type_id == WWISE_DEP: #wwise dep
-                dep = WwiseDep()
-                dep.toc_header = toc_header
-                toc_file.seek(toc_header.toc_data_offset)
-                dep.from_memory_stream(toc_file)
-                try:
-                    self.wwise_banks[toc_header.file_id].dep = dep
-                except KeyError:
-                    pass
-            elif toc_header.type_id == STRING: #string_entry
-                toc_file.seek(toc_header.toc_data_offset)
-                data = toc_file.read(toc_header.toc_data_size)
-                num_entries = int.from_bytes(data[8:12], byteorder='little')
-                language = int.from_bytes(data[12:16], byteorder='little')
-                if language not in self.string_entries:
-                    self.string_entries[language] = {}
-                id_section_start = 16
-                offset_section_start = id_section_start + 4 * num_entries
-                data_section_start = offset_section_start + 4 * num_entries
-                ids = data[id_section_start:offset_section_start]
-                offsets = data[offset_section_start:data_section_start]
-                text_bank = TextBank()
-                text_bank.toc_header = toc_header
-                text_bank.language = language
-                for n in range(num_entries):
-                    entry = StringEntry()
-                    string_id = int.from_bytes(ids[4*n:+4*(n+1)], byteorder="little")
-                    text_bank.string_ids.append(string_id)
-                    string_offset = int.from_bytes(offsets[4*n:4*(n+1)], byteorder="little")
-                    entry.string_id = string_id
-                    stopIndex = string_offset + 1
-                    while data[stopIndex] != 0:
-                        stopIndex += 1
-                    entry.text = data[string_offset:stopIndex].decode('utf-8')
-                    self.string_entries[language][string_id] = entry
-                self.text_banks[text_bank.get_id()] = text_bank
-        
-        # ---------- Backwards compatibility checks ----------
-        for bank in self.wwise_banks.values():
-            if bank.dep == None: #can be None because older versions didn't save the dep along with the bank
-                if not self.load_deps():
-                    print("Failed to load")
-                    self.wwise_streams.clear()
-                    self.wwise_banks.clear()
-                    self.text_banks.clear()
-                    self.audio_sources.clear()
-                    return
-                break
-        
-        if len(self.wwise_banks) == 0 and len(self.wwise_streams) > 0: #0 if patch was only for streams
-            if not self.load_banks():
-                print("Failed to load")
-                self.wwise_streams.clear()
-                self.wwise_banks.clear()
-                self.text_banks.clear()
-                self.audio_sources.clear()
-                return
-        # ---------- End backwards compatibility checks ----------
-        
-        # Create all AudioSource objects
-        for bank in self.wwise_banks.values():
-            for entry in bank.hierarchy.entries.values():
-                for source in entry.sources:
-                    if source.plugin_id == VORBIS and source.stream_type == BANK and source.source_id not in self.audio_sources:
-                        try:
-                            audio = AudioSource()
-                            audio.stream_type = BANK
-                            audio.short_id = source.source_id
-                            audio.set_data(media_index.data[source.source_id], set_modified=False, notify_subscribers=False)
-                            self.audio_sources[source.source_id] = audio
-                        except KeyError:
-                            pass
-                    elif source.plugin_id == VORBIS and source.stream_type in [STREAM, PREFETCH_STREAM] and source.source_id not in self.audio_sources:
-                        try:
-                            stream_resource_id = murmur64_hash((os.path.dirname(bank.dep.data) + "/" + str(source.source_id)).encode('utf-8'))
-                            audio = self.wwise_streams[stream_resource_id].content
-                            audio.short_id = source.source_id
-                            self.audio_sources[source.source_id] = audio
-                        except KeyError:
-                            pass
-                    elif source.plugin_id == REV_AUDIO and source.stream_type == BANK and source.source_id not in self.audio_sources:
-                        try:
-                            custom_fx = bank.hierarchy.entries[source.source_id]
-                            data = custom_fx.get_data()
-                            plugin_param_size = int.from_bytes(data[13:17], byteorder="little")
-                            media_index_id = int.from_bytes(data[19+plugin_param_size:23+plugin_param_size], byteorder="little")
-                            audio = AudioSource()
-                            audio.stream_type = BANK
-                            audio.short_id = media_index_id
-                            audio.set_data(media_index.data[media_index_id], set_modified=False, notify_subscribers=False)
-                            self.audio_sources[media_index_id] = audio
-                        except KeyError:
-                            pass
-                for info in entry.track_info:
-                    if info.event_id != 0:
-                        self.music_track_events[info.event_id] = info
-                if isinstance(entry, MusicSegment):
-                    self.music_segments[entry.get_id()] = entry
-
-        #construct list of audio sources in each bank
-        #add track_info to audio sources?
-        for bank in self.wwise_banks.values():
-            for entry in bank.hierarchy.entries.values():
-                for info in entry.track_info:
-                    try:
-                        if info.source_id != 0:
-                            self.audio_sources[info.source_id].set_track_info(info, notify_subscribers=False, set_modified=False)
-                    except:
-                        continue
-                for source in entry.sources:
-                    try:
-                        if source.plugin_id == VORBIS and self.audio_sources[source.source_id] not in bank.get_content(): #may be missing streamed audio if the patch didn't change it
-                            bank.add_content(self.audio_sources[source.source_id])
-                    except:
-                        continue
-                
-        
-    def load_deps(self):
-        archive_file = ""
-        if os.path.exists(GAME_FILE_LOCATION):
-            archive_file = os.path.join(GAME_FILE_LOCATION, strip_patch_index(self.name))
-        if not os.path.exists(archive_file):
-            warning = PopupWindow(message = "This patch may have been created using an older version of the audio modding tool and is missing required data. Please select the original game file to load required data.")
-            warning.show()
-            warning.root.wait_window(warning.root)
-            archive_file = askopenfilename(title="Select archive")
-            if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
-                archive_file = os.path.splitext(archive_file)[0]
-        if not os.path.exists(archive_file):
-            return False
-        toc_file = MemoryStream()
-        with open(archive_file, 'r+b') as f:
-            toc_file = MemoryStream(f.read())
-
-        self.magic      = toc_file.uint32_read()
-        if self.magic != 4026531857: return False
-
-        self.num_types   = toc_file.uint32_read()
-        self.num_files   = toc_file.uint32_read()
-        self.unknown    = toc_file.uint32_read()
-        self.unk4Data   = toc_file.read(56)
-        toc_file.seek(toc_file.tell() + 32 * self.num_types)
-        toc_start = toc_file.tell()
-        for n in range(self.num_files):
-            toc_file.seek(toc_start + n*80)
-            toc_header = TocHeader()
-            toc_header.from_memory_stream(toc_file)
-            if toc_header.type_id == WWISE_DEP: #wwise dep
-                dep = WwiseDep()
-                dep.toc_header = toc_header
-                toc_file.seek(toc_header.toc_data_offset)
-                dep.from_memory_stream(toc_file)
-                try:
-                    self.wwise_banks[toc_header.file_id].dep = dep
-                except KeyError:
-                    pass
-        return True
-        
-    def load_banks(self):
-        archive_file = ""
-        if os.path.exists(GAME_FILE_LOCATION):
-            archive_file = os.path.join(GAME_FILE_LOCATION, strip_patch_index(self.name))
-        if not os.path.exists(archive_file):
-            warning = PopupWindow(message = "This patch may have been created using an older version of the audio modding tool and is missing required data. Please select the original game file to load required data.")
-            warning.show()
-            warning.root.wait_window(warning.root)
-            archive_file = askopenfilename(title="Select archive")
-            if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
-                archive_file = os.path.splitext(archive_file)[0]
-        if not os.path.exists(archive_file):
-            return False
-        toc_file = MemoryStream()
-        with open(archive_file, 'r+b') as f:
-            toc_file = MemoryStream(f.read())
-
-        self.magic      = toc_file.uint32_read()
-        if self.magic != 4026531857: return False
-
-        self.num_types   = toc_file.uint32_read()
-        self.num_files   = toc_file.uint32_read()
-        self.unknown    = toc_file.uint32_read()
-        self.unk4Data   = toc_file.read(56)
-        toc_file.seek(toc_file.tell() + 32 * self.num_types)
-        toc_start = toc_file.tell()
-        for n in range(self.num_files):
-            toc_file.seek(toc_start + n*80)
-            toc_header = TocHeader()
-            toc_header.from_memory_stream(toc_file)
-            entry = None
-            if toc_header.type_id == WWISE_BANK:
-                entry = WwiseBank()
-                entry.toc_header = toc_header
-                toc_data_offset = toc_header.toc_data_offset
-                toc_data_size = toc_header.toc_data_size
-                toc_file.seek(toc_data_offset)
-                entry.toc_data_header = toc_file.read(16)
-                #-------------------------------------
-                bank = BankParser()
-                bank.load(toc_file.read(toc_header.toc_data_size-16))
-                entry.bank_header = "BKHD".encode('utf-8') + len(bank.chunks["BKHD"]).to_bytes(4, byteorder="little") + bank.chunks["BKHD"]
-                
-                hirc = HircReader(soundbank=entry)
-                try:
-                    hirc.load(bank.chunks['HIRC'])
-                except KeyError:
-                    continue
-                entry.hierarchy = hirc
-                #-------------------------------------
-                entry.bank_misc_data = b''
-                for chunk in bank.chunks.keys():
-                    if chunk not in ["BKHD", "DATA", "DIDX", "HIRC"]:
-                        entry.bank_misc_data = entry.bank_misc_data + chunk.encode('utf-8') + len(bank.chunks[chunk]).to_bytes(4, byteorder='little') + bank.chunks[chunk]
-                        
-                self.wwise_banks[entry.get_id()] = entry
-            elif toc_header.type_id == WWISE_DEP: #wwise dep
-                dep = WwiseDep()
-                dep.toc_header = toc_header
-                toc_file.seek(toc_header.toc_data_offset)
-                dep.from_memory_stream(toc_file)
-                try:
-                    self.wwise_banks[toc_header.file_id].dep = dep
-                except KeyError:
-                    pass
-        
-        #only include banks that contain at least 1 of the streams
-        temp_banks = {}
-        for key, bank in self.wwise_banks.items():
-            include_bank = False
-            for hierarchy_entry in bank.hierarchy.entries.values():
-                for source in hierarchy_entry.sources:
-                    if source.plugin_id == VORBIS and source.stream_type in [STREAM, PREFETCH_STREAM]:
-                        stream_resource_id = murmur64_hash((os.path.dirname(bank.dep.data) + "/" + str(source.source_id)).encode('utf-8'))
-                        for stream in self.wwise_streams.values():
-                            if stream.get_id() == stream_resource_id:
-                                include_bank = True
-                                temp_banks[key] = bank
-                                break
-                    if include_bank:
-                        break
-                if include_bank:
-                    break
-        self.wwise_banks = temp_banks
-        
-        return True
-        
-class SoundHandler:
-    
-    def __init__(self):
-        self.audio_process = None
-        self.wave_object = None
-        self.audio_id = -1
-        self.audio = pyaudio.PyAudio()
-        
-    def kill_sound(self):
-        if self.audio_process is not None:
-            if self.callback is not None:
-                self.callback()
-                self.callback = None
-            self.audio_process.close()
-            self.wave_file.close()
-            try:
-                os.remove(self.audio_file)
-            except:
-                pass
-            self.audio_process = None
-        
-    def play_audio(self, sound_id, sound_data, callback=None):
-        if not os.path.exists(VGMSTREAM):
-            return
-        self.kill_sound()
-        self.callback = callback
-        if self.audio_id == sound_id:
-            self.audio_id = -1
-            return
-        filename = f"temp{sound_id}"
-        if not os.path.isfile(f"{filename}.wav"):
-            with open(f'{os.path.join(CACHE, filename)}.wem', 'wb') as f:
-                f.write(sound_data)
-            process = subprocess.run([VGMSTREAM, "-o", f"{os.path.join(CACHE, filename)}.wav", f"{os.path.join(CACHE, filename)}.wem"], stdout=subprocess.DEVNULL)
-            os.remove(f"{os.path.join(CACHE, filename)}.wem")
-            if process.returncode != 0:
-                logger.error(f"Encountered error when converting {sound_id}.wem for playback")
-                self.callback = None
-                return
-            
-        self.audio_id = sound_id
-        self.wave_file = wave.open(f"{os.path.join(CACHE, filename)}.wav")
-        self.audio_file = f"{os.path.join(CACHE, filename)}.wav"
-        self.frame_count = 0
-        self.max_frames = self.wave_file.getnframes()
-        
-        def read_stream(input_data, frame_count, time_info, status):
-            self.frame_count += frame_count
-            if self.frame_count > self.max_frames:
-                if self.callback is not None:
-                    self.callback()
-                    self.callback = None
-                self.audio_id = -1
-                self.wave_file.close()
-                try:
-                    os.remove(self.audio_file)
-                except:
-                    pass
-                return (None, pyaudio.paComplete)
-            data = self.wave_file.readframes(frame_count)
-            if self.wave_file.getnchannels() > 2:
-                data = self.downmix_to_stereo(data, self.wave_file.getnchannels(), self.wave_file.getsampwidth(), frame_count)
-            return (data, pyaudio.paContinue)
-
-        self.audio_process = self.audio.open(format=self.audio.get_format_from_width(self.wave_file.getsampwidth()),
-                channels = min(self.wave_file.getnchannels(), 2),
-                rate=self.wave_file.getframerate(),
-                output=True,
-                stream_callback=read_stream)
-        self.audio_file = f"{os.path.join(CACHE, filename)}.wav"
-        
-    def downmix_to_stereo(self, data, channels, channel_width, frame_count):
-        if channel_width == 2:
-            arr = numpy.frombuffer(data, dtype=numpy.int16)
-            stereo_array = numpy.zeros(shape=(frame_count, 2), dtype=numpy.int16)
-        elif channel_width == 1:
-            arr = numpy.frombuffer(data, dtype=numpy.int8)
-            stereo_array = numpy.zeros(shape=(frame_count, 2), dtype=numpy.int8)
-        elif channel_width == 4:
-            arr = numpy.frombuffer(data, dtype=numpy.int32)
-            stereo_array = numpy.zeros(shape=(frame_count, 2), dtype=numpy.int32)
-        arr = arr.reshape((frame_count, channels))
-        
-        if channels == 4:
-            for index, frame in enumerate(arr):
-                stereo_array[index][0] = int(0.42265 * frame[0] + 0.366025 * frame[2] + 0.211325 * frame[3])
-                stereo_array[index][1] = int(0.42265 * frame[1] + 0.366025 * frame[3] + 0.211325 * frame[2])
-        
-            return stereo_array.tobytes()
-                
-        if channels == 6:
-            for index, frame in enumerate(arr):
-                stereo_array[index][0] = int(0.374107*frame[1] + 0.529067*frame[0] + 0.458186*frame[3] + 0.264534*frame[4] + 0.374107*frame[5])
-                stereo_array[index][1] = int(0.374107*frame[1] + 0.529067*frame[2] + 0.458186*frame[4] + 0.264534*frame[3] + 0.374107*frame[5])
-        
-            return stereo_array.tobytes()
-        
-        #if not 4 or 6 channel, default to taking the L and R channels rather than mixing
-        for index, frame in enumerate(arr):
-            stereo_array[index][0] = frame[0]
-            stereo_array[index][1] = frame[1]
-        
-        return stereo_array.tobytes()
-     
-class FileHandler:
-
-    def __init__(self):
-        self.file_reader = FileReader()
-        
-    def revert_all(self):
-        for audio in self.file_reader.audio_sources.values():
-            audio.revert_modifications()
-        for language in self.file_reader.string_entries.values():
-            for string in language.values():
-                string.revert_modifications()
-        for track_info in self.file_reader.music_track_events.values():
-            track_info.revert_modifications()
-        for music_segment in self.file_reader.music_segments.values():
-            music_segment.revert_modifications()
-        
-    def revert_audio(self, file_id):
-        audio = self.get_audio_by_id(file_id)
-        audio.revert_modifications()
-        
-    def dump_as_wem(self, file_id):
-        output_file = filedialog.asksaveasfile(mode='wb', title="Save As", initialfile=(str(file_id)+".wem"), defaultextension=".wem", filetypes=[("Wwise Audio", "*.wem")])
-        if output_file is None: return
-        output_file.write(self.get_audio_by_id(file_id).get_data())
-        
-    def dump_as_wav(self, file_id, muted: bool = False):
-        output_file = filedialog.asksaveasfilename(
-            title="Save As", 
-            initialfile=f"{file_id}.wav", 
-            defaultextension=".wav", 
-            filetypes=[("Wav Audio", "*.wav")]
-        )
-
-        if output_file == "":
-            return
-
-        save_path = os.path.splitext(output_file)[0]
-
-        if muted:
-            subprocess.run([
-                FFMPEG, 
-                "-f", "lavfi", 
-                "-i", "anullsrc=r=48000:cl=stereo",
-                "-t", "1", # TO-DO, this should match up with actual duration
-                "-c:a", "pcm_s16le",
-                f"{save_path}.wav"],
-                stdout=subprocess.DEVNULL
-            )
-            return
-
-        with open(f"{save_path}.wem", 'wb') as f:
-            f.write(self.get_audio_by_id(file_id).get_data())
-
-        process = subprocess.run(
-            [VGMSTREAM, "-o", f"{save_path}.wav", f"{save_path}.wem"], 
-            stdout=subprocess.DEVNULL
-        )
-        
-        if process.returncode != 0:
-            logger.error(f"Encountered error when converting {file_id}.wem into .wav format")
-
-        os.remove(f"{save_path}.wem")
-        
-    def dump_multiple_as_wem(self, file_ids):
-        folder = filedialog.askdirectory(title="Select folder to save files to")
-        
-        progress_window = ProgressWindow(title="Dumping Files", max_progress=len(file_ids))
-        progress_window.show()
-        
-        if os.path.exists(folder):
-            for file_id in file_ids:
-                audio = self.get_audio_by_id(file_id)
-                if audio is not None:
-                    save_path = os.path.join(folder, f"{audio.get_id()}")
-                    progress_window.set_text("Dumping " + os.path.basename(save_path) + ".wem")
-                    with open(save_path+".wem", "wb") as f:
-                        f.write(audio.get_data())
-                progress_window.step()
-        else:
-            print("Invalid folder selected, aborting dump")
-            
-        progress_window.destroy()
-        
-    def dump_multiple_as_wav(self, file_ids: list[str], muted: bool = False,
-                             with_seq: bool = False):
-        folder = filedialog.askdirectory(title="Select folder to save files to")
-        
-        if not os.path.exists(folder):
-            logger.warning("Invalid folder selected, aborting dump")
-            return
-
-        progress_window = ProgressWindow(title="Dumping Files", 
-                                         max_progress=len(file_ids))
-        progress_window.show()
-
-
-        for i, file_id in enumerate(file_ids, start=0):
-            audio: int | None = self.get_audio_by_id(int(file_id))
-            if audio is None:
-                continue
-            basename = str(audio.get_id())
-            if with_seq:
-                basename = f"{i:02d}" + "_" + basename
-            save_path = os.path.join(folder, basename)
-            progress_window.set_text(
-                "Dumping " + os.path.basename(save_path) + ".wem"
-            )
-            if muted:
-                subprocess.run([
-                    FFMPEG, 
-                    "-f", "lavfi", 
-                    "-i", "anullsrc=r=48000:cl=stereo",
-                    "-t", "1", # TO-DO, this should match up with actual duration
-                    "-c:a", "pcm_s16le",
-                    f"{save_path}.wav"],
-                    stdout=subprocess.DEVNULL
-                )
-            else:
-                with open(save_path + ".wem", "wb") as f:
-                    f.write(audio.get_data())
-                process = subprocess.run(
-                    [VGMSTREAM, "-o", f"{save_path}.wav", f"{save_path}.wem"],
-                    stdout=subprocess.DEVNULL,
-                )
-                if process.returncode != 0:
-                    logger.error(f"Encountered error when converting {basename}.wem to .wav")
-                os.remove(f"{save_path}.wem")
-            progress_window.step()
-
-        progress_window.destroy()
-
-    def dump_all_as_wem(self):
-        folder = filedialog.askdirectory(title="Select folder to save files to")
-        
-        progress_window = ProgressWindow(title="Dumping Files", max_progress=len(self.file_reader.audio_sources))
-        progress_window.show()
-        
-        if os.path.exists(folder):
-            for bank in self.file_reader.wwise_banks.values():
-                subfolder = os.path.join(folder, os.path.basename(bank.dep.data.replace('\x00', '')))
-                if not os.path.exists(subfolder):
-                    os.mkdir(subfolder)
-                for audio in bank.get_content():
-                    save_path = os.path.join(subfolder, f"{audio.get_id()}")
-                    progress_window.set_text("Dumping " + os.path.basename(save_path) + ".wem")
-                    with open(save_path+".wem", "wb") as f:
-                        f.write(audio.get_data())
-                    progress_window.step()
-        else:
-            print("Invalid folder selected, aborting dump")
-            
-        progress_window.destroy()
-    
-    def dump_all_as_wav(self):
-        folder = filedialog.askdirectory(title="Select folder to save files to")
-
-        progress_window = ProgressWindow(title="Dumping Files", max_progress=len(self.file_reader.audio_sources))
-        progress_window.show()
-        
-        if os.path.exists(folder):
-            for bank in self.file_reader.wwise_banks.values():
-                subfolder = os.path.join(folder, os.path.basename(bank.dep.data.replace('\x00', '')))
-                if not os.path.exists(subfolder):
-                    os.mkdir(subfolder)
-                for audio in bank.get_content():
-                    save_path = os.path.join(subfolder, f"{audio.get_id()}")
-                    progress_window.set_text("Dumping " + os.path.basename(save_path) + ".wav")
-                    with open(save_path+".wem", "wb") as f:
-                        f.write(audio.get_data())
-                    process = subprocess.run([VGMSTREAM, "-o", f"{save_path}.wav", f"{save_path}.wem"], stdout=subprocess.DEVNULL)
-                    if process.returncode != 0:
-                        logger.error(f"Encountered error when converting {os.path.basename(save_path)}.wem to .wav")
-                    os.remove(f"{save_path}.wem")
-                    progress_window.step()
-        else:
-            print("Invalid folder selected, aborting dump")
-            
-        progress_window.destroy()
-        
-    def get_number_prefix(self, n):
-        number = ''.join(takewhile(str.isdigit, n or ""))
-        try:
-            return int(number)
-        except:
-            log.logger.warning(f"File name must begin with a number: {n}")
-        
-    def save_archive_file(self):
-        folder = filedialog.askdirectory(title="Select folder to save files to")
-        if os.path.exists(folder):
-            self.file_reader.rebuild_headers()
-            self.file_reader.to_file(folder)
-        else:
-            print("Invalid folder selected, aborting save")
-            
-    def get_audio_by_id(self, file_id):
-        try:
-            return self.file_reader.audio_sources[file_id] #short_id
-        except KeyError:
-            pass
-        for source in self.file_reader.audio_sources.values(): #resource_id
-            if source.resource_id == file_id:
-                return source
-                
-    def get_event_by_id(self, event_id):
-        try:
-            return self.file_reader.music_track_events[event_id]
-        except:
-            pass
-            
-    def get_string_by_id(self, string_id):
-        try:
-            return self.file_reader.string_entries[language][string_id]
-        except:
-            pass
-        
-    def get_music_segment_by_id(self, segment_id):
-        try:
-            return self.file_reader.music_segments[segment_id]
-        except:
-            pass
-        
-    def get_wwise_streams(self):
-        return self.file_reader.wwise_streams
-        
-    def get_wwise_banks(self):
-        return self.file_reader.wwise_banks
-        
-    def get_audio(self):
-        return self.file_reader.audio_sources
-        
-    def get_strings(self):
-        return self.file_reader.string_entries
-        
-    def load_archive_file(self, initialdir: str | None = '', archive_file: str | None = None):
-        if archive_file == None:
-            archive_file = askopenfilename(initialdir=initialdir, 
-                                           title="Select archive")
-        if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
-            archive_file = os.path.splitext(archive_file)[0]
-        if os.path.exists(archive_file):
-            try:
-                self.file_reader.from_file(archive_file)
-            except Exception as e:
-                logger.error(f"Error occured when loading {archive_file}: {e}.")
-                logger.warning("Aborting load")
-                return False
-        else:
-            print("Invalid file selected, aborting load")
-            return False
-        return True
-            
-            
-    def load_patch(self, patch_file: str | None = None): #TO-DO: only import if DIFFERENT from original audio; makes it possible to import different mods that change the same soundbank
-        patch_file_reader = FileReader()
-        if patch_file == None:
-            patch_file = filedialog.askopenfilename(title="Choose patch file to import")
-        if os.path.splitext(patch_file)[1] in (".stream", ".gpu_resources"):
-            patch_file = os.path.splitext(patch_file)[0]
-        if os.path.exists(patch_file):
-            try:
-                patch_file_reader.from_file(patch_file)
-            except Exception as e:
-                logger.error(f"Error occured when loading {patch_file}: {e}.")
-                logger.warning("Aborting load")
-                return False
-        else:
-            print("Invalid file selected, aborting load")
-            return False
-            
-        progress_window = ProgressWindow(title="Loading Files", max_progress=len(patch_file_reader.audio_sources))
-        progress_window.show()
-        
-        for bank in patch_file_reader.wwise_banks.values(): #something is a bit wrong here
-            #load audio content from the patch
-            for new_audio in bank.get_content():
-                progress_window.set_text(f"Loading {new_audio.get_id()}")
-                old_audio = self.get_audio_by_id(new_audio.get_short_id())
-                if old_audio is not None:
-                    if (not old_audio.modified and new_audio.get_data() != old_audio.get_data()
-                        or old_audio.modified and new_audio.get_data() != old_audio.data_OLD):
-                        old_audio.set_data(new_audio.get_data())
-                    if old_audio.get_track_info() is not None and new_audio.get_track_info() is not None:
-                        old_info = old_audio.get_track_info()
-                        new_info = new_audio.get_track_info()
-                        if (
-                            (
-                                not old_info.modified 
-                                and (
-                                    old_info.play_at != new_info.play_at
-                                    or old_info.begin_trim_offset != new_info.begin_trim_offset
-                                    or old_info.end_trim_offset != new_info.end_trim_offset
-                                    or old_info.source_duration != new_info.source_duration
-                                )
-                            )
-                            or
-                            (
-                                old_info.modified
-                                and (
-                                    old_info.play_at_old != new_info.play_at
-                                    or old_info.begin_trim_offset_old != new_info.begin_trim_offset
-                                    or old_info.end_trim_offset_old != new_info.end_trim_offset
-                                    or old_info.source_duration_old != new_info.source_duration
-                                )
-                            )
-                        ):
-                            old_audio.get_track_info().set_data(play_at=new_info.play_at, begin_trim_offset=new_info.begin_trim_offset, end_trim_offset=new_info.end_trim_offset, source_duration=new_info.source_duration)
-                progress_window.step()
-
-        for key, music_segment in patch_file_reader.music_segments.items():
-            try:
-                old_music_segment = self.file_reader.music_segments[key]
-            except:
-                continue
-            if (
-                (
-                    not old_music_segment.modified
-                    and (
-                        music_segment.entry_marker[1] != old_music_segment.entry_marker[1]
-                        or music_segment.exit_marker[1] != old_music_segment.exit_marker[1]
-                        or music_segment.duration != old_music_segment.duration
-                    )
-                )
-                or
-                (
-                    old_music_segment.modified
-                    and (
-                        music_segment.entry_marker[1] != old_music_segment.entry_marker_old
-                        or music_segment.exit_marker[1] != old_music_segment.exit_marker_old
-                        or music_segment.duration != old_music_segment.duration_old
-                    )
-                )
-            ):
-                old_music_segment.set_data(duration=music_segment.duration, entry_marker=music_segment.entry_marker[1], exit_marker=music_segment.exit_marker[1])
-
-        for text_data in patch_file_reader.text_banks.values():
-            for string_id in text_data.string_ids:
-                new_text_data = patch_file_reader.string_entries[language][string_id]
-                try:
-                    old_text_data = self.file_reader.string_entries[language][string_id]
-                except:
-                    continue
-                if (
-                    (not old_text_data.modified and new_text_data.get_text() != old_text_data.get_text())
-                    or (old_text_data.modified and new_text_data.get_text() != old_text_data.text_old)
-                ):
-                    old_text_data.set_text(new_text_data.get_text())
-        
-        progress_window.destroy()
-        return True
-
-    def write_patch(self, folder=None):
-        if folder == None:
-            folder = filedialog.askdirectory(title="Select folder to save files to")
-        if os.path.exists(folder):
-            patch_file_reader = FileReader()
-            patch_file_reader.name = self.file_reader.name + ".patch_0"
-            patch_file_reader.magic = self.file_reader.magic
-            patch_file_reader.num_types = 0
-            patch_file_reader.num_files = 0
-            patch_file_reader.unknown = self.file_reader.unknown
-            patch_file_reader.unk4Data = self.file_reader.unk4Data
-            patch_file_reader.audio_sources = self.file_reader.audio_sources
-            patch_file_reader.string_entries = self.file_reader.string_entries
-            patch_file_reader.music_track_events = self.file_reader.music_track_events
-            patch_file_reader.music_segments = self.file_reader.music_segments
-            patch_file_reader.wwise_banks = {}
-            patch_file_reader.wwise_streams = {}
-            patch_file_reader.text_banks = {}
-            
-            for key, value in self.file_reader.wwise_streams.items():
-                if value.content.modified:
-                    patch_file_reader.wwise_streams[key] = value
-                    
-            for key, value in self.file_reader.wwise_banks.items():
-                if value.modified:
-                    patch_file_reader.wwise_banks[key] = value
-                    
-            for key, value in self.file_reader.text_banks.items():
-                for string_id in value.string_ids:
-                    if self.file_reader.string_entries[value.language][string_id].modified:
-                        patch_file_reader.text_banks[key] = value
-                        break
-     
-            patch_file_reader.rebuild_headers()
-            patch_file_reader.to_file(folder)
-        else:
-            print("Invalid folder selected, aborting save")
-            return False
-        return True
-
-    def load_wems(self, wems: Union[tuple[str, ...], Literal[""], None] = None, set_duration=True): 
-        if wems == None:
-            wems = filedialog.askopenfilenames(title="Choose .wem files to import", filetypes=[("Wwise Vorbis", "*.wem")])
-        if wems == "":
-            return
-        progress_window = ProgressWindow(title="Loading Files", 
-                                         max_progress=len(wems))
-        progress_window.show()
-        for wem in wems:
-            basename = os.path.basename(wem)
-            splits: list[str] = basename.split("_", 1)
-            try:
-                match splits:
-                    case [prefix, name] if int(prefix) < 10000:
-                        basename = name
-            except:
-                pass
-            progress_window.set_text("Loading " + basename)
-            file_id: int | None = self.get_number_prefix(basename)
-            if file_id == None:
-                continue
-            audio: str | None = self.get_audio_by_id(file_id)
-            if audio == None:
-                continue
-            with open(wem, 'rb') as f:
-                audio.set_data(f.read())
-            if set_duration:
-                try:
-                    process = subprocess.run([VGMSTREAM, "-m", wem], capture_output=True)
-                    process.check_returncode()
-                except:
-                    logger.warning(f"Failed to get duration info for {wem}")
-                    continue
-                for line in process.stdout.decode("utf-8").split("\n"):
-                    if "sample rate" in line:
-                        sample_rate = float(line[13:line.index("Hz")-1])
-                    if "stream total samples" in line:
-                        total_samples = int(line[22:line.index("(")-1])
-                len_ms = total_samples * 1000 / sample_rate
-                if audio.get_track_info() is not None:
-                    audio.get_track_info().set_data(play_at=0, begin_trim_offset=0, end_trim_offset=0, source_duration=len_ms)
-                # find music segment for Audio Source
-                stop = False
-                for segment in self.file_reader.music_segments.values():
-                    for track_id in segment.tracks:
-                        track = segment.soundbank.hierarchy.entries[track_id]
-                        for source in track.sources:
-                            if source.source_id == audio.get_short_id():
-                                segment.set_data(duration=len_ms, entry_marker=0, exit_marker=len_ms)
-                                stop = True
-                                break
-                        if stop:
-                            break
-                    if stop:
-                        break
-            progress_window.step()
-        progress_window.destroy()
-        
-    def create_external_sources_list(self, sources: list[str]):
-        root = etree.Element("ExternalSourcesList", attrib={
-            "SchemaVersion": "1",
-            "Root": __file__
-        })
-        file = etree.ElementTree(root)
-        for source in sources:
-            etree.SubElement(root, "Source", attrib={
-                "Path": source,
-                "Conversion": DEFAULT_CONVERSION_SETTING,
-                "Destination": os.path.basename(source)
-            })
-        file.write(os.path.join(CACHE, "external_sources.wsources"))
-        
-        return os.path.join(CACHE, "external_sources.wsources")
-        
-        
-    def load_wavs(self, wavs: list[str] | None = None):
-        if wavs == None:
-            wavs = filedialog.askopenfilenames(title="Choose .wav files to import", filetypes=[("WAV audio", "*.wav")])
-        if wavs == "":
-            return
-            
-        source_list = self.create_external_sources_list(wavs)
-        
-        try:
-            if SYSTEM in ["Windows", "Darwin"]:
-                subprocess.run([
-                    WWISE_CLI,
-                    "migrate",
-                    DEFAULT_WWISE_PROJECT,
-                    "--quiet",
-                ]).check_returncode()
-            else:
-                showerror(title="Operation Failed",
-                    message="The current operating system does not support this feature yet")
-        except Exception as e:
-            logger.error(e)
-            showerror(title="Error", message="Error occurred during project migration. Please check log.txt.")
-        
-        convert_dest = os.path.join(CACHE, SYSTEM)
-        try:
-            if SYSTEM == "Darwin":
-                subprocess.run([
-                    WWISE_CLI,
-                    "convert-external-source",
-                    DEFAULT_WWISE_PROJECT,
-                    "--platform", "Windows",
-                    "--source-file",
-                    source_list,
-                    "--output",
-                    CACHE,
-                ]).check_returncode()
-            elif SYSTEM == "Windows":
-                subprocess.run([
-                    WWISE_CLI,
-                    "convert-external-source",
-                    DEFAULT_WWISE_PROJECT,
-                    "--platform", "Windows",
-                    "--source-file",
-                    source_list,
-                    "--output",
-                    CACHE,
-                ]).check_returncode()
-            else:
-                showerror(title="Operation Failed",
-                    message="The current operating system does not support this feature yet")
-        except Exception as e:
-            logger.error(e)
-            showerror(title="Error", message="Error occurred during conversion. Please check log.txt.")
-            
-        wems = [os.path.join(convert_dest, x) for x in os.listdir(convert_dest)]
-        
-        self.load_wems(wems)
-        
-        for wem in wems:
-            try:
-                os.remove(wem)
-            except:
-                pass
-                
-        try:
-            os.remove(source_list)
-        except:
-            pass
-
-    def load_wav_by_mapping(self,
-                 project: str,
-                 wems: list[tuple[str, AudioSource, int]],
-                 schema: etree.Element) -> bool:
-        if len(wems) == 0:
-            return True
-        tree = etree.ElementTree(schema)
-        schema_path = os.path.join(CACHE, "schema.xml")
-        tree.write(schema_path, encoding="utf-8", xml_declaration=True)
-        convert_ok = True
-        convert_dest = os.path.join(CACHE, SYSTEM)
-        try:
-            if SYSTEM == "Darwin":
-                subprocess.run([
-                    WWISE_CLI,
-                    "convert-external-source",
-                    project,
-                    "--platform", "Windows",
-                    "--source-file",
-                    schema_path,
-                    "--output",
-                    CACHE,
-                ]).check_returncode()
-            elif SYSTEM == "Windows":
-                subprocess.run([
-                    WWISE_CLI,
-                    "convert-external-source",
-                    project,
-                    "--platform", "Windows",
-                    "--source-file",
-                    schema_path,
-                    "--output",
-                    CACHE,
-                ]).check_returncode()
-            else:
-                convert_ok = False
-                showerror(title="Operation Failed",
-                    message="The current operating system does not support this feature yet")
-        except Exception as e:
-            convert_ok = False
-            logger.error(e)
-            showerror(title="Error", message="Error occurred during conversion. Please check log.txt.")
-
-        if not convert_ok:
-            return False
-
-        for wem in wems:
-            try:
-                dest_path = os.path.join(convert_dest, wem[0])
-                assert(os.path.exists(dest_path))
-                with open(dest_path, "rb") as f:
-                    wem[1].set_data(f.read())
-            except Exception as e:
-                logger.error(e)
-
-        try:
-            os.remove(schema_path)
-            shutil.rmtree(convert_dest)
-        except Exception as e:
-            logger.error(e)
-
-        return True
-
-    def load_convert_spec(self):
-        spec_path = filedialog.askopenfilename(title="Choose .spec file to import", 
-                                          filetypes=[("json", "")])
-        if spec_path == "":
-            logger.warning("Import operation cancelled")
-            return
-        if not os.path.exists(spec_path):
-            showerror(title="Operation Failed", message=f"{spec_path} does not exist.")
-            logger.warning(f"{spec_path} does not exist. Import operation " \
-                    "cancelled")
-            return
-
-        root_spec: Any = None
-        try:
-            with open(spec_path, mode="r") as f:
-                root_spec = json.load(f)
-        except json.JSONDecodeError as err:
-            logger.warning(err)
-            root_spec = None
-
-        if root_spec == None:
-            return
-
-        if not isinstance(root_spec, dict):
-            showerror(title="Operation Failed",
-                      message="Invalid data format in the given spec file.") 
-            logger.warning("Invalid data format in the given spec file. Import "
-                           "operation cancelled")
-            return
-
-        # Validate version number #
-        if "v" not in root_spec:
-            showerror(title="Operation Failed", 
-                      message="The given spec file is missing field `v`") 
-            logger.warning("The given spec file is missing field `v`. Import "
-                           "operation cancelled.")
-            return
-        v = root_spec["v"]
-        if v != 2:
-            showerror(title="Operation Failed", 
-                      message="The given spec file contain invalid version " 
-                      f'number {v}.')
-            logger.warning("The given spec file contain invalid version "
-                           f'number {v}. Import operation cancelled')
-            return
+        self.output_stream = None
+        self.voices: list[Voice] = []
+        self.callback = None
+        self.audio_id = -1
+        self.lock = threading.Lock()
+        self.audio = pyaudio.PyAudio()
+        self.mixer = Mixer(self.sample_rate)
+        self.pcm_cache = PCMCache(PCM_CACHE)
+        self.prefetcher = PCMPrefetcher(self.pcm_cache)
 
-        # Validate `specs` field #
-        if "specs" not in root_spec:
-            showerror(title="Operation Failed", 
-                      message="The given spec file is missing field `specs`.")
-            logger.warning("The given spec file is missing field `specs`."
-                            " Import operation cancelled.")
-            return
-        if not isinstance(root_spec["specs"], list):
-            showerror(title="Operation Failed",
-                      message="Field `specs` is not an array.")
-            logger.warning("Field `specs` is not an array. Import operation "
-                           "cancelled.")
+    def open_stream(self):
+        """
+        Open the output stream once and keep it running; the mixer renders 
+        silence while nothing plays, so starting a sound never waits on the 
+        device.
+        """
+        if self.output_stream is not None:
             return
+        def mix_stream(input_data, frame_count, time_info, status):
+            return (self.mixer.mix(frame_count), pyaudio.paContinue)
+        self.output_stream = self.audio.open(format=pyaudio.paFloat32,
+                channels=2,
+                rate=self.sample_rate,
+                output=True,
+                stream_callback=mix_stream)
 
-        # Validate `project` path #
-        project = DEFAULT_WWISE_PROJECT
-        if "project" not in root_spec:
-            logger.warning("Missing field `project`. Using default Wwise project")
-        else:
-            if not isinstance(root_spec["project"], str):
-                logger.warning("Field `project` is not a string. Using default"
-                               " Wwise project")
-            elif not os.path.exists(root_spec["project"]):
-                logger.warning("The given Wwise project does not exist. Using "
-                               "default Wwise project")
-            else:
-                project = root_spec["project"]
-        if not os.path.exists(project):
-            showerror(title="Operation Failed",
-                      message="The default Wwise Project does not exist.")
-            logger.warning("The default Wwise Project does not exist. Import "
-                           "operation cancelled.")
-            return
-        # Validate project `conversion` setting #
-        conversion = DEFAULT_CONVERSION_SETTING
-        if project != DEFAULT_WWISE_PROJECT:
-            if "conversion" not in root_spec:
-                showerror(title="Operation Failed",
-                          message="Missing field `conversion`.")
-                logger.warning("Missing field `conversion`. Import operation"
-                               " cancelled.")
+    def close(self):
+        self.kill_sound()
+        self.prefetcher.shutdown()
+        if self.output_stream is not None:
+            self.output_stream.close()
+            self.output_stream = None
+        self.audio.terminate()
+        
+    def kill_sound(self):
+        with self.lock:
+            voices = self.voices
+            callback = self.callback
+            self.voices = []
+            self.callback = None
+        for voice in voices:
+            self.mixer.remove(voice)
+            voice.close()
+        if len(voices) > 0 and callback is not None:
+            callback()
+
+    def on_voice_finished(self, voice):
+        voice.close()
+        with self.lock:
+            if voice not in self.voices:
                 return
-            if not isinstance(root_spec["conversion"], str):
-                showerror(title="Operation Failed",
-                          message="Field `conversion` is not a string.")
-                logger.warning("Field `conversion` is not a string. Import "
-                               "operation cancelled.")
+            self.voices.remove(voice)
+            if len(self.voices) > 0:
                 return
-            conversion = root_spec["conversion"]
-
-        spec_dir = os.path.dirname(spec_path)
-        root = etree.Element("ExternalSourcesList", attrib={
-            "SchemaVersion": "1",
-            "Root": spec_dir
-        })
-        wems: list[tuple[str, AudioSource, int]] = []
-        for sub_spec in root_spec["specs"]:
-            # Validate spec format #
-            if not isinstance(sub_spec, dict):
-                logger.warning("Current entry is not an object. Skipping "
-                               "current entry.")
-                continue
-
-            # Validate work space #
-            workspace = ""
-            if "workspace" not in sub_spec:
-                logger.warning("The given spec file is missing field "
-                               "`workspace`. Use the current directory of the "
-                               "given spec file is in instead.")
-                workspace = spec_dir 
-            else:
-                workspace = sub_spec["workspace"]
-                # Relative path
-                if not os.path.exists(workspace): 
-                    workspace = os.path.join(spec_dir, workspace) 
-            if not os.path.exists(workspace):
-                showwarning(title="Operation Skipped",
-                            message=f"{workspace} does not exist.")
-                logger.warning(f"{workspace} does not exist. Skipping current "
-                               "entry.")
-                continue
+            callback = self.callback
+            self.callback = None
+            self.audio_id = -1
+        if callback is not None:
+            callback()
+        
+    def prefetch_audio(self, sources):
+        """
+        Pre-decode audio sources into the playback cache, replacing any 
+        earlier prefetch request.
+        """
+        self.prefetcher.prefetch(sources)
 
-            # Validate `mapping` format #
-            mapping: dict[str, list[str] | str] | None
-            if "mapping" not in sub_spec:
-                showwarning(title="Operation Skipped", 
-                            message=f"The given spec file is missing field " 
-                            "`mapping`")
-                logger.warning("The given spec file is missing field `mapping`. "
-                        "Skipping current entry.")
-                continue
-            mapping = sub_spec["mapping"]
-            if mapping == None or not isinstance(mapping, dict):
-                showwarning(title="Operation Skipped", 
-                            message="field `mapping` has an invalid data type")
-                logger.warning("field `mapping` has an invalid data type. Skipping "
-                        "current entry.")
-                continue
+    def open_source(self, sound_id, sound_data, content_key):
+        """
+        @return (PCMReader | StreamDecoder | None): cached PCM when available, 
+        otherwise a streaming vgmstream decode that fills the cache
+        """
+        pcm = self.pcm_cache.get(content_key)
+        if pcm is not None:
+            return PCMReader(pcm)
+        if not os.path.exists(core.VGMSTREAM):
+            return None
+        try:
+            return StreamDecoder(sound_data, partial(self.pcm_cache.put, content_key))
+        except (OSError, wave.Error, EOFError):
+            logger.error(f"Encountered error when converting {sound_id}.wem for playback")
+            return None
 
-            suffix: str = ""
-            if "suffix" in sub_spec:
-                if not isinstance(sub_spec["suffix"], str):
-                    logger.warning("`suffix` is not a str. Disable "
-                            "substring filtering")
-                else:
-                    suffix = sub_spec["suffix"]
-            prefix: str = ""
-            if "prefix" in sub_spec:
-                if not isinstance(sub_spec["prefix"], str):
-                    logger.warning("`prefix` is not a str. Disable "
-                            "substring filtering")
-                else:
-                    prefix = sub_spec["prefix"]
-
-            for src, dest in mapping.items():
-                src = prefix + src + suffix
-
-                abs_src = os.path.join(workspace, src)
-                if not abs_src.endswith(".wav"):
-                    logger.info("Require import file missing .wav extension. "
-                            "Adding extension.")
-                    abs_src += ".wav"
-                if not os.path.exists(abs_src):
-                    logger.warning(f"Required import file does not exist "
-                            "Skipping the current entry.")
-                    continue
+    def create_voice(self, source, delay=0.0, begin=0.0, end=None):
+        return Voice(source, get_downmix_matrix(source.channels), 
+                     self.sample_rate, delay, begin, end, 
+                     on_finish=self.on_voice_finished)
 
-                if isinstance(dest, str):
-                    file_id: int | None = self.get_number_prefix(dest)
-                    if file_id == None:
-                        logger.warning(f"{dest} does not contain a valid game "
-                                       "asset file id. Skipping the current "
-                                       "entry.")
-                        continue
-                    audio = self.get_audio_by_id(file_id)
-                    convert_dest = f"{file_id}.wem"
-                    if audio == None:
-                        logger.warning(f"No audio source is associated with "
-                                       f"game asset file id {file_id}. Skipping "
-                                       "the current entry.")
-                        continue
-                    etree.SubElement(root, "Source", attrib={
-                        "Path": abs_src,
-                        "Conversion": conversion,
-                        "Destination": convert_dest 
-                    })
-                    wems.append((convert_dest, audio, file_id))
-                elif isinstance(dest, list):
-                    for d in dest:
-                        if not isinstance(d, str):
-                            logger.warning(f"{d} is not a string. Skipping the "
-                                    "current entry.")
-                        file_id: int | None = self.get_number_prefix(d)
-                        if file_id == None:
-                            logger.warning(f"{d} does not contain a valid game "
-                                           "asset file id. Skipping the current "
-                                           "entry.")
-                            continue
-                        audio = self.get_audio_by_id(file_id)
-                        if audio == None:
-                            logger.warning(f"No audio source is associated with "
-                                           f"game asset file id {file_id}. "
-                                           "Skipping the current entry.")
-                            continue
-                        convert_dest = f"{file_id}.wem"
-                        etree.SubElement(root, "Source", attrib={
-                            "Path": abs_src,
-                            "Conversion": conversion,
-                            "Destination": convert_dest
-                        })
-                        wems.append((convert_dest, audio, file_id))
-                else:
-                    logger.warning(f"{dest} is not a string or list of string. "
-                            "Skipping the current entry.")
-            out: str | None = None
-            if "write_patch_to" not in sub_spec:
-                continue
-            out = sub_spec["write_patch_to"]
-            if not isinstance(out, str):
-                showwarning(title="Operation Skipped", 
-                            message="field `write_patch_to` has an invalid data "
-                            "type. Write patch operation cancelled.")
-                logger.warning("field `write_patch_to` has an invalid data "
-                               "type. Write patch operation cancelled.")
-                continue
-            if not os.path.exists(out):
-                # Relative patch write #
-                out = os.path.join(spec_dir, out)
-                if not os.path.exists(out):
-                    showwarning(title="Operation Skipped",
-                                message=f"{out} does not exist. Write patch "
-                                "operation cancelled.")
-                    logger.warning(f"{out} does not exist. Write patch operation "
-                                   "cancelled.")
-                    continue
-            if not self.load_wav_by_mapping(project, wems, root):
-                continue
-            if not self.write_patch(folder=out):
-                showerror(title="Operation Failed", message="Write patch operation failed. Check "
-                            "log.txt for detailed.")
-            root = etree.Element("ExternalSourcesList", attrib={
-                "SchemaVersion": "1",
-                "Root": spec_dir 
-            })
-            is_revert = "revert" in sub_spec and \
-                    isinstance(sub_spec["revert"], bool) and \
-                    sub_spec["revert"]
-            is_revert_all = "revert_all" in sub_spec and \
-                    isinstance(sub_spec["revert_all"], bool) and \
-                    sub_spec["revert_all"]
-            if is_revert_all:
-                self.revert_all()
-                continue
-            if is_revert:
-                for wem in wems:
-                    self.revert_audio(wem[2])
-            wems.clear()
-
-        self.load_wav_by_mapping(project, wems, root)
-        out: str | None = None
-        if "write_patch_to" not in root_spec:
-            return
-        out = root_spec["write_patch_to"]
-        if not isinstance(out, str):
-            showerror(title="Operation Failed", 
-                      message="field `write_patch_to` has an invalid data "
-                      "type. Write patch operation cancelled.")
-            logger.warning("field `write_patch_to` has an invalid data "
-                           "type. Write patch operation cancelled.")
+    def start_voices(self, play_id, voices, callback, prebuffer=False):
+        """
+        @param prebuffer (bool): pre-buffer every voice on a worker thread 
+        and start them together once all of them are ready
+        """
+        with self.lock:
+            self.voices = voices
+            self.callback = callback
+            self.audio_id = play_id
+        self.open_stream()
+        if not prebuffer:
+            self.mixer.add_all(voices)
             return
-        if not os.path.exists(out):
-            # Relative path patch writing #
-            out = os.path.join(spec_dir, out)
-            if not os.path.exists(out):
-                showerror(title="Operation Failed",
-                          message=f"{out} does not exist. Write patch "
-                          "operation cancelled.")
-                logger.warning(f"{out} does not exist. Write patch operation "
-                              "cancelled.")
+        threading.Thread(target=self.prebuffer_voices, args=(voices,), 
+                         daemon=True).start()
+
+    def prebuffer_voices(self, voices):
+        for voice in voices:
+            voice.prebuffer(round(self.prebuffer_seconds * voice.source.frame_rate),
+                            self.prebuffer_timeout)
+        with self.lock:
+            # killed or replaced while buffering
+            if self.voices is not voices:
                 return
-        if not self.write_patch(folder=out):
-            showerror(title="Operation Failed",
-                      message="Write patch operation failed. Check "
-                      "log.txt for detailed.")
-
-        is_revert = "revert" in root_spec and \
-                isinstance(root_spec["revert"], bool) and \
-                root_spec["revert"]
-        if is_revert:
-            for wem in wems:
-                self.revert_audio(wem[2])
+            self.mixer.add_all(voices)
 
-    def load_wems_spec(self):
-        spec_path = filedialog.askopenfilename(title="Choose .spec file to import", 
-                                          filetypes=[("json", "")])
-        if spec_path == "":
-            logger.warning("Import operation cancelled")
-            return
-        if not os.path.exists(spec_path):
-            showerror(title="Operation Failed", 
-                      message=f"{spec_path} does not exist.")
-            logger.warning(f"{spec_path} does not exist. Import operation "
-                           "cancelled")
-            return
+    def seek(self, seconds):
+        """
+        Reposition the playing sound or segment to `seconds` on its timeline
+        while the output stream keeps running. Voices that already finished 
+        are not brought back.
 
-        root_spec: Any = None
-        try:
-            with open(spec_path, mode="r") as f:
-                root_spec = json.load(f)
-        except json.JSONDecodeError as err:
-            logger.warning(err)
-            root_spec = None
+        @return (bool): False if a voice could not be repositioned (it is 
+        still buffering, or streams from vgmstream and `seconds` lies behind
+        it)
+        """
+        with self.lock:
+            voices = list(self.voices)
+        return self.mixer.seek(voices, seconds)
 
-        if root_spec == None:
+    def play_audio(self, sound_id, sound_data, callback=None, content_key=None):
+        """
+        @param content_key (bytes | None): content hash of `sound_data`, 
+        computed here when not given. Playback toggles per (sound_id, 
+        content) so the original and the replacement of one source can be 
+        auditioned back and forth.
+        """
+        if content_key is None:
+            content_key = content_hash(sound_data)
+        self.kill_sound()
+        if self.audio_id == (sound_id, content_key):
+            self.audio_id = -1
             return
 
-        if not isinstance(root_spec, dict):
-            showerror(title="Operation Failed",
-                      message="Invalid data format in the given spec file.") 
-            logger.warning("Invalid data format in the given spec file. Import "
-                    "operation cancelled")
+        source = self.open_source(sound_id, sound_data, content_key)
+        if source is None:
             return
+        self.start_voices((sound_id, content_key), [self.create_voice(source)], callback)
 
-        # Validate version number # 
-        if "v" not in root_spec:
-            showerror(title="Operation Failed",
-                      message="The given spec file is missing field `v`") 
-            logger.warning("The given spec file is missing field `v`. Import "
-                    "operation cancelled.")
-            return
-        if root_spec["v"] != 2:
-            showerror(title="Operation Failed",
-                      message="The given spec file contain invalid version " + 
-                        f'number {root_spec["v"]}.')
-            logger.warning("The given spec file contain invalid version "
-                    f'number {root_spec["v"]}. Import operation cancelled')
+    def play_segment(self, segment_id, sources, callback=None):
+        """
+        Layer every track source of a music segment on the segment timeline.
+
+        @param sources (list[tuple[int, bytes, bytes, TrackInfoStruct]]): 
+        (sound id, wem data, content hash, placement) per source. play_at and 
+        trims are in milliseconds; the source is audible from 
+        play_at + begin_trim_offset, starting begin_trim_offset into the 
+        source and ending at source_duration + end_trim_offset. A negative 
+        start skips that much more of the source so tracks stay aligned.
+        """
+        self.kill_sound()
+        if self.audio_id == ("segment", segment_id):
+            self.audio_id = -1
             return
 
-        # Validate `specs` format #
-        if "specs" not in root_spec:
-            showerror(title="Operation Failed",
-                      message="The given spec file is missing field `specs`.")
-            logger.warning("The given spec file is missing field `specs`."
-                            " Import operation cancelled.")
-            return
-        if not isinstance(root_spec["specs"], list):
-            showerror(title="Operation Failed",
-                      message="Field `specs` is not an array.")
-            logger.warning("Field `specs` is not an array. Import operation "
-                           "cancelled.")
+        voices = []
+        for sound_id, sound_data, content_key, info in sources:
+            source = self.open_source(sound_id, sound_data, content_key)
+            if source is None:
+                continue
+            end = None
+            if info.source_duration > 0:
+                end = (info.source_duration + info.end_trim_offset) / 1000
+            voices.append(self.create_voice(
+                source,
+                delay=(info.play_at + info.begin_trim_offset) / 1000,
+                begin=info.begin_trim_offset / 1000,
+                end=end
+            ))
+        if len(voices) == 0:
             return
+        self.start_voices(("segment", segment_id), voices, callback, 
+                          prebuffer=len(voices) > 1)
+     
+class FileReader(core.FileReader):
 
-        spec_dir = os.path.dirname(spec_path)
-        patched_ids: list[int] = []
-        for sub_spec in root_spec["specs"]:
-            if not isinstance(sub_spec, dict):
-                logger.warning("Current entry is not an object. Skipping "
-                               "current entry.")
-                continue
+    def locate_archive(self):
+        warning = PopupWindow(message = "This patch may have been created using an older version of the audio modding tool and is missing required data. Please select the original game file to load required data.")
+        warning.show()
+        warning.root.wait_window(warning.root)
+        return askopenfilename(title="Select archive")
 
-            workspace = ""
-            # Validate work space # 
-            if "workspace" not in sub_spec:
-                logger.warning("The given spec file is missing field "
-                               "`workspace`. Use the current directory of the "
-                               "given spec file is in instead.")
-                workspace = spec_dir
-            else:
-                workspace = sub_spec["workspace"]
-                # Relative path
-                if not os.path.exists(workspace): 
-                    workspace = os.path.join(spec_dir, workspace) 
-            if not os.path.exists(workspace):
-                showwarning(title="Operation Skipped",
-                            message=f"{workspace} does not exist.")
-                logger.warning(f"{workspace} does not exist. Skipping current"
-                        " entry")
-                continue
+class FileHandler(core.FileHandler):
 
-            # Validate `mapping` format # 
-            mapping: dict[str, list[str] | str] | None
-            if "mapping" not in sub_spec:
-                showwarning(title="Operation Skipped",
-                            message=f"The given spec file is missing field "
-                            "`mapping`")
-                logger.warning("The given spec file is missing field `mapping`. "
-                        "Skipping current entry")
-                continue
-            mapping = sub_spec["mapping"]
-            if mapping == None or not isinstance(mapping, dict):
-                showwarning(title="Operation Skipped",
-                            message="field `mapping` has an invalid data type")
-                logger.warning("field `mapping` has an invalid data type. "
-                        "Skipping current entry")
-                continue
+    def create_file_reader(self):
+        return FileReader()
 
-            suffix: str = ""
-            if "suffix" in sub_spec:
-                if not isinstance(sub_spec["suffix"], str):
-                    logger.warning("`suffix` is not a str. Disable "
-                            "substring filtering")
-                else:
-                    suffix = sub_spec["suffix"]
-            prefix: str = ""
-            if "prefix" in sub_spec:
-                if not isinstance(sub_spec["prefix"], str):
-                    logger.warning("`prefix` is not a str. Disable "
-                            "substring filtering")
-                else:
-                    prefix = sub_spec["prefix"]
-
-            progress_window = ProgressWindow(title="Loading Files",
-                                             max_progress=len(sub_spec.items()))
-            progress_window.show()
-
-            for src, dest in mapping.items():
-                logger.info(f"Loading {src} into {dest}")
-                progress_window.set_text(f"Loading {src} into {dest}")
-
-                src = prefix + src + suffix
-
-                abs_src = os.path.join(workspace, src)
-                if not abs_src.endswith(".wem"):
-                    logger.info("Require import file missing .wem extension. "
-                            "Adding extension.")
-                    abs_src += ".wem"
-                if not os.path.exists(abs_src):
-                    logger.warning(f"Required import file does not exist "
-                            "Skipping the current entry.")
-                    continue
+    def create_progress(self, title, max_progress):
+        return ProgressWindow(title=title, max_progress=max_progress)
 
-                if isinstance(dest, str):
-                    file_id: int | None = self.get_number_prefix(dest)
-                    if file_id == None:
-                        logger.warning(f"{dest} does not contain a valid game "
-                                       "asset file id. Skipping the current "
-                                       "entry.")
-                        continue
-                    audio: str | None = self.get_audio_by_id(file_id)
-                    if audio == None:
-                        logger.warning(f"No audio source is associated with "
-                                       "game asset file id {file_id}. Skipping "
-                                       "the current entry.")
-                        continue
-                    with open(abs_src, "rb") as f:
-                        audio.set_data(f.read())
-                    progress_window.step()
-
-                    patched_ids.append(file_id)
-                elif isinstance(dest, list):
-                    for d in dest:
-                        if not isinstance(d, str):
-                            logger.warning(f"{d} is not a string. Skipping the "
-                                    "current entry.")
-                        file_id: int | None = self.get_number_prefix(d)
-                        if file_id == None:
-                            logger.warning(f"{d} does not contain a valid game "
-                                           "asset file id. Skipping the current "
-                                           "entry.")
-                            continue
-                        audio: str | None = self.get_audio_by_id(file_id)
-                        if audio == None:
-                            logger.warning(f"No audio source is associated with "
-                                    "game asset file id {file_id}. Skipping the "
-                                    "current entry.")
-                            continue
-                        with open(abs_src, "rb") as f:
-                            audio.set_data(f.read())
-                        progress_window.step()
-
-                        patched_ids.append(file_id)
-                else:
-                    logger.warning(f"{dest} is not a string or list of string. "
-                            "Skipping the current entry.")
+    def show_error(self, title, message):
+        showerror(title=title, message=message)
+
+    def show_warning(self, title, message):
+        showwarning(title=title, message=message)
+        
+    def dump_as_wem(self, file_id):
+        output_file = filedialog.asksaveasfilename(title="Save As", initialfile=(str(file_id)+".wem"), defaultextension=".wem", filetypes=[("Wwise Audio", "*.wem")])
+        if not output_file:
+            return
+        super().dump_as_wem(file_id, output_file)
+        
+    def dump_as_wav(self, file_id, muted: bool = False):
+        output_file = filedialog.asksaveasfilename(
+            title="Save As", 
+            initialfile=f"{file_id}.wav", 
+            defaultextension=".wav", 
+            filetypes=[("Wav Audio", "*.wav")]
+        )
 
-            progress_window.destroy()
+        if output_file == "":
+            return
 
-            out: str | None = None
-            if "write_patch_to" not in sub_spec:
-                return
-            out = sub_spec["write_patch_to"]
-            if not isinstance(out, str):
-                showwarning(title="Operation Skipped",
-                            message="field `write_patch_to` has an invalid data "
-                            "type. Write patch operation cancelled.")
-                logger.warning("field `write_patch_to` has an invalid data "
-                               "type. Write patch operation cancelled.")
-                continue
-            if not os.path.exists(out):
-                # Relative path
-                out = os.path.join(spec_dir, out)
-                if not os.path.exists(out):
-                    showwarning(title="Operation Skipped", 
-                                message=f"{out} does not exist. Write patch "
-                                "operation cancelled.")
-                    logger.warning(f"{out} does not exist. Write patch operation "
-                                   "cancelled.")
-                    continue
-            if not self.write_patch(folder=out):
-                showerror(title="Operation Failed",
-                          message="Write patch operation failed. Check "
-                          "log.txt for detailed.")
-            is_revert = "revert" in sub_spec and \
-                    isinstance(sub_spec["revert"], bool) and \
-                    sub_spec["revert"]
-            if is_revert:
-                for patched_id in patched_ids:
-                    self.revert_audio(patched_id)
-            patched_ids.clear()
+        super().dump_as_wav(file_id, output_file, muted=muted)
+        
+    def dump_multiple_as_wem(self, file_ids):
+        folder = filedialog.askdirectory(title="Select folder to save files to")
+        super().dump_multiple_as_wem(file_ids, folder)
+        
+    def dump_multiple_as_wav(self, file_ids: list[str], muted: bool = False,
+                             with_seq: bool = False):
+        folder = filedialog.askdirectory(title="Select folder to save files to")
+        super().dump_multiple_as_wav(file_ids, folder, muted=muted, with_seq=with_seq)
+
+    def dump_all_as_wem(self):
+        folder = filedialog.askdirectory(title="Select folder to save files to")
+        super().dump_all_as_wem(folder)
+    
+    def dump_all_as_wav(self):
+        folder = filedialog.askdirectory(title="Select folder to save files to")
+        super().dump_all_as_wav(folder)
+        
+    def save_archive_file(self):
+        folder = filedialog.askdirectory(title="Select folder to save files to")
+        return super().save_archive_file(folder)
+            
+    def load_archive_file(self, initialdir: str | None = '', archive_file: str | None = None):
+        if archive_file == None:
+            archive_file = askopenfilename(initialdir=initialdir, 
+                                           title="Select archive")
+        return super().load_archive_file(archive_file)
             
-        out: str | None = None
-        if "write_patch_to" not in root_spec:
+    def load_patch(self, patch_file: str | None = None):
+        if patch_file == None:
+            patch_file = filedialog.askopenfilename(title="Choose patch file to import")
+        return super().load_patch(patch_file)
+
+    def write_patch(self, folder=None):
+        if folder == None:
+            folder = filedialog.askdirectory(title="Select folder to save files to")
+        return super().write_patch(folder)
+
+    def load_wems(self, wems: Union[tuple[str, ...], Literal[""], None] = None, set_duration=True): 
+        if wems == None:
+            wems = filedialog.askopenfilenames(title="Choose .wem files to import", filetypes=[("Wwise Vorbis", "*.wem")])
+        if wems == "":
             return
-        out = root_spec["write_patch_to"]
-        if not isinstance(out, str):
-            showerror(title="Operation Failed", message="field `write_patch_to` has an invalid data "
-                        "type. Write patch operation cancelled.")
-            logger.warning("field `write_patch_to` has an invalid data "
-                           "type. Write patch operation cancelled.")
+        super().load_wems(wems, set_duration=set_duration)
+        
+    def load_wavs(self, wavs: list[str] | None = None):
+        if wavs == None:
+            wavs = filedialog.askopenfilenames(title="Choose .wav files to import", filetypes=[("WAV audio", "*.wav")])
+        if wavs == "":
             return
-        if not os.path.exists(out):
-            # Relative path
-            out = os.path.join(spec_dir, out)
-            if not os.path.exists(out):
-                showerror(title="Operation Failed", message=f"{out} does not exist. Write patch "
-                            "operation cancelled.")
-                logger.warning(f"{out} does not exist. Write patch operation "
-                               "cancelled.")
-                return
-        if not self.write_patch(folder=out):
-            showerror(title="Operation Failed", message="Write patch operation failed. Check "
-                            "log.txt for detailed.")
+        super().load_wavs(wavs)
 
-        is_revert = "revert" in root_spec and \
-                isinstance(root_spec["revert"], bool) and \
-                root_spec["revert"]
-        if is_revert:
-            for patched_id in patched_ids:
-                self.revert_audio(patched_id)
-        patched_ids.clear()
+    def load_convert_spec(self):
+        spec_path = filedialog.askopenfilename(title="Choose .spec file to import", 
+                                          filetypes=[("json", "")])
+        if spec_path == "":
+            logger.warning("Import operation cancelled")
+            return
+        super().load_convert_spec(spec_path)
 
+    def load_wems_spec(self):
+        spec_path = filedialog.askopenfilename(title="Choose .spec file to import", 
+                                          filetypes=[("json", "")])
+        if spec_path == "":
+            logger.warning("Import operation cancelled")
+            return
+        super().load_wems_spec(spec_path)
 
 class ProgressWindow:
     def __init__(self, title, max_progress):
@@ -3090,10 +1166,7 @@ class AudioSourceWindow:
                 button.configure(text= '\u23f5')
             else:
                 button.configure(text= '\u23f9')
-            temp = self.audio.data
-            self.audio.data = self.audio.data_OLD
-            self.play(file_id, callback)
-            self.audio.data = temp
+            self.play(file_id, callback, original=True)
         self.play_button.configure(command=partial(press_button, self.play_button, audio.get_short_id(), partial(reset_button_icon, self.play_button)))
         self.play_original_button.configure(command=partial(play_original_audio, self.play_original_button, audio.get_short_id(), partial(reset_button_icon, self.play_original_button)))
         if self.track_info is not None:
@@ -3127,7 +1200,7 @@ class AudioSourceWindow:
             self.end_offset_label.forget()
             self.end_offset_text.forget()
             self.apply_button.forget()
-        if self.audio.modified and self.audio.data_OLD != b"":
+        if self.audio.modified and self.audio.has_replacement_data():
             self.play_original_label.pack(side="right")
             self.play_original_button.pack(side="right")
         else:
@@ -3155,11 +1228,15 @@ class AudioSourceWindow:
         self.update_modified()
         
 class MusicSegmentWindow:
-    def __init__(self, parent, update_modified):
+    def __init__(self, parent, update_modified, play):
         self.frame = Frame(parent)
         self.update_modified = update_modified
+        self.play = play
+        self.fake_image = tkinter.PhotoImage(width=1, height=1)
         
         self.title_label = ttk.Label(self.frame, font=('Segoe UI', 14), anchor="center")
+        self.play_button = ttk.Button(self.frame, text= '\u23f5', image=self.fake_image, compound='c', width=2)
+        self.play_label = ttk.Label(self.frame, font=('Segoe UI', 12), text="Play Segment")
 
         self.duration_text_var = tkinter.StringVar(self.frame)
         self.fade_in_text_var = tkinter.StringVar(self.frame)
@@ -3183,6 +1260,8 @@ class MusicSegmentWindow:
         self.apply_button = ttk.Button(self.frame, text="Apply", command=self.apply_changes)
         
         self.title_label.pack(pady=5)
+        self.play_button.pack(pady=5)
+        self.play_label.pack()
         
         self.duration_label.pack()
         self.duration_text.pack()
@@ -3196,6 +1275,16 @@ class MusicSegmentWindow:
     def set_segment_info(self, segment):
         self.title_label.configure(text=f"Info for Music Segment {segment.get_id()}")
         self.segment = segment
+        self.play_button.configure(text= '\u23f5')
+        def reset_button_icon(button):
+            button.configure(text= '\u23f5')
+        def press_button(button, segment_id, callback):
+            if button['text'] == '\u23f9':
+                button.configure(text= '\u23f5')
+            else:
+                button.configure(text= '\u23f9')
+            self.play(segment_id, callback)
+        self.play_button.configure(command=partial(press_button, self.play_button, segment.get_id(), partial(reset_button_icon, self.play_button)))
         self.duration_text.delete(0, 'end')
         self.fade_in_text.delete(0, 'end')
         self.fade_out_text.delete(0, 'end')
@@ -3294,29 +1383,155 @@ class EventWindow:
         self.track_info.set_data(play_at=float(self.play_at_text_var.get()), begin_trim_offset=float(self.start_offset_text_var.get()), end_trim_offset=float(self.end_offset_text_var.get()), source_duration=float(self.duration_text_var.get()))
         self.update_modified()
 
+class ArchiveLinkWindow:
+    """
+    Lists every archive that contains the given audio sources. Double 
+    clicking an archive (or pressing Open) hands its id to on_open_cb.
+    """
+
+    def __init__(self, 
+                 parent, 
+                 links: dict[int, list[db.HelldiverAudioArchive]],
+                 on_open_cb: Callable[[str], None]):
+        self.parent = parent
+        self.links = links
+        self.on_open_cb = on_open_cb
+
+    def show(self):
+        self.root = tkinter.Toplevel(self.parent)
+        self.root.title("Archives Using Selected Audio")
+        self.root.geometry("560x320")
+        self.frame = Frame(self.root)
+        self.treeview = ttk.Treeview(self.frame, columns=("archive",), 
+                                     show="tree headings", selectmode="browse")
+        self.treeview.heading("#0", text="Name")
+        self.treeview.heading("archive", text="Archive")
+        self.treeview.column("archive", width=160, stretch=False)
+        self.scroll_bar = ttk.Scrollbar(self.frame, orient=VERTICAL, 
+                                        command=self.treeview.yview)
+        self.treeview.configure(yscrollcommand=self.scroll_bar.set)
+        for audio_source_id, archives in self.links.items():
+            text = f"{audio_source_id}.wem"
+            if len(archives) == 0:
+                text += " (not found in any archive)"
+            source_item = self.treeview.insert("", END, text=text, open=True)
+            for archive in sorted(archives, 
+                                  key=lambda archive: archive.audio_archive_name):
+                self.treeview.insert(source_item, END, 
+                                     text=archive.audio_archive_name or 
+                                          archive.audio_archive_id,
+                                     values=(archive.audio_archive_id,))
+        self.treeview.bind("<Double-Button-1>", self.open_selected)
+        self.open_button = ttk.Button(self.root, text="Open", 
+                                      command=self.open_selected)
+        self.scroll_bar.pack(side="right", fill="y")
+        self.treeview.pack(side="left", fill="both", expand=True)
+        self.frame.pack(fill="both", expand=True)
+        self.open_button.pack(pady=4)
+
+    def open_selected(self, event=None):
+        selects = self.treeview.selection()
+        if len(selects) != 1:
+            return
+        values = self.treeview.item(selects[0], option="values")
+        if len(values) != 1:
+            return
+        self.destroy()
+        self.on_open_cb(values[0])
+
+    def destroy(self):
+        self.root.destroy()
+
 """
 Not suggested to use this as a generic autocomplete widget for other searches.
 Currently it's only used specifically for search archive.
 """
+class ArchiveCompleter:
+    """
+    Match engine behind ArchiveSearch. With a lookup store, every non-empty
+    query goes through its archive search index so ranking and the result 
+    limit always apply. Without one, results of the previous query are kept 
+    so that a query which only grows (the previous query is a substring of 
+    it) narrows the previous matches instead of searching from scratch.
+    """
+
+    def __init__(self, 
+                 entries: dict[str, str] = {},
+                 lookup_store: db.LookupStore | None = None,
+                 category: str = "",
+                 limit: int = 50):
+        self.lookup_store = lookup_store
+        self.limit = limit
+        self.set_entries(entries, category)
+
+    def set_entries(self, entries: dict[str, str], category: str = ""):
+        self.entries = entries
+        self.category = category
+        self.query: str | None = None
+        self.matches: list[tuple[str, str]] = []
+        self.complete = False
+
+    @staticmethod
+    def is_match(query: str, archive_id: str, name: str):
+        return archive_id.find(query) != -1 or name.lower().find(query) != -1
+
+    def match(self, query: str) -> list[tuple[str, str]]:
+        """
+        @return (list[tuple[str, str]]): (archive_id, name) of every match. An
+        empty query matches every entry.
+        """
+        if query == self.query:
+            return self.matches
+        if query == "":
+            matches = list(self.entries.items())
+            complete = True
+        elif self.lookup_store != None:
+            archives = self.lookup_store.query_helldiver_audio_archive_search(
+                    query, self.category, self.limit)
+            matches = [(archive.audio_archive_id, archive.audio_archive_name)
+                       for archive in archives]
+            complete = len(matches) < self.limit
+        elif self.complete and self.query and self.query in query:
+            matches = [(archive_id, name) for archive_id, name in self.matches
+                       if self.is_match(query, archive_id, name)]
+            complete = True
+        else:
+            matches = [(archive_id, name) 
+                       for archive_id, name in self.entries.items()
+                       if self.is_match(query, archive_id, name)]
+            complete = True
+        self.query = query
+        self.matches = matches
+        self.complete = complete
+        return matches
+
 class ArchiveSearch(ttk.Entry):
 
     ignore_keys: list[str] = ["Up", "Down", "Left", "Right", "Escape", "Return"]
+    result_limit: int = 50
+    debounce_ms: int = 80
+    page_size: int = 100
 
     def __init__(self, 
                  fmt: str,
                  entries: dict[str, str] = {}, 
                  on_select_cb: Callable[[Any], None] | None = None,
                  master: Misc | None = None,
+                 lookup_store: db.LookupStore | None = None,
                  **options):
         super().__init__(master, **options)
 
         self.on_select_cb = on_select_cb
-        self.entries = entries
         self.fmt = fmt
+        self.completer = ArchiveCompleter(entries, lookup_store, 
+                                          limit=self.result_limit)
 
         self.cmp_root: tkinter.Toplevel | None = None
         self.cmp_list: tkinter.Listbox | None = None
         self.cmp_scrollbar: ttk.Scrollbar | None = None
+        self.cmp_matches: list[tuple[str, str]] = []
+        self.cmp_offset = 0
+        self.refresh_id: str | None = None
 
         self.bind("<Key>", self.on_key_release)
         self.bind("<FocusOut>", self.on_focus_out)
@@ -3334,7 +1549,15 @@ class ArchiveSearch(ttk.Entry):
     def on_key_release(self, event: tkinter.Event):
         if event.keysym in self.ignore_keys:
             return
-        query = self.get().lower()
+        # Debounce bursts of keystrokes. This also lets the entry apply the 
+        # key before the query is read.
+        if self.refresh_id != None:
+            self.after_cancel(self.refresh_id)
+        self.refresh_id = self.after(self.debounce_ms, self.refresh_cmp)
+
+    def refresh_cmp(self):
+        self.refresh_id = None
+        matches = self.completer.match(self.get().lower())
 
         if self.cmp_root != None:
             if self.cmp_list == None:
@@ -3342,78 +1565,109 @@ class ArchiveSearch(ttk.Entry):
                         "cmp_list should not be None with cmp_root still" \
                         "active", stack_info=True)
                 self.cmp_root.destroy()
+                self.cmp_root = None
                 return
-            archives = []
-            if query == "":
-                archives = [self.fmt.format(k, v) 
-                            for k, v in self.entries.items()]
-            else:
-                unique: set[str] = set()
-                for archive_id, tag in self.entries.items():
-                    match = archive_id.find(query) != -1 or \
-                            tag.lower().find(query) != -1
-                    if not match or archive_id in unique:
-                        continue
-                    archives.append(self.fmt.format(archive_id, tag))
-                    unique.add(archive_id)
-            self.cmp_list.delete(0, tkinter.END)
-            for archive in archives:
-                self.cmp_list.insert(tkinter.END, archive)
-            height="128"
-            if len(archives) < 7:
-                height=str(2+18*len(archives))
-                try:
-                    self.cmp_scrollbar.pack_forget()
-                except:
-                    pass
-            elif len(archives) > 7:
-                try:
-                    self.cmp_scrollbar.pack(side="left", fill="y")
-                except:
-                    pass
-            self.cmp_root.geometry(f"{self.winfo_width()}x{height}")
-            self.cmp_list.selection_clear(0, tkinter.END)
-            self.cmp_list.selection_set(0)
-            return
-
-        archives = []
-        if query == "":
-            archives = [self.fmt.format(k, v) for k, v in self.entries.items()]
         else:
-            unique: set[str] = set()
-            for archive_id, tag in self.entries.items():
-                match = archive_id.find(query) != -1 or tag.lower().find(query) != -1
-                if not match or archive_id in unique:
-                    continue
-                archives.append(self.fmt.format(archive_id, tag))
-                unique.add(archive_id)
+            self.create_cmp()
 
+        self.render_cmp(matches)
+
+    def create_cmp(self):
         self.cmp_root = tkinter.Toplevel(self)
         self.cmp_root.wm_overrideredirect(True) # Hide title bar
-        
 
         self.cmp_list = tkinter.Listbox(self.cmp_root, borderwidth=1)
-
         self.cmp_list.pack(side=tkinter.LEFT, fill=tkinter.BOTH, expand=True)
         
-        if len(archives) > 7:
-            self.cmp_scrollbar = ttk.Scrollbar(self.cmp_root, orient=VERTICAL)
-            self.cmp_scrollbar.pack(side="left", fill="y")
-            self.cmp_list.configure(yscrollcommand=self.cmp_scrollbar.set)
-            self.cmp_scrollbar['command'] = self.cmp_list.yview
+        self.cmp_scrollbar = ttk.Scrollbar(self.cmp_root, orient=VERTICAL)
+        self.cmp_list.configure(yscrollcommand=self.on_cmp_scroll)
+        self.cmp_scrollbar['command'] = self.on_scrollbar
 
-        for archive in archives:
-            self.cmp_list.insert(tkinter.END, archive)
+        self.cmp_list.bind("<Double-Button-1>", self.on_return)
+        self.cmp_root.geometry(f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
 
-        self.cmp_list.selection_set(0)
+    def render_cmp(self, matches: list[tuple[str, str]]):
+        """
+        The list box holds a window of at most page_size matches starting at 
+        cmp_offset. The window slides as the list is scrolled (see 
+        render_window) so the number of rows stays fixed however many matches
+        there are.
+        """
+        self.cmp_matches = matches
+        self.render_window(0)
 
-        self.cmp_list.bind("<Double-Button-1>", self.on_return)
         height="128"
-        if len(archives) < 7:
-            height=str(2+18*len(archives))
+        if len(matches) < 7:
+            height=str(2+18*len(matches))
+            self.cmp_scrollbar.pack_forget()
+        elif len(matches) > 7:
+            self.cmp_scrollbar.pack(side="left", fill="y")
         self.cmp_root.geometry(f"{self.winfo_width()}x{height}")
-        self.cmp_root.geometry(f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
-        
+        self.cmp_list.selection_clear(0, tkinter.END)
+        self.cmp_list.selection_set(0)
+
+    def render_window(self, offset: int, top: int | None = None) -> int:
+        """
+        Replace the rows of the list box with the matches starting at offset.
+        @param top: index into cmp_matches to scroll to the top of the view
+        @return (int): how far the window moved
+        """
+        if self.cmp_list == None:
+            return 0
+        offset = max(0, min(offset, len(self.cmp_matches) - self.page_size))
+        delta = offset - self.cmp_offset
+        selects = [self.cmp_offset + i for i in self.cmp_list.curselection()]
+        self.cmp_offset = offset
+        self.cmp_list.delete(0, tkinter.END)
+        end = min(offset + self.page_size, len(self.cmp_matches))
+        if end > offset:
+            self.cmp_list.insert(tkinter.END, *[
+                self.fmt.format(archive_id, name) 
+                for archive_id, name in self.cmp_matches[offset:end]
+            ])
+        for select in selects:
+            if offset <= select < end:
+                self.cmp_list.selection_set(select - offset)
+        if top != None:
+            self.cmp_list.yview(max(0, top - offset))
+        return delta
+
+    def slide_window(self, step: int) -> int:
+        """
+        Move the window by step rows while keeping the same rows in view.
+        @return (int): how far the window moved
+        """
+        top = self.cmp_offset + self.cmp_list.nearest(0)
+        return self.render_window(self.cmp_offset + step, top)
+
+    def on_cmp_scroll(self, first: str, last: str):
+        total = len(self.cmp_matches)
+        if self.cmp_scrollbar != None and total > 0:
+            rendered = self.cmp_list.size() if self.cmp_list != None else 0
+            self.cmp_scrollbar.set(
+                (self.cmp_offset + float(first) * rendered) / total,
+                (self.cmp_offset + float(last) * rendered) / total
+            )
+        if self.cmp_list == None:
+            return
+        if float(last) >= 1.0 and \
+                self.cmp_offset + self.cmp_list.size() < total:
+            self.slide_window(self.page_size // 2)
+        elif float(first) <= 0.0 and self.cmp_offset > 0:
+            self.slide_window(-(self.page_size // 2))
+
+    def on_scrollbar(self, action: str, *args):
+        """
+        The scroll bar spans every match, not only the rendered window.
+        """
+        if self.cmp_list == None:
+            return
+        if action == "moveto":
+            top = int(float(args[0]) * len(self.cmp_matches))
+            self.render_window(top - self.page_size // 2, top)
+        else:
+            self.cmp_list.yview(action, *args)
+
     def error_check(self):
         if self.cmp_root == None:
             return 1
@@ -3434,7 +1688,13 @@ class ArchiveSearch(ttk.Entry):
             return
         curr_select = self.cmp_list.curselection()
         curr_idx = curr_select[0]
-        prev_idx = (curr_idx - 1) % self.cmp_list.size()
+        if curr_idx == 0:
+            if self.cmp_offset > 0:
+                curr_idx -= self.slide_window(-(self.page_size // 2))
+            else:
+                self.render_window(len(self.cmp_matches))
+                curr_idx = self.cmp_list.size()
+        prev_idx = curr_idx - 1
         self.cmp_list.selection_clear(0, tkinter.END)
         self.cmp_list.selection_set(prev_idx)
         self.cmp_list.activate(prev_idx)
@@ -3446,7 +1706,13 @@ class ArchiveSearch(ttk.Entry):
             return
         curr_select = self.cmp_list.curselection()
         curr_idx = curr_select[0]
-        next_idx = (curr_idx + 1) % self.cmp_list.size()
+        if curr_idx + 1 == self.cmp_list.size():
+            if self.cmp_offset + curr_idx + 1 < len(self.cmp_matches):
+                curr_idx -= self.slide_window(self.page_size // 2)
+            else:
+                self.render_window(0)
+                curr_idx = -1
+        next_idx = curr_idx + 1
         self.cmp_list.selection_clear(0, tkinter.END)
         self.cmp_list.selection_set(next_idx)
         self.cmp_list.activate(next_idx)
@@ -3454,6 +1720,10 @@ class ArchiveSearch(ttk.Entry):
         return "break" # Prevent default like in JS
 
     def on_return(self, _: tkinter.Event):
+        # Flush a pending refresh so the selection matches what was typed
+        if self.refresh_id != None:
+            self.after_cancel(self.refresh_id)
+            self.refresh_cmp()
         if self.error_check() != 0:
             return
         curr_select = self.cmp_list.curselection()
@@ -3467,6 +1737,10 @@ class ArchiveSearch(ttk.Entry):
         self.on_select_cb(value)
 
     def destroy_cmp(self, _: tkinter.Event | None):
+        if self.refresh_id != None:
+            self.after_cancel(self.refresh_id)
+            self.refresh_id = None
+
         if self.cmp_list != None:
             self.cmp_list.destroy()
             self.cmp_list = None
@@ -3484,14 +1758,21 @@ class ArchiveSearch(ttk.Entry):
         if new_focus != self.cmp_list and new_focus != self.cmp_root:
             self.destroy_cmp(None)
 
-    def set_entries(self, entries: dict[str, str], fmt: str | None = None):
+    def set_entries(self, 
+                    entries: dict[str, str], 
+                    fmt: str | None = None,
+                    category: str | None = None):
         if fmt != None:
             self.fmt = fmt
-        self.entries = entries
+        if category == None:
+            category = self.completer.category
+        self.completer.set_entries(entries, category)
         self.delete(0, tkinter.END)
 
 class MainWindow:
 
+    prefetch_count = 4
+
     dark_mode_bg = "#333333"
     dark_mode_fg = "#ffffff"
     dark_mode_modified_bg = "#ffffff"
@@ -3532,7 +1813,7 @@ class MainWindow:
         self.search_text_var = tkinter.StringVar(self.root)
         self.search_bar = ttk.Entry(self.top_bar, textvariable=self.search_text_var, font=('Segoe UI', 14))
         self.top_bar.pack(side="top", fill='x')
-        if lookup_store != None and os.path.exists(GAME_FILE_LOCATION):
+        if lookup_store != None and os.path.exists(core.GAME_FILE_LOCATION):
             self.init_archive_search_bar()
 
         self.up_button = ttk.Button(self.top_bar, text='\u25b2',
@@ -3594,7 +1875,8 @@ class MainWindow:
         self.string_info_panel = StringEntryWindow(self.entry_info_panel,
                                                    self.check_modified)
         self.segment_info_panel = MusicSegmentWindow(self.entry_info_panel,
-                                                     self.check_modified)
+                                                     self.check_modified,
+                                                     self.play_segment)
                                                      
         self.window.add(self.treeview_panel)
         self.window.add(self.entry_info_panel)
@@ -3631,7 +1913,7 @@ class MainWindow:
         self.recent_file_menu = Menu(self.file_menu, tearoff=0)
 
         self.load_archive_menu = Menu(self.menu, tearoff=0)
-        if os.path.exists(GAME_FILE_LOCATION):
+        if os.path.exists(core.GAME_FILE_LOCATION):
             self.load_archive_menu.add_command(
                 label="From HD2 Data Folder",
                 command=lambda: self.load_archive(initialdir=self.app_state.game_data_path)
@@ -3662,7 +1944,7 @@ class MainWindow:
             command=lambda: self.file_handler.load_wems_spec() or 
                 self.check_modified()
         )
-        if os.path.exists(WWISE_CLI):
+        if os.path.exists(core.WWISE_CLI):
             self.import_menu.add_command(
                 label="Import using spec.json (.wav)",
                 command=lambda: self.file_handler.load_convert_spec() or 
@@ -3692,7 +1974,7 @@ class MainWindow:
         self.edit_menu.add_command(label="Revert All Changes", command=self.revert_all)
         
         self.dump_menu = Menu(self.menu, tearoff=0)
-        if os.path.exists(VGMSTREAM):
+        if os.path.exists(core.VGMSTREAM):
             self.dump_menu.add_command(label="Dump all as .wav", command=self.dump_all_as_wav)
         self.dump_menu.add_command(label="Dump all as .wem", command=self.dump_all_as_wem)
         
@@ -3963,7 +2245,7 @@ class MainWindow:
         
     def import_audio_files(self):
         
-        if os.path.exists(WWISE_CLI):
+        if os.path.exists(core.WWISE_CLI):
             available_filetypes = [("Audio Files", "*.wem *.wav *.mp3 *.ogg *.m4a")]
         else:
             available_filetypes = [("Wwise Vorbis", "*.wem")]
@@ -3979,7 +2261,7 @@ class MainWindow:
         others = [file for file in files if os.path.splitext(file)[1] in [".mp3", ".ogg", ".m4a"]]
         temp_files = []
         for file in others:
-            process = subprocess.run([VGMSTREAM, "-o", f"{os.path.join(CACHE, os.path.splitext(os.path.basename(file))[0])}.wav", file], stdout=subprocess.DEVNULL)
+            process = subprocess.run([core.VGMSTREAM, "-o", f"{os.path.join(CACHE, os.path.splitext(os.path.basename(file))[0])}.wav", file], stdout=subprocess.DEVNULL)
             if process.returncode != 0:
                 logger.error(f"Encountered error when importing {os.path.basename(file)}")
             else:
@@ -4033,6 +2315,7 @@ class MainWindow:
                                             entries=entries,
                                             on_select_cb=self.on_archive_search_bar_return,
                                             master=self.top_bar,
+                                            lookup_store=self.lookup_store,
                                             width=64)
         categories = self.lookup_store.query_helldiver_audio_archive_category()
         categories = [""] + categories
@@ -4066,12 +2349,12 @@ class MainWindow:
                 archive.audio_archive_id: archive.audio_archive_name 
                 for archive in archives
         }
-        self.archive_search.set_entries(entries)
+        self.archive_search.set_entries(entries, category=category)
         self.archive_search.focus_set()
         self.category_search.selection_clear()
         
     def targeted_import(self, target):
-        if os.path.exists(WWISE_CLI):
+        if os.path.exists(core.WWISE_CLI):
             available_filetypes = [("Audio Files", "*.wem *.wav *.mp3 *.ogg *.m4a")]
         else:
             available_filetypes = [("Wwise Vorbis", "*.wem")]
@@ -4120,7 +2403,7 @@ class MainWindow:
                     label=("Dump As .wem" if is_single else "Dump Selected As .wem"),
                     command=self.dump_as_wem
                 )
-                if os.path.exists(VGMSTREAM):
+                if os.path.exists(core.VGMSTREAM):
                     self.right_click_menu.add_command(
                         label=("Dump As .wav" if is_single else "Dump Selected As .wav"),
                         command=self.dump_as_wav,
@@ -4137,6 +2420,12 @@ class MainWindow:
                     label="Dump muted .wav with same ID and sequence number",
                     command=lambda: self.dump_as_wav(muted=True, with_seq=True)
                 )
+                if self.lookup_store != None:
+                    self.right_click_menu.add_command(
+                        label=("Find Archives Using This Audio" if is_single 
+                               else "Find Archives Using Selected Audio"),
+                        command=self.show_linked_archives
+                    )
             self.right_click_menu.tk_popup(event.x_root, event.y_root)
         except (AttributeError, IndexError):
             pass
@@ -4174,10 +2463,9 @@ class MainWindow:
                 self.sound_handler.play_audio(os.path.basename(os.path.splitext(values[0])[0]), audio_data)
 
     def set_language(self):
-        global language
-        old_language = language
-        language = language_lookup(self.selected_language.get())
-        if language != old_language:
+        old_language = core.language
+        core.language = language_lookup(self.selected_language.get())
+        if core.language != old_language:
             if self.selected_view.get() == "SourceView":
                 self.create_source_view()
             else:
@@ -4214,6 +2502,7 @@ class MainWindow:
         elif selection_type == "Audio Source":
             self.audio_info_panel.set_audio(self.file_handler.get_audio_by_id(selection_id))
             self.audio_info_panel.frame.pack()
+            self.prefetch_neighbours(self.treeview.selection()[0])
         elif selection_type == "Event":
             self.event_info_panel.set_track_info(self.file_handler.get_event_by_id(selection_id))
             self.event_info_panel.frame.pack()
@@ -4225,6 +2514,25 @@ class MainWindow:
         elif selection_type == "Text Bank":
             pass
 
+    def prefetch_neighbours(self, item):
+        """
+        Pre-decode the selected audio source, the next `prefetch_count` 
+        audio sources under the same parent and the previous one, so that 
+        stepping through a bank plays back without waiting on vgmstream.
+        """
+        siblings = self.treeview.get_children(self.treeview.parent(item))
+        index = siblings.index(item)
+        def is_audio_source(i):
+            return self.treeview.item(i, option="values")[0] == "Audio Source"
+        following = [i for i in siblings[index+1:] if is_audio_source(i)][:self.prefetch_count]
+        previous = [i for i in siblings[:index] if is_audio_source(i)][-1:]
+        sources = []
+        for i in [item] + following + previous:
+            audio = self.file_handler.get_audio_by_id(int(self.treeview.item(i, option="tags")[0]))
+            if audio is not None:
+                sources.append(audio)
+        self.sound_handler.prefetch_audio(sources)
+
     def copy_id(self):
         self.root.clipboard_clear()
         self.root.clipboard_append("\n".join([self.treeview.item(i, option="tags")[0] for i in self.treeview.selection()]))
@@ -4246,6 +2554,20 @@ class MainWindow:
             with_seq=with_seq
         )
 
+    def show_linked_archives(self):
+        if self.lookup_store == None:
+            return
+        audio_source_ids = [int(self.treeview.item(i, option="tags")[0]) 
+                            for i in self.treeview.selection()]
+        links = self.lookup_store.query_helldiver_audio_archive_by_sources(
+                audio_source_ids)
+        ArchiveLinkWindow(self.root, links, self.open_linked_archive).show()
+
+    def open_linked_archive(self, audio_archive_id: str):
+        archive_file = os.path.join(self.app_state.game_data_path, 
+                                    audio_archive_id)
+        self.load_archive(initialdir="", archive_file=archive_file)
+
     def create_treeview_entry(self, entry, parentItem=""):
         if entry is None: return
         tree_entry = self.treeview.insert(parentItem, END, tag=entry.get_id())
@@ -4314,10 +2636,10 @@ class MainWindow:
                     if hierarchy_entry.sources[0].plugin_id == VORBIS:
                         self.create_treeview_entry(self.file_handler.get_audio_by_id(hierarchy_entry.sources[0].source_id), bank_entry)
         for entry in self.file_handler.file_reader.text_banks.values():
-            if entry.language == language:
+            if entry.language == core.language:
                 e = self.create_treeview_entry(entry)
                 for string_id in entry.string_ids:
-                    self.create_treeview_entry(self.file_handler.file_reader.string_entries[language][string_id], e)
+                    self.create_treeview_entry(self.file_handler.file_reader.string_entries[core.language][string_id], e)
         self.check_modified()
                 
     def create_source_view(self):
@@ -4334,10 +2656,10 @@ class MainWindow:
                         existing_sources.add(source.source_id)
                         self.create_treeview_entry(self.file_handler.get_audio_by_id(source.source_id), bank_entry)
         for entry in self.file_handler.file_reader.text_banks.values():
-            if entry.language == language:
+            if entry.language == core.language:
                 e = self.create_treeview_entry(entry)
                 for string_id in entry.string_ids:
-                    self.create_treeview_entry(self.file_handler.file_reader.string_entries[language][string_id], e)
+                    self.create_treeview_entry(self.file_handler.file_reader.string_entries[core.language][string_id], e)
         self.check_modified()
                 
     def recursive_match(self, search_text_var, item):
@@ -4490,7 +2812,7 @@ class MainWindow:
                     parent = self.treeview.parent(parent)
                     
         try:
-            for string in self.file_handler.get_strings()[language].values():
+            for string in self.file_handler.get_strings()[core.language].values():
                 bg, fg = self.get_colors(modified=string.modified)
                 self.treeview.tag_configure(string.get_id(), 
                                             background=bg,
@@ -4527,9 +2849,23 @@ class MainWindow:
         self.sound_handler.kill_sound()
         self.file_handler.dump_all_as_wav()
         
-    def play_audio(self, file_id: int, callback=None):
+    def play_audio(self, file_id: int, callback=None, original: bool = False):
         audio = self.file_handler.get_audio_by_id(file_id)
-        self.sound_handler.play_audio(audio.get_short_id(), audio.get_data(), callback)
+        if original:
+            data = audio.get_original_data()
+            key = content_hash(data)
+        else:
+            data = audio.get_data()
+            key = audio.get_content_hash()
+        self.sound_handler.play_audio(audio.get_short_id(), data, callback, key)
+        
+    def play_segment(self, segment_id: int, callback=None):
+        segment = self.file_handler.get_music_segment_by_id(segment_id)
+        if segment is None:
+            return
+        sources = [(audio.get_short_id(), audio.get_data(), audio.get_content_hash(), info)
+                   for audio, info in self.file_handler.get_music_segment_sources(segment)]
+        self.sound_handler.play_segment(segment_id, sources, callback)
         
     def revert_audio(self, file_id):
         self.file_handler.revert_audio(file_id)
@@ -4555,62 +2891,31 @@ if __name__ == "__main__":
     if app_state == None:
         exit(1)
 
-    GAME_FILE_LOCATION = app_state.game_data_path
-
     try:
-        if not os.path.exists(CACHE):
-            os.mkdir(CACHE, mode=0o777)
+        core.configure_environment(app_state.game_data_path)
     except Exception as e:
         showerror("Error when initiating application", 
                     "Failed to create application caching space")
         exit(1)
 
-    SYSTEM = platform.system()
-    if SYSTEM == "Windows":
-        VGMSTREAM = "vgmstream-win64/vgmstream-cli.exe"
-        FFMPEG = "ffmpeg.exe"
-        try:
-            WWISE_CLI = os.path.join(os.environ["WWISEROOT"],
-                             "Authoring\\x64\\Release\\bin\\WwiseConsole.exe")
-        except:
-            pass
-    elif SYSTEM == "Linux":
-        VGMSTREAM = "vgmstream-linux/vgmstream-cli"
-        FFMPEG = "ffmpeg"
-        WWISE_CLI = ""
+    if core.SYSTEM == "Linux":
         showwarning(title="Unsupported", message="Wwise integration is not " \
             "supported for Linux. WAV file import is disabled")
-    elif SYSTEM == "Darwin":
-        VGMSTREAM = "vgmstream-macos/vgmstream-cli"
-        FFMPEG = "ffmpeg"
-        try:
-            p = next(pathlib.Path("/Applications/Audiokinetic").glob("Wwise*"))
-            WWISE_CLI = os.path.join(p, "Wwise.app/Contents/Tools/WwiseConsole.sh")
-        except:
-            pass
-    
-    if os.path.exists(WWISE_CLI):
-        if "Wwise2024" in WWISE_CLI:
-            WWISE_VERSION = "2024"
-        elif "Wwise2023" in WWISE_CLI:
-            WWISE_VERSION = "2023"
-    else:
-        WWISE_VERSION = ""
         
-    if not os.path.exists(VGMSTREAM):
+    if not os.path.exists(core.VGMSTREAM):
         logger.error("Cannot find vgmstream distribution! " \
-                     f"Ensure the {os.path.dirname(VGMSTREAM)} folder is " \
+                     f"Ensure the {os.path.dirname(core.VGMSTREAM)} folder is " \
                      "in the same folder as the executable")
         showwarning(title="Missing Plugin", message="Cannot find vgmstream distribution! " \
                     "Audio playback is disabled.")
                      
-    if not os.path.exists(WWISE_CLI) and SYSTEM != "Linux":
+    if not os.path.exists(core.WWISE_CLI) and core.SYSTEM != "Linux":
         logger.warning("Wwise installation not found. WAV file import is disabled.")
         showwarning(title="Missing Plugin", message="Wwise installation not found. WAV file import is disabled.")
     
-    if os.path.exists(WWISE_CLI) and not os.path.exists(DEFAULT_WWISE_PROJECT):
+    if os.path.exists(core.WWISE_CLI) and not os.path.exists(DEFAULT_WWISE_PROJECT):
         process = subprocess.run([
-            WWISE_CLI,
+            core.WWISE_CLI,
             "create-new-project",
             DEFAULT_WWISE_PROJECT,
             "--platform",
@@ -4620,11 +2925,11 @@ if __name__ == "__main__":
         if process.returncode != 0:
             logger.error("Error creating Wwise project. Audio import restricted to .wem files only")
             showwarning(title="Wwise Error", message="Error creating Wwise project. Audio import restricted to .wem files only")
-            WWISE_CLI = ""
+            core.WWISE_CLI = ""
 
     lookup_store: db.LookupStore | None = None
     
-    if not os.path.exists(GAME_FILE_LOCATION):
+    if not os.path.exists(core.GAME_FILE_LOCATION):
         showwarning(title="Missing Game Data", message="No folder selected for Helldivers data folder." \
             " Audio archive search is disabled.")
     elif os.path.exists("hd_audio_db.db"):
@@ -4642,12 +2947,23 @@ if __name__ == "__main__":
                 "Please refer to the information in Google spreadsheet.")
         showwarning(title="Missing Plugin", message="Audio database not found. Audio archive search is disabled.")
         
-    language = language_lookup("English (US)")
+    core.language = language_lookup("English (US)")
     sound_handler = SoundHandler()
     file_handler = FileHandler()
     window = MainWindow(app_state, lookup_store, file_handler, sound_handler)
     
     app_state.save_config()
 
+    sound_handler.close()
+
     if os.path.exists(CACHE):
-        shutil.rmtree(CACHE)
\ No newline at end of file
+        for entry in os.scandir(CACHE):
+            if entry.path in (ARCHIVE_CACHE, PCM_CACHE):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
@@ -0,0 +1,3677 @@
+import functools
+import gc
+import hashlib
+import io
+import json
+import mmap
+import numpy
+import os
+import pathlib
+import pickle
+import platform
+import subprocess
+import threading
+import struct
+import shutil
+import sys
+import weakref
+import xml.etree.ElementTree as etree
+import zlib
+
+from itertools import takewhile
+from math import ceil
+from typing import Any, Union
+
+from log import logger
+
+# constants
+MUSIC_TRACK = 11
+SOUND = 2
+BANK = 0
+PREFETCH_STREAM = 1
+STREAM = 2
+VORBIS = 0x00040001
+REV_AUDIO = 0x01A01052
+WWISE_BANK = 6006249203084351385
+WWISE_DEP = 12624162998411505776
+WWISE_STREAM = 5785811756662211598
+STRING = 979299457696010195
+LANGUAGE_MAPPING = ({
+    "English (US)" : 0x03f97b57,
+    "English (UK)" : 0x6f4515cb,
+    "Français" : 4271961631,
+    "Português 1": 1861586415,
+    "Português 2": 1244441033,
+    "Polski": 260593578,
+    "日本語": 2427891497,
+    "中文（繁體）": 2663028010,
+    "中文（简体）": 2189905090,
+    "Nederlands": 291057413,
+    "한국어": 3151476177,
+    "Español 1": 830498882,
+    "Español 2": 3854981686,
+    "Deutsch": 3124347884,
+    "Italiano": 3808107213,
+    "Русский": 3317373165
+})
+
+# precompiled codecs for fixed-size records
+INT8_STRUCT = struct.Struct("<b")
+UINT8_STRUCT = struct.Struct("<B")
+INT16_STRUCT = struct.Struct("<h")
+UINT16_STRUCT = struct.Struct("<H")
+INT32_STRUCT = struct.Struct("<i")
+UINT32_STRUCT = struct.Struct("<I")
+INT64_STRUCT = struct.Struct("<q")
+UINT64_STRUCT = struct.Struct("<Q")
+TOC_HEADER_STRUCT = struct.Struct("<QQQQQQQIIIIII") # 80 bytes
+TOC_TYPE_STRUCT = struct.Struct("<QQQII") # 32 bytes
+CHUNK_HEADER_STRUCT = struct.Struct("<4sI") # 8 bytes
+DIDX_ENTRY_STRUCT = struct.Struct("<III") # 12 bytes
+BANK_SOURCE_STRUCT = struct.Struct("<IBIIB") # 14 bytes
+TRACK_INFO_STRUCT = struct.Struct("<IIIdddd") # 44 bytes
+DIDX_ENTRY_DTYPE = numpy.dtype([
+    ("id", "<u4"),
+    ("offset", "<u4"),
+    ("size", "<u4"),
+]) # same layout as DIDX_ENTRY_STRUCT
+TOC_HEADER_DTYPE = numpy.dtype([
+    ("file_id", "<u8"),
+    ("type_id", "<u8"),
+    ("toc_data_offset", "<u8"),
+    ("stream_file_offset", "<u8"),
+    ("gpu_resource_offset", "<u8"),
+    ("unknown1", "<u8"),
+    ("unknown2", "<u8"),
+    ("toc_data_size", "<u4"),
+    ("stream_size", "<u4"),
+    ("gpu_resource_size", "<u4"),
+    ("unknown3", "<u4"),
+    ("unknown4", "<u4"),
+    ("entry_index", "<u4"),
+]) # same layout as TOC_HEADER_STRUCT
+
+# constants (set once on runtime)
+DIR = os.path.dirname(__file__)
+if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+    DIR = os.path.dirname(sys.argv[0])
+FFMPEG = ""
+VGMSTREAM = ""
+GAME_FILE_LOCATION = ""
+WWISE_CLI = ""
+WWISE_VERSION = ""
+DEFAULT_WWISE_PROJECT = os.path.join(DIR, "AudioConversionTemplate/AudioConversionTemplate.wproj") 
+DEFAULT_CONVERSION_SETTING = "Vorbis Quality High"
+SYSTEM = ""
+CACHE = os.path.join(DIR, ".cache")
+ARCHIVE_CACHE = os.path.join(CACHE, "archives")
+ARCHIVE_CACHE_VERSION = 3
+PCM_CACHE = os.path.join(CACHE, "pcm")
+
+# global variables
+language = 0
+
+def language_lookup(lang_string):
+    try:
+        return LANGUAGE_MAPPING[lang_string]
+    except:
+        return int(lang_string)
+    
+def configure_environment(game_data_path: str = "", vgmstream: str = ""):
+    """
+    Resolve the platform specific tool paths and create the cache folder.
+    Shared by every entry point (GUI and CLIs). Raises OSError when the cache
+    folder cannot be created.
+    """
+    global GAME_FILE_LOCATION, SYSTEM, VGMSTREAM, FFMPEG, WWISE_CLI, WWISE_VERSION
+
+    if game_data_path:
+        GAME_FILE_LOCATION = game_data_path
+
+    if not os.path.exists(CACHE):
+        os.mkdir(CACHE, mode=0o777)
+
+    SYSTEM = platform.system()
+    if SYSTEM == "Windows":
+        VGMSTREAM = "vgmstream-win64/vgmstream-cli.exe"
+        FFMPEG = "ffmpeg.exe"
+        try:
+            WWISE_CLI = os.path.join(os.environ["WWISEROOT"],
+                        "Authoring\\x64\\Release\\bin\\WwiseConsole.exe")
+        except:
+            pass
+    elif SYSTEM == "Linux":
+        VGMSTREAM = "vgmstream-linux/vgmstream-cli"
+        FFMPEG = "ffmpeg"
+        WWISE_CLI = ""
+    elif SYSTEM == "Darwin":
+        VGMSTREAM = "vgmstream-macos/vgmstream-cli"
+        FFMPEG = "ffmpeg"
+        try:
+            p = next(pathlib.Path("/Applications/Audiokinetic").glob("Wwise*"))
+            WWISE_CLI = os.path.join(p, "Wwise.app/Contents/Tools/WwiseConsole.sh")
+        except:
+            pass
+
+    if vgmstream:
+        VGMSTREAM = vgmstream
+
+    if os.path.exists(WWISE_CLI):
+        if "Wwise2024" in WWISE_CLI:
+            WWISE_VERSION = "2024"
+        elif "Wwise2023" in WWISE_CLI:
+            WWISE_VERSION = "2023"
+    else:
+        WWISE_VERSION = ""
+
+def strip_patch_index(filename):
+    split = filename.split(".")
+    for n in range(len(split)):
+        if "patch_" in split[n]:
+            del split[n]
+            break
+    filename = ".".join(split)
+    return filename
+
+class MemoryStream:
+    '''
+    Modified from https://github.com/kboykboy2/io_scene_helldivers2 with permission from kboykboy
+
+    When `readonly` is set, the stream is backed by a memoryview of `Data`
+    instead of a private bytearray copy. `read` then returns views into the
+    original buffer and the integer helpers unpack in place, so nothing is
+    copied until a caller explicitly asks for it.
+    '''
+    def __init__(self, Data=b"", io_mode = "read", readonly = False):
+        self.location = 0
+        self.readonly = readonly
+        if readonly:
+            self.data = memoryview(Data).cast("B")
+        else:
+            self.data = bytearray(Data)
+        self.io_mode = io_mode
+        self.endian = "<"
+
+    def open(self, Data, io_mode = "read", readonly = False): # Open Stream
+        self.readonly = readonly
+        if readonly:
+            self.data = memoryview(Data).cast("B")
+        else:
+            self.data = bytearray(Data)
+        self.io_mode = io_mode
+
+    def set_read_mode(self):
+        self.io_mode = "read"
+
+    def set_write_mode(self):
+        self.io_mode = "write"
+
+    def is_reading(self):
+        return self.io_mode == "read"
+
+    def is_writing(self):
+        return self.io_mode == "write"
+
+    def is_readonly(self):
+        return self.readonly
+
+    def close(self):
+        """
+        Release the view of a read-only stream so the buffer behind it (e.g. 
+        an mmap) can be closed. The stream is empty afterwards.
+        """
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        self.data = bytearray()
+        self.location = 0
+
+    def seek(self, location): # Go To Position In Stream
+        self.location = location
+        if self.location > len(self.data) and not self.readonly:
+            missing_bytes = self.location - len(self.data)
+            self.data += bytearray(missing_bytes)
+
+    def tell(self): # Get Position In Stream
+        return self.location
+
+    def read(self, length=-1): # read Bytes From Stream
+        if length == -1:
+            length = len(self.data) - self.location
+        if self.location + length > len(self.data):
+            raise Exception("reading past end of stream")
+
+        newData = self.data[self.location:self.location+length]
+        self.location += length
+        return newData
+        
+    def advance(self, offset):
+        self.location += offset
+        if self.location < 0:
+            self.location = 0
+        if self.location > len(self.data) and not self.readonly:
+            missing_bytes = self.location - len(self.data)
+            self.data += bytearray(missing_bytes)
+
+    def write(self, bytes): # Write Bytes To Stream
+        if self.readonly:
+            raise Exception("writing to read-only stream")
+        length = len(bytes)
+        if self.location + length > len(self.data):
+            missing_bytes = (self.location + length) - len(self.data)
+            self.data += bytearray(missing_bytes)
+        self.data[self.location:self.location+length] = bytes
+        self.location += length
+
+    def read_format(self, format, size):
+        if self.location + size > len(self.data):
+            raise Exception("reading past end of stream")
+        value = struct.unpack_from(self.endian+format, self.data, self.location)[0]
+        self.location += size
+        return value
+
+    def read_struct(self, codec):
+        """
+        Unpack one record with a precompiled struct.Struct in place and 
+        advance past it.
+        """
+        if self.location + codec.size > len(self.data):
+            raise Exception("reading past end of stream")
+        values = codec.unpack_from(self.data, self.location)
+        self.location += codec.size
+        return values
+
+    def read_struct_table(self, codec, count):
+        """
+        Unpack `count` contiguous records with a precompiled struct.Struct 
+        and advance past them.
+        """
+        return codec.iter_unpack(self.read(codec.size * count))
+        
+    def bytes(self, value, size = -1):
+        if size == -1:
+            size = len(value)
+        if len(value) != size:
+            value = bytearray(size)
+
+        if self.is_reading():
+            return bytearray(self.read(size))
+        elif self.is_writing():
+            self.write(value)
+            return bytearray(value)
+        return value
+        
+    def int8_read(self):
+        return self.read_struct(INT8_STRUCT)[0]
+
+    def uint8_read(self):
+        return self.read_struct(UINT8_STRUCT)[0]
+
+    def int16_read(self):
+        return self.read_struct(INT16_STRUCT)[0]
+
+    def uint16_read(self):
+        return self.read_struct(UINT16_STRUCT)[0]
+
+    def int32_read(self):
+        return self.read_struct(INT32_STRUCT)[0]
+
+    def uint32_read(self):
+        return self.read_struct(UINT32_STRUCT)[0]
+
+    def int64_read(self):
+        return self.read_struct(INT64_STRUCT)[0]
+
+    def uint64_read(self):
+        return self.read_struct(UINT64_STRUCT)[0]
+        
+def map_file(path):
+    """
+    Memory-map `path` read-only and wrap the mapping in a read-only 
+    MemoryStream. Pages are only faulted in when a view into them is read.
+    Empty files cannot be mapped and get an empty in-memory stream instead.
+
+    @return (tuple[MemoryStream, mmap.mmap | None])
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return MemoryStream(), None
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return MemoryStream(mapping, readonly=True), mapping
+
+def _buffer_address(buffer):
+    return numpy.frombuffer(buffer, dtype=numpy.uint8).ctypes.data
+
+def _file_key(path):
+    """
+    @return (tuple[str, int, int]): normalized real path, size and mtime (ns)
+    """
+    stat = os.stat(path)
+    return (os.path.normcase(os.path.realpath(path)), stat.st_size, stat.st_mtime_ns)
+
+def _code_key():
+    """
+    Parsed archive caches are only valid for the code that wrote them.
+    """
+    try:
+        stat = os.stat(__file__)
+        return (ARCHIVE_CACHE_VERSION, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return (ARCHIVE_CACHE_VERSION, 0, 0)
+
+# archive cache layout: header, one record + utf-8 path per source file, then
+# the zlib compressed pickle of the reader state. Everything up to the pickle 
+# is plain struct data so a stale or foreign cache is rejected before any 
+# unpickling happens.
+#
+# The body stays a pickle: the cached state is the object graph load() builds
+# (banks, HIRC entries, track info, string tables and the links between them),
+# and rebuilding it from flat tables would mean parsing it a second time. Two
+# things keep that safe. The unpickler only resolves the data classes in 
+# ARCHIVE_CACHE_CLASSES, so a foreign file cannot call into anything else. 
+# Payloads and NumPy tables never go through pickle's reduce machinery: they 
+# are persistent ids holding (file, offset, size) references or raw array 
+# bytes. Because the graph follows the attribute layout of those classes, a 
+# cache is tied to this revision of core.py (see _code_key).
+ARCHIVE_CACHE_MAGIC = b"HD2A"
+ARCHIVE_CACHE_HEADER = struct.Struct("<4sIQqI") # magic, version, code size, code mtime, number of source files
+ARCHIVE_CACHE_SOURCE = struct.Struct("<QqH") # size, mtime, path length
+
+def _write_cache_header(f, source_files):
+    version, code_size, code_mtime = _code_key()
+    f.write(ARCHIVE_CACHE_HEADER.pack(ARCHIVE_CACHE_MAGIC, version, code_size, 
+                                      code_mtime, len(source_files)))
+    for source_path, size, mtime in source_files:
+        encoded = source_path.encode("utf-8")
+        f.write(ARCHIVE_CACHE_SOURCE.pack(size, mtime, len(encoded)))
+        f.write(encoded)
+
+def _read_cache_header(f):
+    """
+    @return (list[tuple[str, int, int]] | None): source files the cached 
+    state was built from, or None if the cache was written by another format 
+    version or another revision of this module
+    """
+    data = f.read(ARCHIVE_CACHE_HEADER.size)
+    if len(data) != ARCHIVE_CACHE_HEADER.size:
+        return None
+    magic, version, code_size, code_mtime, num_files = ARCHIVE_CACHE_HEADER.unpack(data)
+    if magic != ARCHIVE_CACHE_MAGIC or (version, code_size, code_mtime) != _code_key():
+        return None
+    source_files = []
+    for _ in range(num_files):
+        data = f.read(ARCHIVE_CACHE_SOURCE.size)
+        if len(data) != ARCHIVE_CACHE_SOURCE.size:
+            return None
+        size, mtime, path_length = ARCHIVE_CACHE_SOURCE.unpack(data)
+        source_files.append((f.read(path_length).decode("utf-8"), size, mtime))
+    return source_files
+
+class _ArchivePickler(pickle.Pickler):
+    """
+    Pickles views into memory-mapped files as (file, offset, size) references
+    so cached archive state never carries a copy of the payloads. NumPy 
+    arrays are stored as their dtype description and raw bytes.
+    """
+
+    def __init__(self, file, mappings):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.bases = [(key, mapping, _buffer_address(mapping)) 
+                      for key, mapping in mappings.items()]
+
+    def persistent_id(self, obj):
+        if isinstance(obj, numpy.ndarray):
+            return ("array", obj.dtype.descr, obj.shape, obj.tobytes())
+        if not isinstance(obj, memoryview):
+            return None
+        if obj.nbytes > 0:
+            for key, mapping, base in self.bases:
+                if obj.obj is mapping:
+                    return ("map", key, _buffer_address(obj) - base, obj.nbytes)
+        return ("bytes", bytes(obj))
+
+class _ArchiveUnpickler(pickle.Unpickler):
+    """
+    Only restores the classes in ARCHIVE_CACHE_CLASSES.
+    """
+
+    def __init__(self, file, get_view):
+        """
+        @param get_view (Callable[[str], memoryview]): maps a source file on 
+        first use
+        """
+        super().__init__(file)
+        self.get_view = get_view
+
+    def find_class(self, module, name):
+        if (module, name) not in ARCHIVE_CACHE_CLASSES:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in "
+                                         "an archive cache")
+        return super().find_class(module, name)
+
+    def persistent_load(self, pid):
+        if pid[0] == "map":
+            _, key, offset, size = pid
+            return self.get_view(key)[offset:offset+size]
+        if pid[0] == "array":
+            _, descr, shape, data = pid
+            return numpy.frombuffer(data, dtype=numpy.dtype(descr)).reshape(shape).copy()
+        return memoryview(pid[1])
+
+def pad_to_16_byte_align(data):
+    b = bytearray(data)
+    l = len(b)
+    new_len = ceil(l/16)*16
+    return b + bytearray(new_len-l)
+    
+def _16_byte_align(addr):
+    return ceil(addr/16)*16
+
+def _write_aligned(f, offset, *chunks):
+    """
+    Write `chunks` back to back at `offset` followed by the zero padding 
+    pad_to_16_byte_align would have appended to their concatenation.
+    @return (int): end of the padded section
+    """
+    f.seek(offset)
+    size = 0
+    for chunk in chunks:
+        size += f.write(chunk)
+    f.write(bytes(_16_byte_align(size) - size))
+    return offset + _16_byte_align(size)
+
+def _16_byte_align_array(addrs):
+    return (addrs + 15) & ~numpy.uint64(15)
+
+def _exclusive_cumsum(values):
+    offsets = numpy.zeros(len(values), dtype=numpy.uint64)
+    numpy.cumsum(values[:-1], out=offsets[1:])
+    return offsets
+    
+def bytes_to_long(bytes):
+    assert len(bytes) == 8
+    return sum((b << (k * 8) for k, b in enumerate(bytes)))
+
+MURMUR64_M = 0xc6a4a7935bd1e995
+MURMUR64_R = 47
+MURMUR64_MASK = 2 ** 64 - 1
+
+def murmur64_hash(data, seed = 0):
+
+    m = MURMUR64_M
+    r = MURMUR64_R
+
+    MASK = MURMUR64_MASK
+
+    data_as_bytes = bytes(data)
+    length = len(data_as_bytes)
+
+    h = seed ^ ((m * length) & MASK)
+
+    off = (length >> 3) << 3
+    for k in struct.unpack_from(f"<{length >> 3}Q", data_as_bytes):
+        k = (k * m) & MASK
+        k = k ^ (k >> r)
+        k = (k * m) & MASK
+        h = (h ^ k)
+        h = (h * m) & MASK
+
+    if length & 7:
+        h = h ^ int.from_bytes(data_as_bytes[off:], byteorder="little")
+        h = (h * m) & MASK
+
+    h = h ^ (h >> r)
+    h = (h * m) & MASK
+    h = h ^ (h >> r)
+
+    return h
+
+def murmur64_hash_batch(keys, seed = 0):
+    """
+    murmur64_hash over a list of byte strings. Keys of equal length are 
+    hashed together with uint64 NumPy arithmetic, which wraps modulo 2**64 
+    exactly like the masked integer version.
+    @return (list[int]): hashes in the order of `keys`
+    """
+    m = numpy.uint64(MURMUR64_M)
+    r = numpy.uint64(MURMUR64_R)
+    hashes = [0] * len(keys)
+    by_length = {}
+    for i, key in enumerate(keys):
+        by_length.setdefault(len(key), []).append(i)
+    for length, indices in by_length.items():
+        rows = numpy.frombuffer(b"".join([bytes(keys[i]) for i in indices]), dtype=numpy.uint8)
+        rows = rows.reshape(len(indices), length)
+        h = numpy.full(len(indices), seed ^ ((MURMUR64_M * length) & MURMUR64_MASK), dtype=numpy.uint64)
+        off = (length >> 3) << 3
+        blocks = numpy.ascontiguousarray(rows[:, :off]).view("<u8")
+        for column in range(off >> 3):
+            k = blocks[:, column] * m
+            k ^= k >> r
+            k *= m
+            h ^= k
+            h *= m
+        if length & 7:
+            tail = numpy.zeros(len(indices), dtype=numpy.uint64)
+            for n in range(length & 7):
+                tail |= rows[:, off+n].astype(numpy.uint64) << numpy.uint64(8 * n)
+            h ^= tail
+            h *= m
+        h ^= h >> r
+        h *= m
+        h ^= h >> r
+        for i, value in zip(indices, h.tolist()):
+            hashes[i] = value
+    return hashes
+
+def get_stream_resource_ids(bank_path, source_ids, memo=None):
+    """
+    Resource ids of the streams backing `source_ids` of a bank whose dep 
+    points at `bank_path`. Names already in `memo` ((bank dir, source id) -> 
+    resource id) are not hashed again; the rest are hashed in one batch and 
+    added to it.
+    @return (list[int]): resource ids in the order of `source_ids`
+    """
+    if memo is None:
+        memo = {}
+    bank_dir = os.path.dirname(bank_path)
+    missing = [source_id for source_id in set(source_ids) if (bank_dir, source_id) not in memo]
+    if missing:
+        keys = [(bank_dir + "/" + str(source_id)).encode('utf-8') for source_id in missing]
+        for source_id, resource_id in zip(missing, murmur64_hash_batch(keys)):
+            memo[(bank_dir, source_id)] = resource_id
+    return [memo[(bank_dir, source_id)] for source_id in source_ids]
+
+def get_stream_resource_id(bank_path, source_id):
+    return get_stream_resource_ids(bank_path, [source_id])[0]
+
+def content_hash(data):
+    """
+    @return (bytes): 128 bit digest identifying an audio payload by content
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+# stereo downmix gains per input channel count, as (left, right) rows over the
+# input channels in vgmstream's output order. Playback downmixes in float32 
+# and the mixer saturates once, after summing every voice, by clipping to 
+# [-1, 1] before the float32 output stream converts to the device format.
+DOWNMIX_WEIGHTS = {
+    # 2.1: L R LFE
+    3: ((0.585786, 0.0, 0.414214),
+        (0.0, 0.585786, 0.414214)),
+    # 4.0: L R SL SR
+    4: ((0.42265, 0.0, 0.366025, 0.211325),
+        (0.0, 0.42265, 0.211325, 0.366025)),
+    # 5.1: L C R SL SR LFE
+    6: ((0.529067, 0.374107, 0.0, 0.458186, 0.264534, 0.374107),
+        (0.0, 0.374107, 0.529067, 0.264534, 0.458186, 0.374107)),
+    # 7.1: L C R SL SR RL RR LFE, same overall gain as 5.1
+    8: ((0.388651, 0.274816, 0.0, 0.336572, 0.194326, 0.336572, 0.194326, 0.274816),
+        (0.0, 0.274816, 0.388651, 0.194326, 0.336572, 0.194326, 0.336572, 0.274816)),
+}
+
+@functools.lru_cache(maxsize=None)
+def get_downmix_matrix(channels):
+    """
+    @return (numpy.ndarray): (channels, 2) float32 matrix mapping a frame to 
+    a stereo frame. Mono is sent to both sides; other layouts without 
+    weights keep the first two channels.
+    """
+    weights = DOWNMIX_WEIGHTS.get(channels)
+    if weights is not None:
+        matrix = numpy.array(weights, dtype=numpy.float32).T
+    elif channels == 1:
+        matrix = numpy.ones((1, 2), dtype=numpy.float32)
+    else:
+        matrix = numpy.zeros((channels, 2), dtype=numpy.float32)
+        matrix[0][0] = matrix[1][1] = 1.0
+    matrix.flags.writeable = False
+    return matrix
+
+def pcm_to_float(data, sample_width, channels):
+    """
+    @return (numpy.ndarray): (frames, channels) float32 samples in [-1, 1)
+    """
+    if sample_width == 1:
+        # 8 bit wav samples are unsigned
+        arr = (numpy.frombuffer(data, dtype=numpy.uint8).astype(numpy.float32) - 128) / 128
+    elif sample_width == 2:
+        arr = numpy.frombuffer(data, dtype=numpy.int16).astype(numpy.float32) / 32768
+    elif sample_width == 4:
+        arr = numpy.frombuffer(data, dtype=numpy.int32).astype(numpy.float32) / 2147483648
+    else:
+        arr = numpy.zeros(len(data) // sample_width, dtype=numpy.float32)
+    frames = len(arr) // channels
+    return arr[:frames * channels].reshape((frames, channels))
+
+def downmix_to_stereo(data, sample_width, channels):
+    """
+    @return (numpy.ndarray): (frames, 2) float32 stereo frames of interleaved 
+    PCM `data`, downmixed with one matrix multiply
+    """
+    return pcm_to_float(data, sample_width, channels) @ get_downmix_matrix(channels)
+
+class Mixer:
+    """
+    Sum float stereo voices into the single long-lived output stream. 
+    Voices can be added and removed from any thread while the stream runs.
+
+    A voice renders (frame_count, 2) float32 frames through 
+    render(frame_count), repositions through seek(seconds) and is dropped 
+    once its `finished` flag is set, after which its `on_finish` callback 
+    (if any) runs outside the lock.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.voices = []
+        self.lock = threading.Lock()
+
+    def add_all(self, voices):
+        """
+        Add voices at once so they start on the same output buffer.
+        """
+        with self.lock:
+            self.voices.extend(voices)
+
+    def remove(self, voice):
+        with self.lock:
+            if voice in self.voices:
+                self.voices.remove(voice)
+
+    def seek(self, voices, seconds):
+        """
+        Reposition voices between two output buffers.
+
+        @return (bool): False if any voice could not reach `seconds` or is 
+        not mixed yet
+        """
+        with self.lock:
+            return all([voice in self.voices and voice.seek(seconds) 
+                        for voice in voices])
+
+    def mix(self, frame_count):
+        """
+        @return (bytes): frame_count interleaved float32 stereo frames
+        """
+        out = numpy.zeros((frame_count, 2), dtype=numpy.float32)
+        finished = []
+        with self.lock:
+            for voice in self.voices:
+                out += voice.render(frame_count)
+                if voice.finished:
+                    finished.append(voice)
+            for voice in finished:
+                self.voices.remove(voice)
+        for voice in finished:
+            if voice.on_finish is not None:
+                voice.on_finish(voice)
+        numpy.clip(out, -1.0, 1.0, out=out)
+        return out.tobytes()
+
+class Subscriber:
+    def __init__(self):
+        pass
+        
+    def update(self, content):
+        pass
+        
+    def raise_modified(self):
+        pass
+        
+    def lower_modified(self):
+        pass
+        
+class AudioSource:
+    """
+    The original payload is held as a `(buffer, offset, size)` reference 
+    (`data_ref`) into the archive it was loaded from and is only sliced out 
+    when requested. `data` holds replacement bytes and is None while the 
+    original payload is in use.
+    """
+
+    def __init__(self):
+        self.data = None
+        self.data_ref = None
+        self.size = 0
+        self.resource_id = 0
+        self.short_id = 0
+        self.modified = False
+        self.subscribers = set()
+        self.stream_type = 0
+        self.track_info = None
+        self.content_hash = None
+
+    def set_data_ref(self, buffer, offset, size):
+        """
+        Point the original payload at `size` bytes at `offset` in `buffer` 
+        without reading them.
+        """
+        if offset + size > len(buffer):
+            raise Exception("audio source reference past end of buffer")
+        self.data_ref = (buffer, offset, size)
+        if self.data is None:
+            self.size = size
+            self.content_hash = None
+        
+    def set_data(self, data, notify_subscribers=True, set_modified=True):
+        if set_modified:
+            self.data = data
+            self.size = len(self.data)
+            self.content_hash = None
+        else:
+            # Not a modification: data becomes the original payload
+            self.set_data_ref(data, 0, len(data))
+        if notify_subscribers:
+            for item in self.subscribers:
+                item.update(self)
+                if not self.modified:
+                    item.raise_modified()
+        if set_modified:
+            self.modified = True
+            
+    def get_id(self):
+        if self.stream_type == BANK:
+            return self.get_short_id()
+        else:
+            return self.get_resource_id()
+            
+    def is_modified(self):
+        return self.modified
+            
+    def set_track_info(self, track_info,  notify_subscribers=True, set_modified=True):
+        if not self.modified and set_modified:
+            self.track_info_old = self.track_info
+        self.track_info = track_info
+        if notify_subscribers:
+            for item in self.subscribers:
+                item.update(self)
+                if not self.modified:
+                    item.raise_modified()
+        if set_modified:
+            self.modified = True
+            
+    def get_track_info(self):
+        return self.track_info
+        
+    def get_data(self):
+        if self.data is not None:
+            return self.data
+        return self.get_original_data()
+
+    def get_original_data(self):
+        if self.data_ref is None:
+            return b""
+        buffer, offset, size = self.data_ref
+        return buffer[offset:offset+size]
+
+    def has_replacement_data(self):
+        return self.data is not None
+
+    def get_content_hash(self):
+        """
+        @return (bytes): content hash of the current payload. Computed on 
+        first use and kept until the payload changes.
+        """
+        if self.content_hash is None:
+            self.content_hash = content_hash(self.get_data())
+        return self.content_hash
+        
+    def get_resource_id(self):
+        return self.resource_id
+        
+    def get_short_id(self):
+        return self.short_id
+        
+    def revert_modifications(self, notify_subscribers=True):
+        if self.track_info is not None:
+            self.track_info.revert_modifications()
+        if self.modified:
+            self.modified = False
+            self.data = None
+            self.size = 0 if self.data_ref is None else self.data_ref[2]
+            self.content_hash = None
+            if notify_subscribers:
+                for item in self.subscribers:
+                    item.lower_modified()
+                    item.update(self)
+                
+class TocHeader:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def from_values(cls, values):
+        toc_header = TocHeader()
+        (toc_header.file_id,
+         toc_header.type_id,
+         toc_header.toc_data_offset,
+         toc_header.stream_file_offset,
+         toc_header.gpu_resource_offset,
+         toc_header.unknown1, #seems to contain duplicate entry index
+         toc_header.unknown2,
+         toc_header.toc_data_size,
+         toc_header.stream_size,
+         toc_header.gpu_resource_size,
+         toc_header.unknown3,
+         toc_header.unknown4,
+         toc_header.entry_index) = values
+        return toc_header
+
+    def from_memory_stream(self, stream):
+        (self.file_id,
+         self.type_id,
+         self.toc_data_offset,
+         self.stream_file_offset,
+         self.gpu_resource_offset,
+         self.unknown1,
+         self.unknown2,
+         self.toc_data_size,
+         self.stream_size,
+         self.gpu_resource_size,
+         self.unknown3,
+         self.unknown4,
+         self.entry_index) = stream.read_struct(TOC_HEADER_STRUCT)
+
+    def pack_into(self, buffer, offset):
+        TOC_HEADER_STRUCT.pack_into(buffer, offset, *self.get_values())
+
+    def get_values(self):
+        return (self.file_id,
+                self.type_id,
+                self.toc_data_offset,
+                self.stream_file_offset,
+                self.gpu_resource_offset,
+                self.unknown1,
+                self.unknown2,
+                self.toc_data_size,
+                self.stream_size,
+                self.gpu_resource_size,
+                self.unknown3,
+                self.unknown4,
+                self.entry_index)
+        
+    def get_data(self):
+        return TOC_HEADER_STRUCT.pack(*self.get_values())
+                
+class WwiseDep:
+
+    def __init__(self):
+        self.data = ""
+        
+    def from_memory_stream(self, stream):
+        self.offset = stream.tell()
+        self.tag = stream.uint32_read()
+        self.data_size = stream.uint32_read()
+        self.data = bytes(stream.read(self.data_size)).decode('utf-8')
+        
+    def get_data(self):
+        return (self.tag.to_bytes(4, byteorder='little')
+                + self.data_size.to_bytes(4, byteorder='little')
+                + self.data.encode('utf-8'))
+                
+class DidxEntry:
+    def __init__(self):
+        self.id = self.offset = self.size = 0
+        
+    @classmethod
+    def from_bytes(cls, bytes):
+        return cls.from_values(DIDX_ENTRY_STRUCT.unpack(bytes))
+
+    @classmethod
+    def from_values(cls, values):
+        e = DidxEntry()
+        e.id, e.offset, e.size = values
+        return e
+        
+    def get_data(self):
+        return DIDX_ENTRY_STRUCT.pack(self.id, self.offset, self.size)
+        
+class MediaIndex:
+    """
+    DIDX tables of every loaded bank decoded into id / offset / size columns. 
+    Media is never copied out of the DATA chunks; lookups go through a sorted
+    index (index_ids -> index_rows) and return views into the chunk the row 
+    came from. As with repeated dict assignment, a later bank overrides an 
+    earlier entry with the same id.
+
+    Banks are only collected by load. Their columns are concatenated and the
+    index is rebuilt once, on the first lookup after a load (see build).
+    """
+
+    def __init__(self):
+        self.ids = numpy.zeros(0, dtype=numpy.uint32)
+        self.offsets = numpy.zeros(0, dtype=numpy.uint32)
+        self.sizes = numpy.zeros(0, dtype=numpy.uint32)
+        self.chunk_indices = numpy.zeros(0, dtype=numpy.uint32)
+        self.chunks = []
+        self.pending = []
+        self.index_ids = numpy.zeros(0, dtype=numpy.uint32)
+        self.index_rows = numpy.zeros(0, dtype=numpy.intp)
+        
+    def load(self, didxChunk, dataChunk):
+        num_entries = len(didxChunk) // DIDX_ENTRY_DTYPE.itemsize
+        table = numpy.frombuffer(didxChunk, dtype=DIDX_ENTRY_DTYPE, count=num_entries)
+        offsets = table["offset"]
+        # clamp like slicing would for entries running past the DATA chunk
+        available = numpy.maximum(len(dataChunk) - offsets.astype(numpy.int64), 0)
+        sizes = numpy.minimum(table["size"], available).astype(numpy.uint32)
+        chunk_indices = numpy.full(num_entries, len(self.chunks), dtype=numpy.uint32)
+        self.pending.append((table["id"], offsets, sizes, chunk_indices))
+        self.chunks.append(dataChunk)
+
+    def build(self):
+        """
+        Concatenate the columns of every bank loaded since the last build and
+        rebuild the index. Each id maps to its last row.
+        """
+        if len(self.pending) == 0:
+            return
+        ids, offsets, sizes, chunk_indices = zip(*self.pending)
+        self.pending.clear()
+        self.ids = numpy.concatenate((self.ids, *ids))
+        self.offsets = numpy.concatenate((self.offsets, *offsets))
+        self.sizes = numpy.concatenate((self.sizes, *sizes))
+        self.chunk_indices = numpy.concatenate((self.chunk_indices, *chunk_indices))
+        # first occurrence in the reversed ids is the last row of each id
+        self.index_ids, last = numpy.unique(self.ids[::-1], return_index=True)
+        self.index_rows = len(self.ids) - 1 - last
+
+    def _find_row(self, source_id):
+        """
+        @return (int): row of `source_id`. Raises KeyError if no loaded bank 
+        contains it.
+        """
+        self.build()
+        i = int(numpy.searchsorted(self.index_ids, source_id))
+        if i == len(self.index_ids) or self.index_ids[i] != source_id:
+            raise KeyError(source_id)
+        return int(self.index_rows[i])
+
+    def __contains__(self, source_id):
+        try:
+            self._find_row(source_id)
+        except KeyError:
+            return False
+        return True
+
+    def get_data_ref(self, source_id):
+        """
+        @return (tuple): (DATA chunk, offset, size) of the media for 
+        `source_id`. Raises KeyError if no loaded bank contains it.
+        """
+        return self._get_row_ref(self._find_row(source_id))
+
+    def _get_row_ref(self, row):
+        return (self.chunks[self.chunk_indices[row]], int(self.offsets[row]), int(self.sizes[row]))
+
+    def get_media(self, source_id):
+        chunk, offset, size = self.get_data_ref(source_id)
+        return chunk[offset:offset+size]
+        
+    def get_data(self):
+        self.build()
+        # ids in order of first appearance, each with its last row
+        first = numpy.unique(self.ids, return_index=True)[1]
+        rows = self.index_rows[numpy.argsort(first)]
+        table = numpy.empty(len(rows), dtype=DIDX_ENTRY_DTYPE)
+        table["id"] = self.ids[rows]
+        table["offset"] = self.offsets[rows]
+        table["size"] = self.sizes[rows]
+        data_arr = []
+        for row in rows.tolist():
+            chunk, offset, size = self._get_row_ref(row)
+            data_arr.append(chunk[offset:offset+size])
+        return table.tobytes() + b"".join(data_arr)
+                
+class HircEntry:
+    
+    def __init__(self):
+        self.size = self.hierarchy_type = self.hierarchy_id = self.misc = 0
+        self.sources = []
+        self.track_info = []
+        self.soundbank = None
+    
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = HircEntry()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        entry.hierarchy_id = stream.uint32_read()
+        entry.misc = stream.read(entry.size - 4)
+        return entry
+        
+    def get_id(self):
+        return self.hierarchy_id
+        
+    def raise_modified(self):
+        self.soundbank.raise_modified()
+        
+    def lower_modified(self):
+        self.soundbank.lower_modified()
+        
+    def get_data(self):
+        return self.hierarchy_type.to_bytes(1, byteorder="little") + self.size.to_bytes(4, byteorder="little") + self.hierarchy_id.to_bytes(4, byteorder="little") + self.misc
+        
+class MusicRandomSequence(HircEntry):
+    
+    def __init__(self):
+        super().__init__()
+    
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = MusicRandomSequence()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        entry.hierarchy_id = stream.uint32_read()
+        return entry
+        
+    def get_data(self):
+        pass
+        
+class RandomSequenceContainer(HircEntry):
+    def __init__(self):
+        super().__init__()
+        self.unused_sections = []
+        self.contents = []
+        
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = RandomSequenceContainer()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        start_position = stream.tell()
+        entry.hierarchy_id = stream.uint32_read()
+
+        # ---------------------------------------
+        section_start = stream.tell()
+        stream.advance(1)
+        n = stream.uint8_read() #num fx
+        if n == 0:
+            stream.advance(12)
+        else:
+            stream.advance(7*n + 13)
+        stream.advance(5*stream.uint8_read()) #number of props
+        stream.advance(9*stream.uint8_read()) #number of props (again)
+        if stream.uint8_read() & 0b0000_0010: #positioning bit vector
+            if stream.uint8_read() & 0b0100_0000: # relative pathing bit vector
+                stream.advance(5)
+                stream.advance(16*stream.uint32_read())
+                stream.advance(20*stream.uint32_read())
+        if stream.uint8_read() & 0b0000_1000: #I forget what this is for
+            stream.advance(26)
+        else:
+           stream.advance(10)
+        stream.advance(3*stream.uint8_read()) #num state props
+        for _ in range(stream.uint8_read()): #num state groups
+            stream.advance(5)
+            stream.advance(8*stream.uint8_read())
+        for _ in range(stream.uint16_read()):  # num RTPC
+            stream.advance(12)
+            stream.advance(stream.uint16_read()*12)
+        section_end = stream.tell()
+        # ---------------------------------------
+
+        stream.seek(section_start)
+        entry.unused_sections.append(stream.read(section_end-section_start+24))
+
+        for _ in range(stream.uint32_read()): #number of children (tracks)
+            entry.contents.append(stream.uint32_read())
+
+        entry.unused_sections.append(stream.read(entry.size - (stream.tell()-start_position)))
+        return entry
+        
+    def get_data(self):
+        return (
+            b"".join([
+                struct.pack("<BII", self.hierarchy_type, self.size, self.hierarchy_id),
+                self.unused_sections[0],
+                len(self.contents).to_bytes(4, byteorder="little"),
+                b"".join([x.to_bytes(4, byteorder="little") for x in self.contents]),
+                self.unused_sections[1]
+            ])
+        )
+    
+class MusicSegment(HircEntry):
+
+    def __init__(self):
+        super().__init__()
+        self.tracks = []
+        self.duration = 0
+        self.entry_marker = None
+        self.exit_marker = None
+        self.unused_sections = []
+        self.markers = []
+        self.modified = False
+    
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = MusicSegment()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        entry.hierarchy_id = stream.uint32_read()
+        entry.unused_sections.append(stream.read(15))
+        n = stream.uint8_read() #number of props
+        stream.seek(stream.tell()-1)
+        entry.unused_sections.append(stream.read(5*n + 1))
+        n = stream.uint8_read() #number of props (again)
+        stream.seek(stream.tell()-1)
+        entry.unused_sections.append(stream.read(5*n + 1 + 12 + 4)) #the 4 is the count of state props, state chunks, and RTPC, which are currently always 0
+        n = stream.uint32_read() #number of children (tracks)
+        for _ in range(n):
+            entry.tracks.append(stream.uint32_read())
+        entry.unused_sections.append(stream.read(23)) #meter info
+        n = stream.uint32_read() #number of stingers
+        stream.seek(stream.tell()-4)
+        entry.unused_sections.append(stream.read(24*n + 4))
+        entry.duration = struct.unpack("<d", stream.read(8))[0]
+        n = stream.uint32_read() #number of markers
+        for i in range(n):
+            id = stream.uint32_read()
+            position = struct.unpack("<d", stream.read(8))[0]
+            name = []
+            temp = b"1"
+            while temp != b"\x00":
+                temp = stream.read(1)
+                name.append(temp)
+            name = b"".join(name)
+            marker = [id, position, name]
+            entry.markers.append(marker)
+            if i == 0:
+                entry.entry_marker = marker
+            elif i == n-1:
+                entry.exit_marker = marker
+        return entry
+        
+    def set_data(self, duration=None, entry_marker=None, exit_marker=None):
+        if not self.modified:
+            self.duration_old = self.duration
+            self.entry_marker_old = self.entry_marker[1]
+            self.exit_marker_old = self.exit_marker[1]
+            self.raise_modified()
+        if duration is not None: self.duration = duration
+        if entry_marker is not None: self.entry_marker[1] = entry_marker
+        if exit_marker is not None: self.exit_marker[1] = exit_marker
+        self.modified = True
+        
+    def revert_modifications(self):
+        if self.modified:
+            self.lower_modified()
+            self.entry_marker[1] = self.entry_marker_old
+            self.exit_marker[1] = self.exit_marker_old
+            self.duration = self.duration_old
+            self.modified = False
+        
+    def get_data(self):
+        return (
+            b"".join([
+                struct.pack("<BII", self.hierarchy_type, self.size, self.hierarchy_id),
+                self.unused_sections[0],
+                self.unused_sections[1],
+                self.unused_sections[2],
+                len(self.tracks).to_bytes(4, byteorder="little"),
+                b"".join([x.to_bytes(4, byteorder="little") for x in self.tracks]),
+                self.unused_sections[3],
+                self.unused_sections[4],
+                struct.pack("<d", self.duration),
+                len(self.markers).to_bytes(4, byteorder="little"),
+                b"".join([b"".join([x[0].to_bytes(4, byteorder="little"), struct.pack("<d", x[1]), x[2]]) for x in self.markers])
+            ])
+        )
+        
+class HircEntryFactory:
+    
+    @classmethod
+    def from_memory_stream(cls, stream):
+        hierarchy_type = stream.uint8_read()
+        stream.seek(stream.tell()-1)
+        if hierarchy_type == 2: #sound
+            return Sound.from_memory_stream(stream)
+        elif hierarchy_type == 11: #music track
+            return MusicTrack.from_memory_stream(stream)
+        elif hierarchy_type == 0x0A: #music segment
+            return MusicSegment.from_memory_stream(stream)
+        elif hierarchy_type == 0x05: #random sequence container
+            return RandomSequenceContainer.from_memory_stream(stream)
+        else:
+            return HircEntry.from_memory_stream(stream)
+        
+class HircReader:
+    
+    def __init__(self, soundbank = None):
+        self.entries = {}
+        self.soundbank = soundbank
+        
+    def load(self, hierarchy_data):
+        self.entries.clear()
+        reader = MemoryStream(hierarchy_data, readonly=True)
+        num_items = reader.uint32_read()
+        for item in range(num_items):
+            entry = HircEntryFactory.from_memory_stream(reader)
+            entry.soundbank = self.soundbank
+            self.entries[entry.get_id()] = entry
+            
+    def get_data(self):
+        arr = [entry.get_data() for entry in self.entries.values()]
+        return len(arr).to_bytes(4, byteorder="little") + b"".join(arr)
+            
+class BankParser:
+    
+    def __init__(self):
+        self.chunks = {}
+        
+    def load(self, bank_data):
+        self.chunks.clear()
+        reader = MemoryStream(bank_data, readonly=True)
+        while True:
+            tag = ""
+            try:
+                tag = bytes(reader.read(4)).decode('utf-8')
+            except:
+                break
+            size = reader.uint32_read()
+            self.chunks[tag] = reader.read(size)
+            
+    def GetChunk(self, chunk_tag):
+        try:
+            return self.chunks[chunk_tag]
+        except:
+            return None
+            
+class BankSourceStruct:
+
+    def __init__(self):
+        self.plugin_id = 0
+        self.stream_type = self.source_id = self.mem_size = self.bit_flags = 0
+        
+    @classmethod
+    def from_bytes(cls, bytes):
+        return cls.from_values(BANK_SOURCE_STRUCT.unpack(bytes))
+
+    @classmethod
+    def from_values(cls, values):
+        b = BankSourceStruct()
+        b.plugin_id, b.stream_type, b.source_id, b.mem_size, b.bit_flags = values
+        return b
+        
+    def get_data(self):
+        return BANK_SOURCE_STRUCT.pack(self.plugin_id, self.stream_type, self.source_id, self.mem_size, self.bit_flags)
+        
+class TrackInfoStruct:
+    
+    def __init__(self):
+        self.track_id = self.source_id = self.event_id = self.play_at = self.begin_trim_offset = self.end_trim_offset = self.source_duration = 0
+        self.play_at_old = self.begin_trim_offset_old = self.end_trim_offset_old = self.source_duration_old = 0
+        self.modified = False
+        self.soundbanks = set()
+        
+    @classmethod
+    def from_bytes(cls, bytes):
+        return cls.from_values(TRACK_INFO_STRUCT.unpack(bytes))
+
+    @classmethod
+    def from_values(cls, values):
+        t = TrackInfoStruct()
+        t.track_id, t.source_id, t.event_id, t.play_at, t.begin_trim_offset, t.end_trim_offset, t.source_duration = values
+        return t
+        
+    def get_id(self):
+        if self.source_id != 0:
+            return self.source_id
+        else:
+            return self.event_id
+            
+    def is_modified(self):
+        return self.modified
+            
+    def set_data(self, play_at=None, begin_trim_offset=None, end_trim_offset=None, source_duration=None):
+        if not self.modified:
+            self.play_at_old = self.play_at
+            self.begin_trim_offset_old = self.begin_trim_offset
+            self.end_trim_offset_old = self.end_trim_offset
+            self.source_duration_old = self.source_duration
+            self.raise_modified()
+        if play_at is not None: self.play_at = play_at
+        if begin_trim_offset is not None: self.begin_trim_offset = begin_trim_offset
+        if end_trim_offset is not None: self.end_trim_offset = end_trim_offset
+        if source_duration is not None: self.source_duration = source_duration
+        self.modified = True
+        
+    def revert_modifications(self):
+        if self.modified:
+            self.lower_modified()
+            self.play_at = self.play_at_old
+            self.begin_trim_offset = self.begin_trim_offset_old
+            self.end_trim_offset = self.end_trim_offset_old
+            self.source_duration = self.source_duration_old
+            self.modified = False
+            
+    def raise_modified(self):
+        for bank in self.soundbanks:
+            bank.raise_modified()
+        
+    def lower_modified(self):
+        for bank in self.soundbanks:
+            bank.lower_modified()
+        
+    def get_data(self):
+        return TRACK_INFO_STRUCT.pack(self.track_id, self.source_id, self.event_id, self.play_at, self.begin_trim_offset, self.end_trim_offset, self.source_duration)
+            
+class MusicTrack(HircEntry):
+    
+    def __init__(self):
+        super().__init__()
+        self.bit_flags = 0
+        
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = MusicTrack()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        start_position = stream.tell()
+        entry.hierarchy_id = stream.uint32_read()
+        entry.bit_flags = stream.uint8_read()
+        num_sources = stream.uint32_read()
+        for values in stream.read_struct_table(BANK_SOURCE_STRUCT, num_sources):
+            entry.sources.append(BankSourceStruct.from_values(values))
+        num_track_info = stream.uint32_read()
+        for values in stream.read_struct_table(TRACK_INFO_STRUCT, num_track_info):
+            entry.track_info.append(TrackInfoStruct.from_values(values))
+        entry.misc = stream.read(entry.size - (stream.tell()-start_position))
+        return entry
+
+    def get_data(self):
+        b = b"".join([source.get_data() for source in self.sources])
+        t = b"".join([track.get_data() for track in self.track_info])
+        return struct.pack("<BIIBI", self.hierarchy_type, self.size, self.hierarchy_id, self.bit_flags, len(self.sources)) + b + len(self.track_info).to_bytes(4, byteorder="little") + t + self.misc
+    
+class Sound(HircEntry):
+    
+    def __init__(self):
+        super().__init__()
+    
+    @classmethod
+    def from_memory_stream(cls, stream):
+        entry = Sound()
+        entry.hierarchy_type = stream.uint8_read()
+        entry.size = stream.uint32_read()
+        entry.hierarchy_id = stream.uint32_read()
+        entry.sources.append(BankSourceStruct.from_values(stream.read_struct(BANK_SOURCE_STRUCT)))
+        entry.misc = stream.read(entry.size - 18)
+        return entry
+
+    def get_data(self):
+        return struct.pack("<BII", self.hierarchy_type, self.size, self.hierarchy_id) + self.sources[0].get_data() + self.misc
+        
+class WwiseBank(Subscriber):
+    """
+    `data` caches the bytes of the last generate() call. The cache is dropped 
+    by the modified / update notifications the bank receives from its audio 
+    sources, track info and hierarchy entries, and whenever content is added
+    or removed. While nothing in the bank is modified, generate() reuses the 
+    chunk bytes the bank was loaded from (`original_data`) verbatim. Those 
+    bytes are dropped for good once content whose payload did not come from 
+    the same archive is bound to the bank (see add_content).
+    """
+    
+    def __init__(self):
+        self.data = b""
+        self.original_data = None
+        self.generated = False
+        self.bank_header = b""
+        self.toc_data_header = b""
+        self.bank_misc_data = b""
+        self.modified = False
+        self.toc_header = None
+        self.dep = None
+        self.modified_count = 0
+        self.hierarchy = None
+        self.content = []
+        
+    def add_content(self, content):
+        content.subscribers.add(self)
+        if content.track_info is not None:
+            content.track_info.soundbanks.add(self)
+        self.content.append(content)
+        if content.has_replacement_data():
+            # prefetch data in the original DATA chunk no longer matches
+            self.original_data = None
+        self.invalidate()
+        
+    def remove_content(self, content):
+        self.invalidate()
+        try:
+            content.subscribers.remove(self)
+        except:
+            pass
+            
+        try:
+            self.content.remove(content)
+        except:
+            pass
+            
+        try:
+            content.track_info.soundbanks.remove(self)
+        except:
+            pass
+  
+    def get_content(self):
+        return self.content
+
+    def set_original_data(self, data):
+        self.original_data = data
+        self.data = data
+        self.generated = True
+
+    def invalidate(self):
+        self.generated = False
+
+    def update(self, content):
+        self.invalidate()
+        
+    def raise_modified(self):
+        self.invalidate()
+        self.modified = True
+        self.modified_count += 1
+        
+    def lower_modified(self):
+        self.invalidate()
+        if self.modified:
+            self.modified_count -= 1
+            if self.modified_count == 0:
+                self.modified = False
+        
+    def get_name(self):
+        return self.dep.data
+        
+    def get_id(self):
+        try:
+            return self.toc_header.file_id
+        except:
+            return 0
+            
+    def get_type_id(self):
+        try:
+            return self.toc_header.type_id
+        except:
+            return 0
+            
+    def get_data(self):
+        return self.data
+            
+    def generate(self, audio_sources, eventTrackInfo, progress_callback=None):
+        """
+        @progress_callback (Callable[[str, int, int], None] | None): called 
+        with (bank name, progress, max_progress) once with progress 0 before 
+        the sources are walked and once after each source. Only called when 
+        the bank is actually regenerated.
+        """
+        if self.generated:
+            return
+        if not self.modified and self.original_data is not None:
+            data = self.original_data
+        else:
+            data = self.generate_data(audio_sources, eventTrackInfo, progress_callback)
+        self.toc_header.toc_data_size = len(data) + len(self.toc_data_header)
+        self.toc_data_header[4:8] = len(data).to_bytes(4, byteorder="little")
+        self.data = data
+        self.generated = True
+
+    def generate_data(self, audio_sources, eventTrackInfo, progress_callback=None):
+        #regenerate soundbank from the hierarchy information
+        max_progress = sum(len(entry.sources) for entry in self.hierarchy.entries.values())
+        progress = 0
+        if progress_callback is not None:
+            progress_callback(self.dep.data, progress, max_progress)
+        
+        didx_entries = [] # (id, offset, size)
+        data_array = []
+        offset = 0
+        
+        added_sources = set()
+        
+        for entry in self.hierarchy.entries.values():
+            for index, info in enumerate(entry.track_info):
+                if info.event_id != 0:
+                    entry.track_info[index] = eventTrackInfo[info.event_id]
+            track_info_index = {}
+            for index, info in enumerate(entry.track_info):
+                track_info_index.setdefault(info.source_id, index)
+            for source in entry.sources:
+                progress += 1
+                if progress_callback is not None:
+                    progress_callback(self.dep.data, progress, max_progress)
+                if source.plugin_id == VORBIS:
+                    try:
+                        audio = audio_sources[source.source_id]
+                    except KeyError:
+                        continue
+                    # there may be no original track info struct
+                    index = track_info_index.get(source.source_id)
+                    if index is not None and audio.get_track_info() is not None: #is this needed?
+                        entry.track_info[index] = audio.get_track_info()
+                    if source.stream_type == PREFETCH_STREAM and source.source_id not in added_sources:
+                        data_array.append(audio.get_data()[:source.mem_size])
+                        didx_entries.append((source.source_id, offset, source.mem_size))
+                        offset += source.mem_size
+                        added_sources.add(source.source_id)
+                    elif source.stream_type == BANK and source.source_id not in added_sources:
+                        data_array.append(audio.get_data())
+                        didx_entries.append((source.source_id, offset, audio.size))
+                        offset += audio.size
+                        added_sources.add(source.source_id)
+                elif source.plugin_id == REV_AUDIO:
+                    try:
+                        custom_fx_entry = self.hierarchy.entries[source.source_id]
+                        fx_data = custom_fx_entry.get_data()
+                        plugin_param_size = int.from_bytes(fx_data[13:17], byteorder="little")
+                        media_index_id = int.from_bytes(fx_data[19+plugin_param_size:23+plugin_param_size], byteorder="little")
+                        audio = audio_sources[media_index_id]
+                    except KeyError:
+                        continue
+                    if source.stream_type == BANK and source.source_id not in added_sources:
+                        data_array.append(audio.get_data())
+                        didx_entries.append((media_index_id, offset, audio.size))
+                        offset += audio.size
+                        added_sources.add(media_index_id)
+                        
+        hierarchy_section = self.hierarchy.get_data()
+        didx_size = DIDX_ENTRY_STRUCT.size * len(didx_entries)
+        data_size = sum([len(x) for x in data_array])
+        
+        # assemble every section in one preallocated buffer
+        size = len(self.bank_header)
+        if len(didx_entries) > 0:
+            size += CHUNK_HEADER_STRUCT.size + didx_size + CHUNK_HEADER_STRUCT.size + data_size
+        size += CHUNK_HEADER_STRUCT.size + len(hierarchy_section) + len(self.bank_misc_data)
+        data = bytearray(size)
+        
+        position = len(self.bank_header)
+        data[:position] = self.bank_header
+        if len(didx_entries) > 0:
+            CHUNK_HEADER_STRUCT.pack_into(data, position, b"DIDX", didx_size)
+            position += CHUNK_HEADER_STRUCT.size
+            for didx_entry in didx_entries:
+                DIDX_ENTRY_STRUCT.pack_into(data, position, *didx_entry)
+                position += DIDX_ENTRY_STRUCT.size
+            CHUNK_HEADER_STRUCT.pack_into(data, position, b"DATA", data_size)
+            position += CHUNK_HEADER_STRUCT.size
+            for media in data_array:
+                data[position:position+len(media)] = media
+                position += len(media)
+        CHUNK_HEADER_STRUCT.pack_into(data, position, b"HIRC", len(hierarchy_section))
+        position += CHUNK_HEADER_STRUCT.size
+        data[position:position+len(hierarchy_section)] = hierarchy_section
+        position += len(hierarchy_section)
+        data[position:] = self.bank_misc_data
+        return data
+                     
+    def get_entry_index(self):
+        try:
+            return self.toc_header.entry_index
+        except:
+            return 0
+        
+class WwiseStream(Subscriber):
+
+    def __init__(self):
+        self.content = None
+        self.modified = False
+        self.toc_header = None
+        self.TocData = bytearray()
+        
+    def set_content(self, content):
+        try:
+            self.content.subscribers.remove(self)
+        except:
+            pass
+        self.content = content
+        content.subscribers.add(self)
+        
+    def update(self, content):
+        self.toc_header.stream_size = content.size
+        self.TocData[8:12] = content.size.to_bytes(4, byteorder='little')
+        
+    def raise_modified(self):
+        self.modified = True
+        
+    def lower_modified(self):
+        self.modified = False
+        
+    def get_id(self):
+        try:
+            return self.toc_header.file_id
+        except:
+            return 0
+        
+    def get_type_id(self):
+        try:
+            return self.toc_header.type_id
+        except:
+            return 0
+            
+    def get_entry_index(self):
+        try:
+            return self.toc_header.entry_index
+        except:
+            return 0
+            
+    def get_data(self):
+        return self.content.get_data()
+
+class StringEntry:
+
+    def __init__(self):
+        self.text = ""
+        self.text_old = ""
+        self.string_id = 0
+        self.modified = False
+        
+    def get_id(self):
+        return self.string_id
+        
+    def get_text(self):
+        return self.text
+        
+    def set_text(self, text):
+        if not self.modified:
+            self.text_old = self.text
+        self.modified = True
+        self.text = text
+        
+    def revert_modifications(self):
+        if self.modified:
+            self.text = self.text_old
+            self.modified = False
+        
+class TextBank:
+    
+    def __init__(self):
+        self.toc_header = None
+        self.data = b''
+        self.string_ids = []
+        self.language = 0
+        self.modified = False
+        
+    def set_data(self, data):
+        self.string_ids.clear()
+        num_entries = int.from_bytes(data[8:12], byteorder='little')
+        id_section_start = 16
+        offset_section_start = id_section_start + 4 * num_entries
+        data_section_start = offset_section_start + 4 * num_entries
+        ids = data[id_section_start:offset_section_start]
+        offsets = data[offset_section_start:data_section_start]
+        for n in range(num_entries):
+            string_id = int.from_bytes(ids[4*n:+4*(n+1)], byteorder="little")
+            self.string_ids.append(string_id)
+            
+    def update(self):
+        pass
+        
+    def get_data(self):
+        return self.data
+        
+    def GetLanguage(self):
+        return self.language
+        
+    def is_modified(self):
+        return self.modified
+        
+    def generate(self, string_entries):
+        entries = string_entries[self.language]
+        stream = MemoryStream()
+        stream.write(b'\xae\xf3\x85\x3e\x01\x00\x00\x00')
+        stream.write(len(self.string_ids).to_bytes(4, byteorder="little"))
+        stream.write(self.language.to_bytes(4, byteorder="little"))
+        offset = 16 + 8*len(self.string_ids)
+        for i in self.string_ids:
+            stream.write(entries[i].get_id().to_bytes(4, byteorder="little"))
+        for i in self.string_ids:
+            stream.write(offset.to_bytes(4, byteorder="little"))
+            initial_position = stream.tell()
+            stream.seek(offset)
+            text_bytes = entries[i].text.encode('utf-8') + b'\x00'
+            stream.write(text_bytes)
+            offset += len(text_bytes)
+            stream.seek(initial_position)
+        self.data = stream.data
+        self.toc_header.toc_data_size = len(self.data)
+        
+    def Rebuild(self, string_id, offset_difference):
+        pass
+        
+    def get_id(self):
+        try:
+            return self.toc_header.file_id
+        except:
+            return 0
+        
+    def get_type_id(self):
+        try:
+            return self.toc_header.type_id
+        except:
+            return 0
+            
+    def get_entry_index(self):
+        try:
+            return self.toc_header.entry_index
+        except:
+            return 0
+
+# (module, name) of every class a cached reader state may contain
+ARCHIVE_CACHE_CLASSES = frozenset((cls.__module__, cls.__name__) for cls in (
+    AudioSource, TocHeader, WwiseDep, DidxEntry, HircEntry, MusicRandomSequence,
+    RandomSequenceContainer, MusicSegment, HircReader, BankSourceStruct, 
+    TrackInfoStruct, MusicTrack, Sound, WwiseBank, WwiseStream, StringEntry, 
+    TextBank
+)) | {("builtins", "set"), ("builtins", "frozenset"), ("builtins", "bytearray")}
+
+class FileReader:
+
+    # Reuse the parsed structure of archives that did not change on disk
+    use_archive_cache = True
+    archive_cache_budget = 512 << 20
+    
+    def __init__(self):
+        self.wwise_streams = {}
+        self.wwise_banks = {}
+        self.audio_sources = {}
+        self.text_banks = {}
+        self.music_track_events = {}
+        self.string_entries = {}
+        self.music_segments = {}
+        self.mappings = {}
+        self.toc_index = numpy.zeros(0, dtype=TOC_HEADER_DTYPE)
+        self.resource_index = {}
+        self.source_files = []
+        # content hash -> shared payload, dropped once no source holds it
+        self.payloads = weakref.WeakValueDictionary()
+        # (bank dir, source id) -> stream resource id for this reader
+        self.stream_resource_ids = {}
+        
+    def from_file(self, path):
+        self.name = os.path.basename(path)
+        self.path = path
+        # mappings of the previous archive close once load() drops its views
+        self.mappings = {}
+        self.source_files = []
+        if self.use_archive_cache and self.read_cache(path):
+            return
+        toc_file = self.map_file(path)
+
+        stream_file = MemoryStream()
+        if os.path.isfile(path+".stream"):
+            stream_file = self.map_file(path+".stream")
+        self.load(toc_file, stream_file)
+        if self.use_archive_cache and \
+           len(self.wwise_streams) + len(self.wwise_banks) + len(self.text_banks) > 0:
+            self.write_cache(path)
+
+    def map_file(self, path):
+        self.source_files.append(_file_key(path))
+        stream, mapping = map_file(path)
+        if mapping is not None:
+            self.mappings[os.path.normcase(os.path.realpath(path))] = mapping
+        return stream
+
+    def share_payload(self, data):
+        """
+        Deduplicate in-memory payloads by content: identical data loaded more 
+        than once (the same file imported for several sources, detached 
+        copies of the same WEM) ends up as a single buffer. The table only 
+        holds weak references (bytes cannot be weakly referenced, hence the 
+        memoryview), so replaced or reverted payloads are freed as soon as 
+        the last source lets go of them.
+
+        @return (tuple[memoryview, bytes]): the shared buffer and its content 
+        hash
+        """
+        digest = content_hash(data)
+        shared = self.payloads.get(digest)
+        if shared is None:
+            shared = memoryview(bytes(data))
+            self.payloads[digest] = shared
+        return shared, digest
+
+    @staticmethod
+    def get_cache_path(path):
+        key = os.path.normcase(os.path.realpath(path)).encode("utf-8")
+        return os.path.join(ARCHIVE_CACHE, 
+                            hashlib.blake2b(key, digest_size=16).hexdigest())
+
+    @classmethod
+    def remove_cache(cls, path):
+        try:
+            os.remove(cls.get_cache_path(path))
+        except OSError:
+            pass
+
+    def read_cache(self, path):
+        """
+        Restore the parsed state of `path` from the archive cache. The cache 
+        is keyed by path, size and mtime of every file the state was built 
+        from (a patch also depends on its original archive). Payloads are not
+        cached: they become views into mappings of the original files, which 
+        are only opened once the state actually references them.
+
+        @return (bool): False on a cache miss; the reader is left untouched
+        """
+        cache_path = self.get_cache_path(path)
+        if not os.path.isfile(cache_path):
+            return False
+        views = {}
+        def get_view(source_path):
+            view = views.get(source_path)
+            if view is None:
+                stream, mapping = map_file(source_path)
+                if mapping is not None:
+                    self.mappings[source_path] = mapping
+                view = views[source_path] = stream.data
+            return view
+        try:
+            with open(cache_path, "rb") as f:
+                source_files = _read_cache_header(f)
+                if source_files is None or len(source_files) == 0 or \
+                   source_files[0][0] != os.path.normcase(os.path.realpath(path)):
+                    return False
+                for source_file in source_files:
+                    if _file_key(source_file[0]) != source_file:
+                        return False
+                data = zlib.decompress(f.read())
+            os.utime(cache_path)
+            # unpickling allocates a large object graph at once; collection 
+            # passes in the middle of it only cost time
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                state = _ArchiveUnpickler(io.BytesIO(data), get_view).load()
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        except Exception as e:
+            logger.warning(f"Ignoring archive cache of {path}: {e}")
+            self.mappings = {}
+            self.source_files = []
+            return False
+        self.__dict__.update(state)
+        self.source_files = source_files
+        return True
+
+    def write_cache(self, path):
+        state = {
+            key: value for key, value in vars(self).items()
+            if key not in ("mappings", "source_files", "name", "path", 
+                           "use_archive_cache", "payloads", 
+                           "stream_resource_ids")
+        }
+        cache_path = self.get_cache_path(path)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(ARCHIVE_CACHE, exist_ok=True)
+            data = io.BytesIO()
+            _ArchivePickler(data, self.mappings).dump(state)
+            with open(temp_path, "wb") as f:
+                _write_cache_header(f, self.source_files)
+                f.write(zlib.compress(data.getbuffer(), 1))
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to write archive cache of {path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.trim_cache()
+
+    @classmethod
+    def trim_cache(cls):
+        """
+        Remove the least recently used archive caches once the folder 
+        exceeds `archive_cache_budget` bytes.
+        """
+        try:
+            files = []
+            for entry in os.scandir(ARCHIVE_CACHE):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, cache_path in sorted(files):
+            if total <= cls.archive_cache_budget:
+                break
+            try:
+                os.remove(cache_path)
+                total -= size
+            except OSError:
+                pass
+
+    @staticmethod
+    def read_toc_index(toc_file, num_files):
+        """
+        Decode the TOC header table at the current position of `toc_file` 
+        into a structured array with TOC_HEADER_DTYPE in one pass. The 
+        result owns its memory so it never pins an archive mapping.
+        """
+        data = toc_file.read(num_files * TOC_HEADER_DTYPE.itemsize)
+        return numpy.frombuffer(data, dtype=TOC_HEADER_DTYPE, count=num_files).copy()
+
+    @staticmethod
+    def iter_toc_headers(toc_index):
+        for values in toc_index.tolist():
+            yield TocHeader.from_values(values)
+
+    def get_toc_entries(self, type_id):
+        """
+        @return (numpy.ndarray): TOC rows of the loaded archive with the given 
+        type id
+        """
+        return self.toc_index[self.toc_index["type_id"] == type_id]
+
+    def get_file_ids(self, type_id=None):
+        if type_id is None:
+            return self.toc_index["file_id"]
+        return self.get_toc_entries(type_id)["file_id"]
+
+    def has_file_id(self, file_id, type_id=None):
+        return bool(numpy.any(self.get_file_ids(type_id) == file_id))
+
+    def get_total_stream_size(self):
+        return int(self.get_toc_entries(WWISE_STREAM)["stream_size"].sum(dtype=numpy.uint64))
+
+    def release_mappings(self, paths=None):
+        """
+        Copy every payload that still points into a memory-mapped source file
+        into memory and close the mapping, so the file can be overwritten 
+        (Windows refuses to truncate a mapped file, and on other platforms 
+        the views would silently change underneath us).
+
+        @paths (list[str] | None): Only release the mappings of these files.
+        Release every mapping when None.
+        """
+        if paths is None:
+            keys = list(self.mappings.keys())
+        else:
+            keys = [os.path.normcase(os.path.realpath(p)) for p in paths]
+            keys = [key for key in keys if key in self.mappings]
+        if len(keys) == 0:
+            return
+        mappings = [self.mappings.pop(key) for key in keys]
+
+        def is_mapped(value):
+            return isinstance(value, memoryview) and \
+                    any(value.obj is mapping for mapping in mappings)
+
+        def detach(value):
+            return bytes(value) if is_mapped(value) else value
+
+        audio_sources = list(self.audio_sources.values())
+        audio_sources.extend([stream.content for stream in self.wwise_streams.values()])
+        for audio in audio_sources:
+            if audio.data is not None and is_mapped(audio.data):
+                audio.data, audio.content_hash = self.share_payload(audio.data)
+            if audio.data_ref is not None:
+                buffer, offset, size = audio.data_ref
+                if is_mapped(buffer):
+                    data, digest = self.share_payload(buffer[offset:offset+size])
+                    audio.data_ref = (data, 0, size)
+                    if audio.data is None:
+                        audio.content_hash = digest
+        for bank in self.wwise_banks.values():
+            bank.data = detach(bank.data)
+            bank.original_data = detach(bank.original_data)
+            if bank.hierarchy is None:
+                continue
+            for entry in bank.hierarchy.entries.values():
+                entry.misc = detach(entry.misc)
+                if isinstance(entry, (MusicSegment, RandomSequenceContainer)):
+                    entry.unused_sections = [detach(section) for section in entry.unused_sections]
+                if isinstance(entry, MusicSegment):
+                    for marker in entry.markers:
+                        marker[2] = detach(marker[2])
+        for mapping in mappings:
+            try:
+                mapping.close()
+            except BufferError:
+                logger.warning("A memory-mapped archive is still referenced "
+                               "and cannot be released yet")
+        
+    def to_file(self, path):
+        """
+        Write the archive straight to disk. Every section is written at the 
+        offset rebuild_headers assigned to it, followed by its zero padding, 
+        so no copy of the whole output is ever held in memory.
+        """
+        self.num_files = len(self.wwise_streams) + 2*len(self.wwise_banks) + len(self.text_banks)
+        self.num_types = 0
+        if len(self.wwise_streams) > 0: self.num_types += 1
+        if len(self.wwise_banks) > 0: self.num_types += 2
+        if len(self.text_banks) > 0: self.num_types += 1
+
+        type_entries = []
+        if len(self.wwise_streams) > 0:
+            type_entries.append((WWISE_STREAM, len(self.wwise_streams)))
+        if len(self.wwise_banks) > 0:
+            type_entries.append((WWISE_BANK, len(self.wwise_banks)))
+            type_entries.append((WWISE_DEP, len(self.wwise_banks)))
+        if len(self.text_banks) > 0:
+            type_entries.append((STRING, len(self.text_banks)))
+
+        toc_headers = [stream.toc_header for stream in self.wwise_streams.values()]
+        toc_headers += [bank.toc_header for bank in self.wwise_banks.values()]
+        toc_headers += [bank.dep.toc_header for bank in self.wwise_banks.values()]
+        toc_headers += [entry.toc_header for entry in self.text_banks.values()]
+        header_table = bytearray(TOC_HEADER_STRUCT.size * len(toc_headers))
+        for n, toc_header in enumerate(toc_headers):
+            toc_header.pack_into(header_table, n * TOC_HEADER_STRUCT.size)
+
+        self.release_mappings([os.path.join(path, self.name),
+                               os.path.join(path, self.name+".stream")])
+        self.remove_cache(os.path.join(path, self.name))
+        with open(os.path.join(path, self.name), 'w+b') as toc_file:
+            toc_file.write(UINT32_STRUCT.pack(self.magic))
+            toc_file.write(UINT32_STRUCT.pack(self.num_types))
+            toc_file.write(UINT32_STRUCT.pack(self.num_files))
+            toc_file.write(UINT32_STRUCT.pack(self.unknown))
+            toc_file.write(self.unk4Data)
+            for type_id, count in type_entries:
+                toc_file.write(TOC_TYPE_STRUCT.pack(0, type_id, count, 16, 64))
+            toc_file.write(header_table)
+
+            end = toc_file.tell()
+            for stream in self.wwise_streams.values():
+                end = max(end, _write_aligned(toc_file, stream.toc_header.toc_data_offset, stream.TocData))
+            for bank in self.wwise_banks.values():
+                end = max(end, _write_aligned(toc_file, bank.toc_header.toc_data_offset, bank.toc_data_header, bank.get_data()))
+            for bank in self.wwise_banks.values():
+                end = max(end, _write_aligned(toc_file, bank.dep.toc_header.toc_data_offset, bank.dep.get_data()))
+            for entry in self.text_banks.values():
+                end = max(end, _write_aligned(toc_file, entry.toc_header.toc_data_offset, entry.get_data()))
+            # empty sections placed past the last write still extend the file
+            toc_file.truncate(end)
+
+        # the .stream file is only created when there is something to put in it
+        stream_file = None
+        try:
+            end = 0
+            for stream in self.wwise_streams.values():
+                data = stream.content.get_data()
+                offset = stream.toc_header.stream_file_offset
+                if stream_file is None:
+                    if offset == 0 and len(data) == 0:
+                        continue
+                    stream_file = open(os.path.join(path, self.name+".stream"), 'w+b')
+                end = max(end, _write_aligned(stream_file, offset, data))
+            if stream_file is not None:
+                stream_file.truncate(end)
+        finally:
+            if stream_file is not None:
+                stream_file.close()
+
+    def rebuild_headers(self, progress_callback=None):
+        self.num_types = 0
+        if len(self.wwise_streams) > 0: self.num_types += 1
+        if len(self.wwise_banks) > 0: self.num_types += 2
+        if len(self.text_banks) > 0: self.num_types += 1
+        self.num_files = len(self.wwise_streams) + 2*len(self.wwise_banks) + len(self.text_banks)
+
+        for value in self.wwise_banks.values():
+            value.generate(self.audio_sources, self.music_track_events, progress_callback)
+        for value in self.text_banks.values():
+            value.generate(string_entries=self.string_entries)
+
+        # headers in the order to_file writes them; deps take the size of 
+        # their bank
+        stream_headers = [value.toc_header for value in self.wwise_streams.values()]
+        bank_headers = [value.toc_header for value in self.wwise_banks.values()]
+        dep_headers = [value.dep.toc_header for value in self.wwise_banks.values()]
+        text_headers = [value.toc_header for value in self.text_banks.values()]
+        toc_headers = stream_headers + bank_headers + dep_headers + text_headers
+        sized_headers = stream_headers + bank_headers + bank_headers + text_headers
+
+        toc_sizes = numpy.fromiter((h.toc_data_size for h in sized_headers), dtype=numpy.uint64, count=len(sized_headers))
+        toc_offsets = _exclusive_cumsum(_16_byte_align_array(toc_sizes)) + (80 + self.num_types * 32 + 80 * self.num_files)
+        stream_sizes = numpy.fromiter((value.toc_header.stream_size for value in self.wwise_streams.values()), dtype=numpy.uint64, count=len(self.wwise_streams))
+        stream_offsets = _exclusive_cumsum(_16_byte_align_array(stream_sizes))
+
+        for toc_header, offset in zip(toc_headers, toc_offsets.tolist()):
+            toc_header.toc_data_offset = offset
+        for value, offset in zip(self.wwise_streams.values(), stream_offsets.tolist()):
+            value.toc_header.stream_file_offset = offset
+
+        self.toc_index = numpy.array([h.get_values() for h in toc_headers], dtype=TOC_HEADER_DTYPE)
+        
+    def get_stream_resource_ids(self, bank):
+        """
+        @return (dict): source id -> stream resource id for every streamed 
+        VORBIS source in `bank`, hashed as one batch
+        """
+        source_ids = [
+            source.source_id
+            for entry in bank.hierarchy.entries.values()
+            for source in entry.sources
+            if source.plugin_id == VORBIS and source.stream_type in [STREAM, PREFETCH_STREAM]
+        ]
+        if not source_ids:
+            return {}
+        return dict(zip(source_ids, get_stream_resource_ids(bank.dep.data, source_ids, 
+                                                            self.stream_resource_ids)))
+
+    def load(self, toc_file, stream_file):
+        self.wwise_streams.clear()
+        self.wwise_banks.clear()
+        self.audio_sources.clear()
+        self.text_banks.clear()
+        self.music_track_events.clear()
+        self.string_entries.clear()
+        self.music_segments.clear()
+        self.resource_index.clear()
+        
+        media_index = MediaIndex()
+        
+        self.magic      = toc_file.uint32_read()
+        if self.magic != 4026531857: return False
+
+        self.num_types   = toc_file.uint32_read()
+        self.num_files   = toc_file.uint32_read()
+        self.unknown    = toc_file.uint32_read()
+        self.unk4Data   = bytes(toc_file.read(56))
+        toc_file.seek(toc_file.tell() + 32 * self.num_types)
+        self.toc_index = self.read_toc_index(toc_file, self.num_files)
+        type_ids = self.toc_index["type_id"]
+        for toc_header in self.iter_toc_headers(self.toc_index[type_ids == WWISE_STREAM]):
+            audio = AudioSource()
+            audio.stream_type = STREAM
+            entry = WwiseStream()
+            entry.toc_header = toc_header
+            toc_file.seek(toc_header.toc_data_offset)
+            entry.TocData = bytearray(toc_file.read(toc_header.toc_data_size))
+            audio.set_data_ref(stream_file.data, toc_header.stream_file_offset, toc_header.stream_size)
+            audio.resource_id = toc_header.file_id
+            entry.set_content(audio)
+            self.wwise_streams[entry.get_id()] = entry
+        for toc_header in self.iter_toc_headers(self.toc_index[type_ids == WWISE_BANK]):
+            entry = WwiseBank()
+            entry.toc_header = toc_header
+            toc_data_offset = toc_header.toc_data_offset
+            toc_data_size = toc_header.toc_data_size
+            toc_file.seek(toc_data_offset)
+            entry.toc_data_header = bytearray(toc_file.read(16))
+            bank = BankParser()
+            bank_data = toc_file.read(toc_header.toc_data_size-16)
+            bank.load(bank_data)
+            entry.bank_header = "BKHD".encode('utf-8') + len(bank.chunks["BKHD"]).to_bytes(4, byteorder="little") + bank.chunks["BKHD"]
+            
+            hirc = HircReader(soundbank=entry)
+            try:
+                hirc.load(bank.chunks['HIRC'])
+            except KeyError:
+                pass
+            entry.hierarchy = hirc
+            #Add all bank sources to the source list
+            if "DIDX" in bank.chunks.keys():
+                bank_id = entry.toc_header.file_id
+                media_index.load(bank.chunks["DIDX"], bank.chunks["DATA"])
+            
+            entry.bank_misc_data = b''
+            for chunk in bank.chunks.keys():
+                if chunk not in ["BKHD", "DATA", "DIDX", "HIRC"]:
+                    entry.bank_misc_data = entry.bank_misc_data + chunk.encode('utf-8') + len(bank.chunks[chunk]).to_bytes(4, byteorder='little') + bank.chunks[chunk]
+                    
+            entry.set_original_data(bank_data)
+            self.wwise_banks[entry.get_id()] = entry
+        for toc_header in self.iter_toc_headers(self.toc_index[type_ids == WWISE_DEP]):
+            dep = WwiseDep()
+            dep.toc_header = toc_header
+            toc_file.seek(toc_header.toc_data_offset)
+            dep.from_memory_stream(toc_file)
+            try:
+                self.wwise_banks[toc_header.file_id].dep = dep
+            except KeyError:
+                pass
+        for toc_header in self.iter_toc_headers(self.toc_index[type_ids == STRING]):
+            toc_file.seek(toc_header.toc_data_offset)
+            data = toc_file.read(toc_header.toc_data_size)
+            num_entries = int.from_bytes(data[8:12], byteorder='little')
+            language = int.from_bytes(data[12:16], byteorder='little')
+            if language not in self.string_entries:
+                self.string_entries[language] = {}
+            id_section_start = 16
+            offset_section_start = id_section_start + 4 * num_entries
+            data_section_start = offset_section_start + 4 * num_entries
+            ids = data[id_section_start:offset_section_start]
+            offsets = data[offset_section_start:data_section_start]
+            text_bank = TextBank()
+            text_bank.toc_header = toc_header
+            text_bank.language = language
+            for n in range(num_entries):
+                entry = StringEntry()
+                string_id = int.from_bytes(ids[4*n:+4*(n+1)], byteorder="little")
+                text_bank.string_ids.append(string_id)
+                string_offset = int.from_bytes(offsets[4*n:4*(n+1)], byteorder="little")
+                entry.string_id = string_id
+                stopIndex = string_offset + 1
+                while data[stopIndex] != 0:
+                    stopIndex += 1
+                entry.text = bytes(data[string_offset:stopIndex]).decode('utf-8')
+                self.string_entries[language][string_id] = entry
+            self.text_banks[text_bank.get_id()] = text_bank
+        
+        # ---------- Backwards compatibility checks ----------
+        for bank in self.wwise_banks.values():
+            if bank.dep == None: #can be None because older versions didn't save the dep along with the bank
+                if not self.load_deps():
+                    print("Failed to load")
+                    self.wwise_streams.clear()
+                    self.wwise_banks.clear()
+                    self.text_banks.clear()
+                    self.audio_sources.clear()
+                    return
+                break
+        
+        if len(self.wwise_banks) == 0 and len(self.wwise_streams) > 0: #0 if patch was only for streams
+            if not self.load_banks():
+                print("Failed to load")
+                self.wwise_streams.clear()
+                self.wwise_banks.clear()
+                self.text_banks.clear()
+                self.audio_sources.clear()
+                return
+        # ---------- End backwards compatibility checks ----------
+        
+        # Create all AudioSource objects
+        for bank in self.wwise_banks.values():
+            stream_resource_ids = self.get_stream_resource_ids(bank)
+            for entry in bank.hierarchy.entries.values():
+                for source in entry.sources:
+                    if source.plugin_id == VORBIS and source.stream_type == BANK and source.source_id not in self.audio_sources:
+                        try:
+                            audio = AudioSource()
+                            audio.stream_type = BANK
+                            audio.short_id = source.source_id
+                            audio.set_data_ref(*media_index.get_data_ref(source.source_id))
+                            self.audio_sources[source.source_id] = audio
+                        except KeyError:
+                            pass
+                    elif source.plugin_id == VORBIS and source.stream_type in [STREAM, PREFETCH_STREAM] and source.source_id not in self.audio_sources:
+                        try:
+                            audio = self.wwise_streams[stream_resource_ids[source.source_id]].content
+                            audio.short_id = source.source_id
+                            self.audio_sources[source.source_id] = audio
+                        except KeyError:
+                            pass
+                    elif source.plugin_id == REV_AUDIO and source.stream_type == BANK and source.source_id not in self.audio_sources:
+                        try:
+                            custom_fx = bank.hierarchy.entries[source.source_id]
+                            data = custom_fx.get_data()
+                            plugin_param_size = int.from_bytes(data[13:17], byteorder="little")
+                            media_index_id = int.from_bytes(data[19+plugin_param_size:23+plugin_param_size], byteorder="little")
+                            audio = AudioSource()
+                            audio.stream_type = BANK
+                            audio.short_id = media_index_id
+                            audio.set_data_ref(*media_index.get_data_ref(media_index_id))
+                            self.audio_sources[media_index_id] = audio
+                        except KeyError:
+                            pass
+                for info in entry.track_info:
+                    if info.event_id != 0:
+                        self.music_track_events[info.event_id] = info
+                        info.soundbanks.add(bank)
+                if isinstance(entry, MusicSegment):
+                    self.music_segments[entry.get_id()] = entry
+
+        #construct list of audio sources in each bank
+        #add track_info to audio sources?
+        for bank in self.wwise_banks.values():
+            for entry in bank.hierarchy.entries.values():
+                for info in entry.track_info:
+                    try:
+                        if info.source_id != 0:
+                            self.audio_sources[info.source_id].set_track_info(info, notify_subscribers=False, set_modified=False)
+                    except:
+                        continue
+                for source in entry.sources:
+                    try:
+                        if source.plugin_id == VORBIS and self.audio_sources[source.source_id] not in bank.get_content(): #may be missing streamed audio if the patch didn't change it
+                            bank.add_content(self.audio_sources[source.source_id])
+                    except:
+                        continue
+
+        for audio in self.audio_sources.values():
+            self.resource_index.setdefault(audio.resource_id, audio)
+                
+    def get_audio_by_resource_id(self, resource_id):
+        """
+        @return (AudioSource | None): the audio source bound to the stream 
+        with `resource_id`
+        """
+        return self.resource_index.get(resource_id)
+        
+    def locate_archive(self):
+        """
+        Called when the original game archive a patch was made against is not 
+        in GAME_FILE_LOCATION. Front ends override this to ask the user for it.
+
+        @return (str): path of the original archive, or "" to give up
+        """
+        logger.warning("This patch may have been created using an older "
+                       "version of the audio modding tool and is missing "
+                       f"required data. Cannot find the original of {self.name}")
+        return ""
+
+    def load_deps(self):
+        archive_file = ""
+        if os.path.exists(GAME_FILE_LOCATION):
+            archive_file = os.path.join(GAME_FILE_LOCATION, strip_patch_index(self.name))
+        if not os.path.exists(archive_file):
+            archive_file = self.locate_archive()
+            if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
+                archive_file = os.path.splitext(archive_file)[0]
+        if not os.path.exists(archive_file):
+            return False
+        self.source_files.append(_file_key(archive_file))
+        toc_file, mapping = map_file(archive_file)
+        try:
+            return self._load_deps(toc_file)
+        finally:
+            # Nothing parsed here keeps a view into the original archive
+            toc_file.close()
+            if mapping is not None:
+                try:
+                    mapping.close()
+                except BufferError as err:
+                    logger.warning(f"Failed to release {archive_file}: {err}. "
+                                   "A view into it is still referenced.")
+
+    def _load_deps(self, toc_file):
+        self.magic      = toc_file.uint32_read()
+        if self.magic != 4026531857: return False
+
+        self.num_types   = toc_file.uint32_read()
+        self.num_files   = toc_file.uint32_read()
+        self.unknown    = toc_file.uint32_read()
+        self.unk4Data   = bytes(toc_file.read(56))
+        toc_file.seek(toc_file.tell() + 32 * self.num_types)
+        toc_index = self.read_toc_index(toc_file, self.num_files)
+        bank_ids = numpy.fromiter(self.wwise_banks.keys(), dtype=numpy.uint64, count=len(self.wwise_banks))
+        mask = (toc_index["type_id"] == WWISE_DEP) & numpy.isin(toc_index["file_id"], bank_ids)
+        for toc_header in self.iter_toc_headers(toc_index[mask]):
+            dep = WwiseDep()
+            dep.toc_header = toc_header
+            toc_file.seek(toc_header.toc_data_offset)
+            dep.from_memory_stream(toc_file)
+            self.wwise_banks[toc_header.file_id].dep = dep
+        return True
+        
+    def load_banks(self):
+        archive_file = ""
+        if os.path.exists(GAME_FILE_LOCATION):
+            archive_file = os.path.join(GAME_FILE_LOCATION, strip_patch_index(self.name))
+        if not os.path.exists(archive_file):
+            archive_file = self.locate_archive()
+            if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
+                archive_file = os.path.splitext(archive_file)[0]
+        if not os.path.exists(archive_file):
+            return False
+        toc_file = self.map_file(archive_file)
+
+        self.magic      = toc_file.uint32_read()
+        if self.magic != 4026531857: return False
+
+        self.num_types   = toc_file.uint32_read()
+        self.num_files   = toc_file.uint32_read()
+        self.unknown    = toc_file.uint32_read()
+        self.unk4Data   = bytes(toc_file.read(56))
+        toc_file.seek(toc_file.tell() + 32 * self.num_types)
+        toc_index = self.read_toc_index(toc_file, self.num_files)
+        type_ids = toc_index["type_id"]
+        for toc_header in self.iter_toc_headers(toc_index[type_ids == WWISE_BANK]):
+            entry = WwiseBank()
+            entry.toc_header = toc_header
+            toc_data_offset = toc_header.toc_data_offset
+            toc_data_size = toc_header.toc_data_size
+            toc_file.seek(toc_data_offset)
+            entry.toc_data_header = bytearray(toc_file.read(16))
+            #-------------------------------------
+            bank = BankParser()
+            bank_data = toc_file.read(toc_header.toc_data_size-16)
+            bank.load(bank_data)
+            entry.bank_header = "BKHD".encode('utf-8') + len(bank.chunks["BKHD"]).to_bytes(4, byteorder="little") + bank.chunks["BKHD"]
+            
+            hirc = HircReader(soundbank=entry)
+            try:
+                hirc.load(bank.chunks['HIRC'])
+            except KeyError:
+                continue
+            entry.hierarchy = hirc
+            #-------------------------------------
+            entry.bank_misc_data = b''
+            for chunk in bank.chunks.keys():
+                if chunk not in ["BKHD", "DATA", "DIDX", "HIRC"]:
+                    entry.bank_misc_data = entry.bank_misc_data + chunk.encode('utf-8') + len(bank.chunks[chunk]).to_bytes(4, byteorder='little') + bank.chunks[chunk]
+            
+            # These banks come from the base game while their streams come 
+            # from the patch, so the original chunk bytes are never reused
+            self.wwise_banks[entry.get_id()] = entry
+        for toc_header in self.iter_toc_headers(toc_index[type_ids == WWISE_DEP]):
+            dep = WwiseDep()
+            dep.toc_header = toc_header
+            toc_file.seek(toc_header.toc_data_offset)
+            dep.from_memory_stream(toc_file)
+            try:
+                self.wwise_banks[toc_header.file_id].dep = dep
+            except KeyError:
+                pass
+        
+        #only include banks that contain at least 1 of the streams
+        temp_banks = {}
+        for key, bank in self.wwise_banks.items():
+            # wwise_streams is keyed by resource id
+            stream_resource_ids = self.get_stream_resource_ids(bank)
+            if any(resource_id in self.wwise_streams for resource_id in stream_resource_ids.values()):
+                temp_banks[key] = bank
+        self.wwise_banks = temp_banks
+        
+        return True
+        
+class NullProgress:
+    """
+    Stand-in for a progress window when there is no UI.
+    """
+
+    def __init__(self, title, max_progress):
+        self.title = title
+        self.max_progress = max_progress
+
+    def show(self):
+        pass
+
+    def step(self):
+        pass
+
+    def set_text(self, s):
+        pass
+
+    def destroy(self):
+        pass
+
+class FileHandler:
+    """
+    Archive parsing, patching and export without any UI. Front ends subclass 
+    this and override create_file_reader, create_progress, show_error and 
+    show_warning, and ask for the paths the methods here take as arguments.
+    """
+
+    def __init__(self):
+        self.file_reader = self.create_file_reader()
+
+    def create_file_reader(self):
+        return FileReader()
+
+    def create_progress(self, title, max_progress):
+        return NullProgress(title, max_progress)
+
+    def show_error(self, title, message):
+        logger.error(f"{title}: {message}")
+
+    def show_warning(self, title, message):
+        logger.warning(f"{title}: {message}")
+        
+    def revert_all(self):
+        for audio in self.file_reader.audio_sources.values():
+            audio.revert_modifications()
+        for language in self.file_reader.string_entries.values():
+            for string in language.values():
+                string.revert_modifications()
+        for track_info in self.file_reader.music_track_events.values():
+            track_info.revert_modifications()
+        for music_segment in self.file_reader.music_segments.values():
+            music_segment.revert_modifications()
+        
+    def revert_audio(self, file_id):
+        audio = self.get_audio_by_id(file_id)
+        audio.revert_modifications()
+        
+    def set_audio_data(self, audio, data):
+        """
+        Replace the payload of `audio`, sharing the buffer with any other 
+        source that already holds identical data.
+        """
+        data, digest = self.file_reader.share_payload(data)
+        audio.set_data(data)
+        audio.content_hash = digest
+
+    def write_muted_wav(self, save_path):
+        subprocess.run([
+            FFMPEG, 
+            "-f", "lavfi", 
+            "-i", "anullsrc=r=48000:cl=stereo",
+            "-t", "1", # TO-DO, this should match up with actual duration
+            "-c:a", "pcm_s16le",
+            f"{save_path}.wav"],
+            stdout=subprocess.DEVNULL
+        )
+
+    def convert_to_wav(self, data, save_path):
+        """
+        @return (bool): whether vgmstream produced `save_path`.wav
+        """
+        with open(f"{save_path}.wem", 'wb') as f:
+            f.write(data)
+        process = subprocess.run(
+            [VGMSTREAM, "-o", f"{save_path}.wav", f"{save_path}.wem"], 
+            stdout=subprocess.DEVNULL
+        )
+        os.remove(f"{save_path}.wem")
+        if process.returncode != 0:
+            logger.error(f"Encountered error when converting {os.path.basename(save_path)}.wem to .wav")
+            return False
+        return True
+
+    def link_export(self, source_file, output_file):
+        """
+        Hard link an already exported file to `output_file`, copying it when 
+        the file system cannot link.
+        """
+        try:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            try:
+                os.link(source_file, output_file)
+            except OSError:
+                shutil.copyfile(source_file, output_file)
+        except OSError as e:
+            logger.error(f"Failed to export {os.path.basename(output_file)}: {e}")
+
+    def export_audio(self, jobs, progress_window, as_wav=False, muted=False):
+        """
+        Export (audio, save path without extension) jobs. Every unique 
+        payload (by content hash) is written or converted once; duplicates 
+        are hard links to the first export.
+        """
+        ext = ".wav" if as_wav or muted else ".wem"
+        exported = {}
+        for audio, save_path in jobs:
+            output_file = save_path + ext
+            progress_window.set_text("Dumping " + os.path.basename(output_file))
+            key = "muted" if muted else audio.get_content_hash()
+            if key in exported:
+                self.link_export(exported[key], output_file)
+            elif muted:
+                self.write_muted_wav(save_path)
+            elif as_wav:
+                self.convert_to_wav(audio.get_data(), save_path)
+            else:
+                with open(output_file, "wb") as f:
+                    f.write(audio.get_data())
+            if key not in exported and os.path.exists(output_file):
+                exported[key] = output_file
+            progress_window.step()
+
+    def get_bank_export_jobs(self, folder):
+        """
+        @return (list[tuple[AudioSource, str]]): one job per audio source of 
+        every bank, saved into a subfolder named after the bank
+        """
+        jobs = []
+        for bank in self.file_reader.wwise_banks.values():
+            subfolder = os.path.join(folder, os.path.basename(bank.dep.data.replace('\x00', '')))
+            if not os.path.exists(subfolder):
+                os.mkdir(subfolder)
+            for audio in bank.get_content():
+                jobs.append((audio, os.path.join(subfolder, f"{audio.get_id()}")))
+        return jobs
+
+    def dump_as_wem(self, file_id, output_file):
+        with open(output_file, "wb") as f:
+            f.write(self.get_audio_by_id(file_id).get_data())
+        
+    def dump_as_wav(self, file_id, output_file, muted: bool = False):
+        save_path = os.path.splitext(output_file)[0]
+
+        if muted:
+            self.write_muted_wav(save_path)
+            return
+
+        self.convert_to_wav(self.get_audio_by_id(file_id).get_data(), save_path)
+        
+    def dump_multiple_as_wem(self, file_ids, folder):
+        progress_window = self.create_progress(title="Dumping Files", max_progress=len(file_ids))
+        progress_window.show()
+        
+        if os.path.exists(folder):
+            jobs = []
+            for file_id in file_ids:
+                audio = self.get_audio_by_id(file_id)
+                if audio is not None:
+                    jobs.append((audio, os.path.join(folder, f"{audio.get_id()}")))
+            self.export_audio(jobs, progress_window)
+        else:
+            print("Invalid folder selected, aborting dump")
+            
+        progress_window.destroy()
+        
+    def dump_multiple_as_wav(self, file_ids: list[str], folder: str,
+                             muted: bool = False, with_seq: bool = False):
+        if not os.path.exists(folder):
+            logger.warning("Invalid folder selected, aborting dump")
+            return
+
+        progress_window = self.create_progress(title="Dumping Files", 
+                                         max_progress=len(file_ids))
+        progress_window.show()
+
+        jobs = []
+        for i, file_id in enumerate(file_ids, start=0):
+            audio: AudioSource | None = self.get_audio_by_id(int(file_id))
+            if audio is None:
+                continue
+            basename = str(audio.get_id())
+            if with_seq:
+                basename = f"{i:02d}" + "_" + basename
+            jobs.append((audio, os.path.join(folder, basename)))
+        self.export_audio(jobs, progress_window, as_wav=True, muted=muted)
+
+        progress_window.destroy()
+
+    def dump_all_as_wem(self, folder):
+        progress_window = self.create_progress(title="Dumping Files", max_progress=len(self.file_reader.audio_sources))
+        progress_window.show()
+        
+        if os.path.exists(folder):
+            self.export_audio(self.get_bank_export_jobs(folder), progress_window)
+        else:
+            print("Invalid folder selected, aborting dump")
+            
+        progress_window.destroy()
+    
+    def dump_all_as_wav(self, folder):
+        progress_window = self.create_progress(title="Dumping Files", max_progress=len(self.file_reader.audio_sources))
+        progress_window.show()
+        
+        if os.path.exists(folder):
+            self.export_audio(self.get_bank_export_jobs(folder), progress_window, as_wav=True)
+        else:
+            print("Invalid folder selected, aborting dump")
+            
+        progress_window.destroy()
+        
+    def get_number_prefix(self, n):
+        number = ''.join(takewhile(str.isdigit, n or ""))
+        try:
+            return int(number)
+        except:
+            logger.warning(f"File name must begin with a number: {n}")
+        
+    def save_archive_file(self, folder):
+        if os.path.exists(folder):
+            self.file_reader.rebuild_headers(self.bank_generation_progress())
+            self.file_reader.to_file(folder)
+        else:
+            print("Invalid folder selected, aborting save")
+            return False
+        return True
+            
+    def get_audio_by_id(self, file_id):
+        try:
+            return self.file_reader.audio_sources[file_id] #short_id
+        except KeyError:
+            pass
+        return self.file_reader.get_audio_by_resource_id(file_id)
+                
+    def get_event_by_id(self, event_id):
+        try:
+            return self.file_reader.music_track_events[event_id]
+        except:
+            pass
+            
+    def get_string_by_id(self, string_id):
+        try:
+            return self.file_reader.string_entries[language][string_id]
+        except:
+            pass
+        
+    def get_music_segment_by_id(self, segment_id):
+        try:
+            return self.file_reader.music_segments[segment_id]
+        except:
+            pass
+
+    def get_music_segment_sources(self, segment):
+        """
+        @return (list[tuple[AudioSource, TrackInfoStruct]]): every audio 
+        source placed on the tracks of `segment`, with its placement
+        """
+        sources = []
+        if segment.soundbank is None:
+            return sources
+        entries = segment.soundbank.hierarchy.entries
+        for track_id in segment.tracks:
+            track = entries.get(track_id)
+            if track is None:
+                continue
+            for info in track.track_info:
+                if info.source_id == 0:
+                    continue
+                audio = self.get_audio_by_id(info.source_id)
+                if audio is not None:
+                    sources.append((audio, info))
+        return sources
+        
+    def get_wwise_streams(self):
+        return self.file_reader.wwise_streams
+        
+    def get_wwise_banks(self):
+        return self.file_reader.wwise_banks
+        
+    def get_audio(self):
+        return self.file_reader.audio_sources
+        
+    def get_strings(self):
+        return self.file_reader.string_entries
+        
+    def load_archive_file(self, archive_file: str):
+        if os.path.splitext(archive_file)[1] in (".stream", ".gpu_resources"):
+            archive_file = os.path.splitext(archive_file)[0]
+        if os.path.exists(archive_file):
+            try:
+                self.file_reader.from_file(archive_file)
+            except Exception as e:
+                logger.error(f"Error occured when loading {archive_file}: {e}.")
+                logger.warning("Aborting load")
+                return False
+        else:
+            print("Invalid file selected, aborting load")
+            return False
+        return True
+            
+            
+    def load_patch(self, patch_file: str): #TO-DO: only import if DIFFERENT from original audio; makes it possible to import different mods that change the same soundbank
+        patch_file_reader = self.create_file_reader()
+        if os.path.splitext(patch_file)[1] in (".stream", ".gpu_resources"):
+            patch_file = os.path.splitext(patch_file)[0]
+        if os.path.exists(patch_file):
+            try:
+                patch_file_reader.from_file(patch_file)
+            except Exception as e:
+                logger.error(f"Error occured when loading {patch_file}: {e}.")
+                logger.warning("Aborting load")
+                return False
+        else:
+            print("Invalid file selected, aborting load")
+            return False
+            
+        progress_window = self.create_progress(title="Loading Files", max_progress=len(patch_file_reader.audio_sources))
+        progress_window.show()
+        
+        for bank in patch_file_reader.wwise_banks.values(): #something is a bit wrong here
+            #load audio content from the patch
+            for new_audio in bank.get_content():
+                progress_window.set_text(f"Loading {new_audio.get_id()}")
+                old_audio = self.get_audio_by_id(new_audio.get_short_id())
+                if old_audio is not None:
+                    if (not old_audio.modified and new_audio.get_data() != old_audio.get_data()
+                        or old_audio.modified and new_audio.get_data() != old_audio.get_original_data()):
+                        # copied out of the patch file mapping so the patch 
+                        # can be overwritten later in this session
+                        self.set_audio_data(old_audio, new_audio.get_data())
+                    if old_audio.get_track_info() is not None and new_audio.get_track_info() is not None:
+                        old_info = old_audio.get_track_info()
+                        new_info = new_audio.get_track_info()
+                        if (
+                            (
+                                not old_info.modified 
+                                and (
+                                    old_info.play_at != new_info.play_at
+                                    or old_info.begin_trim_offset != new_info.begin_trim_offset
+                                    or old_info.end_trim_offset != new_info.end_trim_offset
+                                    or old_info.source_duration != new_info.source_duration
+                                )
+                            )
+                            or
+                            (
+                                old_info.modified
+                                and (
+                                    old_info.play_at_old != new_info.play_at
+                                    or old_info.begin_trim_offset_old != new_info.begin_trim_offset
+                                    or old_info.end_trim_offset_old != new_info.end_trim_offset
+                                    or old_info.source_duration_old != new_info.source_duration
+                                )
+                            )
+                        ):
+                            old_audio.get_track_info().set_data(play_at=new_info.play_at, begin_trim_offset=new_info.begin_trim_offset, end_trim_offset=new_info.end_trim_offset, source_duration=new_info.source_duration)
+                progress_window.step()
+
+        for key, music_segment in patch_file_reader.music_segments.items():
+            try:
+                old_music_segment = self.file_reader.music_segments[key]
+            except:
+                continue
+            if (
+                (
+                    not old_music_segment.modified
+                    and (
+                        music_segment.entry_marker[1] != old_music_segment.entry_marker[1]
+                        or music_segment.exit_marker[1] != old_music_segment.exit_marker[1]
+                        or music_segment.duration != old_music_segment.duration
+                    )
+                )
+                or
+                (
+                    old_music_segment.modified
+                    and (
+                        music_segment.entry_marker[1] != old_music_segment.entry_marker_old
+                        or music_segment.exit_marker[1] != old_music_segment.exit_marker_old
+                        or music_segment.duration != old_music_segment.duration_old
+                    )
+                )
+            ):
+                old_music_segment.set_data(duration=music_segment.duration, entry_marker=music_segment.entry_marker[1], exit_marker=music_segment.exit_marker[1])
+
+        for text_data in patch_file_reader.text_banks.values():
+            for string_id in text_data.string_ids:
+                new_text_data = patch_file_reader.string_entries[language][string_id]
+                try:
+                    old_text_data = self.file_reader.string_entries[language][string_id]
+                except:
+                    continue
+                if (
+                    (not old_text_data.modified and new_text_data.get_text() != old_text_data.get_text())
+                    or (old_text_data.modified and new_text_data.get_text() != old_text_data.text_old)
+                ):
+                    old_text_data.set_text(new_text_data.get_text())
+        
+        progress_window.destroy()
+        return True
+
+    def bank_generation_progress(self):
+        """
+        @return (Callable[[str, int, int], None]): progress callback for 
+        WwiseBank.generate that shows one progress window per regenerated bank
+        """
+        windows = []
+        def report(bank_name, progress, max_progress):
+            if progress == 0:
+                window = self.create_progress("Generating Soundbanks", max_progress)
+                window.show()
+                window.set_text(f"Generating {bank_name}")
+                windows.append(window)
+            else:
+                windows[-1].step()
+            if progress == max_progress:
+                windows.pop().destroy()
+        return report
+
+    def write_patch(self, folder):
+        if os.path.exists(folder):
+            patch_file_reader = FileReader()
+            patch_file_reader.name = self.file_reader.name + ".patch_0"
+            patch_file_reader.magic = self.file_reader.magic
+            patch_file_reader.num_types = 0
+            patch_file_reader.num_files = 0
+            patch_file_reader.unknown = self.file_reader.unknown
+            patch_file_reader.unk4Data = self.file_reader.unk4Data
+            patch_file_reader.audio_sources = self.file_reader.audio_sources
+            patch_file_reader.string_entries = self.file_reader.string_entries
+            patch_file_reader.music_track_events = self.file_reader.music_track_events
+            patch_file_reader.music_segments = self.file_reader.music_segments
+            patch_file_reader.wwise_banks = {}
+            patch_file_reader.wwise_streams = {}
+            patch_file_reader.text_banks = {}
+            
+            for key, value in self.file_reader.wwise_streams.items():
+                if value.content.modified:
+                    patch_file_reader.wwise_streams[key] = value
+                    
+            for key, value in self.file_reader.wwise_banks.items():
+                if value.modified:
+                    patch_file_reader.wwise_banks[key] = value
+                    
+            for key, value in self.file_reader.text_banks.items():
+                for string_id in value.string_ids:
+                    if self.file_reader.string_entries[value.language][string_id].modified:
+                        patch_file_reader.text_banks[key] = value
+                        break
+     
+            patch_file_reader.rebuild_headers(self.bank_generation_progress())
+            patch_file_reader.to_file(folder)
+        else:
+            print("Invalid folder selected, aborting save")
+            return False
+        return True
+
+    def load_wems(self, wems: Union[tuple[str, ...], list[str]], set_duration=True): 
+        progress_window = self.create_progress(title="Loading Files", 
+                                         max_progress=len(wems))
+        progress_window.show()
+        for wem in wems:
+            basename = os.path.basename(wem)
+            splits: list[str] = basename.split("_", 1)
+            try:
+                match splits:
+                    case [prefix, name] if int(prefix) < 10000:
+                        basename = name
+            except:
+                pass
+            progress_window.set_text("Loading " + basename)
+            file_id: int | None = self.get_number_prefix(basename)
+            if file_id == None:
+                continue
+            audio: str | None = self.get_audio_by_id(file_id)
+            if audio == None:
+                continue
+            with open(wem, 'rb') as f:
+                self.set_audio_data(audio, f.read())
+            if set_duration:
+                try:
+                    process = subprocess.run([VGMSTREAM, "-m", wem], capture_output=True)
+                    process.check_returncode()
+                except:
+                    logger.warning(f"Failed to get duration info for {wem}")
+                    continue
+                for line in process.stdout.decode("utf-8").split("\n"):
+                    if "sample rate" in line:
+                        sample_rate = float(line[13:line.index("Hz")-1])
+                    if "stream total samples" in line:
+                        total_samples = int(line[22:line.index("(")-1])
+                len_ms = total_samples * 1000 / sample_rate
+                if audio.get_track_info() is not None:
+                    audio.get_track_info().set_data(play_at=0, begin_trim_offset=0, end_trim_offset=0, source_duration=len_ms)
+                # find music segment for Audio Source
+                stop = False
+                for segment in self.file_reader.music_segments.values():
+                    for track_id in segment.tracks:
+                        track = segment.soundbank.hierarchy.entries[track_id]
+                        for source in track.sources:
+                            if source.source_id == audio.get_short_id():
+                                segment.set_data(duration=len_ms, entry_marker=0, exit_marker=len_ms)
+                                stop = True
+                                break
+                        if stop:
+                            break
+                    if stop:
+                        break
+            progress_window.step()
+        progress_window.destroy()
+        
+    def create_external_sources_list(self, sources: list[str]):
+        root = etree.Element("ExternalSourcesList", attrib={
+            "SchemaVersion": "1",
+            "Root": __file__
+        })
+        file = etree.ElementTree(root)
+        for source in sources:
+            etree.SubElement(root, "Source", attrib={
+                "Path": source,
+                "Conversion": DEFAULT_CONVERSION_SETTING,
+                "Destination": os.path.basename(source)
+            })
+        file.write(os.path.join(CACHE, "external_sources.wsources"))
+        
+        return os.path.join(CACHE, "external_sources.wsources")
+        
+        
+    def load_wavs(self, wavs: Union[tuple[str, ...], list[str]]):
+        source_list = self.create_external_sources_list(wavs)
+        
+        try:
+            if SYSTEM in ["Windows", "Darwin"]:
+                subprocess.run([
+                    WWISE_CLI,
+                    "migrate",
+                    DEFAULT_WWISE_PROJECT,
+                    "--quiet",
+                ]).check_returncode()
+            else:
+                self.show_error(title="Operation Failed",
+                    message="The current operating system does not support this feature yet")
+        except Exception as e:
+            logger.error(e)
+            self.show_error(title="Error", message="Error occurred during project migration. Please check log.txt.")
+        
+        convert_dest = os.path.join(CACHE, SYSTEM)
+        try:
+            if SYSTEM == "Darwin":
+                subprocess.run([
+                    WWISE_CLI,
+                    "convert-external-source",
+                    DEFAULT_WWISE_PROJECT,
+                    "--platform", "Windows",
+                    "--source-file",
+                    source_list,
+                    "--output",
+                    CACHE,
+                ]).check_returncode()
+            elif SYSTEM == "Windows":
+                subprocess.run([
+                    WWISE_CLI,
+                    "convert-external-source",
+                    DEFAULT_WWISE_PROJECT,
+                    "--platform", "Windows",
+                    "--source-file",
+                    source_list,
+                    "--output",
+                    CACHE,
+                ]).check_returncode()
+            else:
+                self.show_error(title="Operation Failed",
+                    message="The current operating system does not support this feature yet")
+        except Exception as e:
+            logger.error(e)
+            self.show_error(title="Error", message="Error occurred during conversion. Please check log.txt.")
+            
+        wems = [os.path.join(convert_dest, x) for x in os.listdir(convert_dest)]
+        
+        self.load_wems(wems)
+        
+        for wem in wems:
+            try:
+                os.remove(wem)
+            except:
+                pass
+                
+        try:
+            os.remove(source_list)
+        except:
+            pass
+
+    def load_wav_by_mapping(self,
+                 project: str,
+                 wems: list[tuple[str, AudioSource, int]],
+                 schema: etree.Element) -> bool:
+        if len(wems) == 0:
+            return True
+        tree = etree.ElementTree(schema)
+        schema_path = os.path.join(CACHE, "schema.xml")
+        tree.write(schema_path, encoding="utf-8", xml_declaration=True)
+        convert_ok = True
+        convert_dest = os.path.join(CACHE, SYSTEM)
+        try:
+            if SYSTEM == "Darwin":
+                subprocess.run([
+                    WWISE_CLI,
+                    "convert-external-source",
+                    project,
+                    "--platform", "Windows",
+                    "--source-file",
+                    schema_path,
+                    "--output",
+                    CACHE,
+                ]).check_returncode()
+            elif SYSTEM == "Windows":
+                subprocess.run([
+                    WWISE_CLI,
+                    "convert-external-source",
+                    project,
+                    "--platform", "Windows",
+                    "--source-file",
+                    schema_path,
+                    "--output",
+                    CACHE,
+                ]).check_returncode()
+            else:
+                convert_ok = False
+                self.show_error(title="Operation Failed",
+                    message="The current operating system does not support this feature yet")
+        except Exception as e:
+            convert_ok = False
+            logger.error(e)
+            self.show_error(title="Error", message="Error occurred during conversion. Please check log.txt.")
+
+        if not convert_ok:
+            return False
+
+        for wem in wems:
+            try:
+                dest_path = os.path.join(convert_dest, wem[0])
+                assert(os.path.exists(dest_path))
+                with open(dest_path, "rb") as f:
+                    self.set_audio_data(wem[1], f.read())
+            except Exception as e:
+                logger.error(e)
+
+        try:
+            os.remove(schema_path)
+            shutil.rmtree(convert_dest)
+        except Exception as e:
+            logger.error(e)
+
+        return True
+
+    def load_convert_spec(self, spec_path: str):
+        if not os.path.exists(spec_path):
+            self.show_error(title="Operation Failed", message=f"{spec_path} does not exist.")
+            logger.warning(f"{spec_path} does not exist. Import operation " \
+                    "cancelled")
+            return
+
+        root_spec: Any = None
+        try:
+            with open(spec_path, mode="r") as f:
+                root_spec = json.load(f)
+        except json.JSONDecodeError as err:
+            logger.warning(err)
+            root_spec = None
+
+        if root_spec == None:
+            return
+
+        if not isinstance(root_spec, dict):
+            self.show_error(title="Operation Failed",
+                      message="Invalid data format in the given spec file.") 
+            logger.warning("Invalid data format in the given spec file. Import "
+                           "operation cancelled")
+            return
+
+        # Validate version number #
+        if "v" not in root_spec:
+            self.show_error(title="Operation Failed", 
+                      message="The given spec file is missing field `v`") 
+            logger.warning("The given spec file is missing field `v`. Import "
+                           "operation cancelled.")
+            return
+        v = root_spec["v"]
+        if v != 2:
+            self.show_error(title="Operation Failed", 
+                      message="The given spec file contain invalid version " 
+                      f'number {v}.')
+            logger.warning("The given spec file contain invalid version "
+                           f'number {v}. Import operation cancelled')
+            return
+
+        # Validate `specs` field #
+        if "specs" not in root_spec:
+            self.show_error(title="Operation Failed", 
+                      message="The given spec file is missing field `specs`.")
+            logger.warning("The given spec file is missing field `specs`."
+                            " Import operation cancelled.")
+            return
+        if not isinstance(root_spec["specs"], list):
+            self.show_error(title="Operation Failed",
+                      message="Field `specs` is not an array.")
+            logger.warning("Field `specs` is not an array. Import operation "
+                           "cancelled.")
+            return
+
+        # Validate `project` path #
+        project = DEFAULT_WWISE_PROJECT
+        if "project" not in root_spec:
+            logger.warning("Missing field `project`. Using default Wwise project")
+        else:
+            if not isinstance(root_spec["project"], str):
+                logger.warning("Field `project` is not a string. Using default"
+                               " Wwise project")
+            elif not os.path.exists(root_spec["project"]):
+                logger.warning("The given Wwise project does not exist. Using "
+                               "default Wwise project")
+            else:
+                project = root_spec["project"]
+        if not os.path.exists(project):
+            self.show_error(title="Operation Failed",
+                      message="The default Wwise Project does not exist.")
+            logger.warning("The default Wwise Project does not exist. Import "
+                           "operation cancelled.")
+            return
+        # Validate project `conversion` setting #
+        conversion = DEFAULT_CONVERSION_SETTING
+        if project != DEFAULT_WWISE_PROJECT:
+            if "conversion" not in root_spec:
+                self.show_error(title="Operation Failed",
+                          message="Missing field `conversion`.")
+                logger.warning("Missing field `conversion`. Import operation"
+                               " cancelled.")
+                return
+            if not isinstance(root_spec["conversion"], str):
+                self.show_error(title="Operation Failed",
+                          message="Field `conversion` is not a string.")
+                logger.warning("Field `conversion` is not a string. Import "
+                               "operation cancelled.")
+                return
+            conversion = root_spec["conversion"]
+
+        spec_dir = os.path.dirname(spec_path)
+        root = etree.Element("ExternalSourcesList", attrib={
+            "SchemaVersion": "1",
+            "Root": spec_dir
+        })
+        wems: list[tuple[str, AudioSource, int]] = []
+        for sub_spec in root_spec["specs"]:
+            # Validate spec format #
+            if not isinstance(sub_spec, dict):
+                logger.warning("Current entry is not an object. Skipping "
+                               "current entry.")
+                continue
+
+            # Validate work space #
+            workspace = ""
+            if "workspace" not in sub_spec:
+                logger.warning("The given spec file is missing field "
+                               "`workspace`. Use the current directory of the "
+                               "given spec file is in instead.")
+                workspace = spec_dir 
+            else:
+                workspace = sub_spec["workspace"]
+                # Relative path
+                if not os.path.exists(workspace): 
+                    workspace = os.path.join(spec_dir, workspace) 
+            if not os.path.exists(workspace):
+                self.show_warning(title="Operation Skipped",
+                            message=f"{workspace} does not exist.")
+                logger.warning(f"{workspace} does not exist. Skipping current "
+                               "entry.")
+                continue
+
+            # Validate `mapping` format #
+            mapping: dict[str, list[str] | str] | None
+            if "mapping" not in sub_spec:
+                self.show_warning(title="Operation Skipped", 
+                            message=f"The given spec file is missing field " 
+                            "`mapping`")
+                logger.warning("The given spec file is missing field `mapping`. "
+                        "Skipping current entry.")
+                continue
+            mapping = sub_spec["mapping"]
+            if mapping == None or not isinstance(mapping, dict):
+                self.show_warning(title="Operation Skipped", 
+                            message="field `mapping` has an invalid data type")
+                logger.warning("field `mapping` has an invalid data type. Skipping "
+                        "current entry.")
+                continue
+
+            suffix: str = ""
+            if "suffix" in sub_spec:
+                if not isinstance(sub_spec["suffix"], str):
+                    logger.warning("`suffix` is not a str. Disable "
+                            "substring filtering")
+                else:
+                    suffix = sub_spec["suffix"]
+            prefix: str = ""
+            if "prefix" in sub_spec:
+                if not isinstance(sub_spec["prefix"], str):
+                    logger.warning("`prefix` is not a str. Disable "
+                            "substring filtering")
+                else:
+                    prefix = sub_spec["prefix"]
+
+            for src, dest in mapping.items():
+                src = prefix + src + suffix
+
+                abs_src = os.path.join(workspace, src)
+                if not abs_src.endswith(".wav"):
+                    logger.info("Require import file missing .wav extension. "
+                            "Adding extension.")
+                    abs_src += ".wav"
+                if not os.path.exists(abs_src):
+                    logger.warning(f"Required import file does not exist "
+                            "Skipping the current entry.")
+                    continue
+
+                if isinstance(dest, str):
+                    file_id: int | None = self.get_number_prefix(dest)
+                    if file_id == None:
+                        logger.warning(f"{dest} does not contain a valid game "
+                                       "asset file id. Skipping the current "
+                                       "entry.")
+                        continue
+                    audio = self.get_audio_by_id(file_id)
+                    convert_dest = f"{file_id}.wem"
+                    if audio == None:
+                        logger.warning(f"No audio source is associated with "
+                                       f"game asset file id {file_id}. Skipping "
+                                       "the current entry.")
+                        continue
+                    etree.SubElement(root, "Source", attrib={
+                        "Path": abs_src,
+                        "Conversion": conversion,
+                        "Destination": convert_dest 
+                    })
+                    wems.append((convert_dest, audio, file_id))
+                elif isinstance(dest, list):
+                    for d in dest:
+                        if not isinstance(d, str):
+                            logger.warning(f"{d} is not a string. Skipping the "
+                                    "current entry.")
+                        file_id: int | None = self.get_number_prefix(d)
+                        if file_id == None:
+                            logger.warning(f"{d} does not contain a valid game "
+                                           "asset file id. Skipping the current "
+                                           "entry.")
+                            continue
+                        audio = self.get_audio_by_id(file_id)
+                        if audio == None:
+                            logger.warning(f"No audio source is associated with "
+                                           f"game asset file id {file_id}. "
+                                           "Skipping the current entry.")
+                            continue
+                        convert_dest = f"{file_id}.wem"
+                        etree.SubElement(root, "Source", attrib={
+                            "Path": abs_src,
+                            "Conversion": conversion,
+                            "Destination": convert_dest
+                        })
+                        wems.append((convert_dest, audio, file_id))
+                else:
+                    logger.warning(f"{dest} is not a string or list of string. "
+                            "Skipping the current entry.")
+            out: str | None = None
+            if "write_patch_to" not in sub_spec:
+                continue
+            out = sub_spec["write_patch_to"]
+            if not isinstance(out, str):
+                self.show_warning(title="Operation Skipped", 
+                            message="field `write_patch_to` has an invalid data "
+                            "type. Write patch operation cancelled.")
+                logger.warning("field `write_patch_to` has an invalid data "
+                               "type. Write patch operation cancelled.")
+                continue
+            if not os.path.exists(out):
+                # Relative patch write #
+                out = os.path.join(spec_dir, out)
+                if not os.path.exists(out):
+                    self.show_warning(title="Operation Skipped",
+                                message=f"{out} does not exist. Write patch "
+                                "operation cancelled.")
+                    logger.warning(f"{out} does not exist. Write patch operation "
+                                   "cancelled.")
+                    continue
+            if not self.load_wav_by_mapping(project, wems, root):
+                continue
+            if not self.write_patch(folder=out):
+                self.show_error(title="Operation Failed", message="Write patch operation failed. Check "
+                            "log.txt for detailed.")
+            root = etree.Element("ExternalSourcesList", attrib={
+                "SchemaVersion": "1",
+                "Root": spec_dir 
+            })
+            is_revert = "revert" in sub_spec and \
+                    isinstance(sub_spec["revert"], bool) and \
+                    sub_spec["revert"]
+            is_revert_all = "revert_all" in sub_spec and \
+                    isinstance(sub_spec["revert_all"], bool) and \
+                    sub_spec["revert_all"]
+            if is_revert_all:
+                self.revert_all()
+                continue
+            if is_revert:
+                for wem in wems:
+                    self.revert_audio(wem[2])
+            wems.clear()
+
+        self.load_wav_by_mapping(project, wems, root)
+        out: str | None = None
+        if "write_patch_to" not in root_spec:
+            return
+        out = root_spec["write_patch_to"]
+        if not isinstance(out, str):
+            self.show_error(title="Operation Failed", 
+                      message="field `write_patch_to` has an invalid data "
+                      "type. Write patch operation cancelled.")
+            logger.warning("field `write_patch_to` has an invalid data "
+                           "type. Write patch operation cancelled.")
+            return
+        if not os.path.exists(out):
+            # Relative path patch writing #
+            out = os.path.join(spec_dir, out)
+            if not os.path.exists(out):
+                self.show_error(title="Operation Failed",
+                          message=f"{out} does not exist. Write patch "
+                          "operation cancelled.")
+                logger.warning(f"{out} does not exist. Write patch operation "
+                              "cancelled.")
+                return
+        if not self.write_patch(folder=out):
+            self.show_error(title="Operation Failed",
+                      message="Write patch operation failed. Check "
+                      "log.txt for detailed.")
+
+        is_revert = "revert" in root_spec and \
+                isinstance(root_spec["revert"], bool) and \
+                root_spec["revert"]
+        if is_revert:
+            for wem in wems:
+                self.revert_audio(wem[2])
+
+    def load_wems_spec(self, spec_path: str):
+        if not os.path.exists(spec_path):
+            self.show_error(title="Operation Failed", 
+                      message=f"{spec_path} does not exist.")
+            logger.warning(f"{spec_path} does not exist. Import operation "
+                           "cancelled")
+            return
+
+        root_spec: Any = None
+        try:
+            with open(spec_path, mode="r") as f:
+                root_spec = json.load(f)
+        except json.JSONDecodeError as err:
+            logger.warning(err)
+            root_spec = None
+
+        if root_spec == None:
+            return
+
+        if not isinstance(root_spec, dict):
+            self.show_error(title="Operation Failed",
+                      message="Invalid data format in the given spec file.") 
+            logger.warning("Invalid data format in the given spec file. Import "
+                    "operation cancelled")
+            return
+
+        # Validate version number # 
+        if "v" not in root_spec:
+            self.show_error(title="Operation Failed",
+                      message="The given spec file is missing field `v`") 
+            logger.warning("The given spec file is missing field `v`. Import "
+                    "operation cancelled.")
+            return
+        if root_spec["v"] != 2:
+            self.show_error(title="Operation Failed",
+                      message="The given spec file contain invalid version " + 
+                        f'number {root_spec["v"]}.')
+            logger.warning("The given spec file contain invalid version "
+                    f'number {root_spec["v"]}. Import operation cancelled')
+            return
+
+        # Validate `specs` format #
+        if "specs" not in root_spec:
+            self.show_error(title="Operation Failed",
+                      message="The given spec file is missing field `specs`.")
+            logger.warning("The given spec file is missing field `specs`."
+                            " Import operation cancelled.")
+            return
+        if not isinstance(root_spec["specs"], list):
+            self.show_error(title="Operation Failed",
+                      message="Field `specs` is not an array.")
+            logger.warning("Field `specs` is not an array. Import operation "
+                           "cancelled.")
+            return
+
+        spec_dir = os.path.dirname(spec_path)
+        patched_ids: list[int] = []
+        for sub_spec in root_spec["specs"]:
+            if not isinstance(sub_spec, dict):
+                logger.warning("Current entry is not an object. Skipping "
+                               "current entry.")
+                continue
+
+            workspace = ""
+            # Validate work space # 
+            if "workspace" not in sub_spec:
+                logger.warning("The given spec file is missing field "
+                               "`workspace`. Use the current directory of the "
+                               "given spec file is in instead.")
+                workspace = spec_dir
+            else:
+                workspace = sub_spec["workspace"]
+                # Relative path
+                if not os.path.exists(workspace): 
+                    workspace = os.path.join(spec_dir, workspace) 
+            if not os.path.exists(workspace):
+                self.show_warning(title="Operation Skipped",
+                            message=f"{workspace} does not exist.")
+                logger.warning(f"{workspace} does not exist. Skipping current"
+                        " entry")
+                continue
+
+            # Validate `mapping` format # 
+            mapping: dict[str, list[str] | str] | None
+            if "mapping" not in sub_spec:
+                self.show_warning(title="Operation Skipped",
+                            message=f"The given spec file is missing field "
+                            "`mapping`")
+                logger.warning("The given spec file is missing field `mapping`. "
+                        "Skipping current entry")
+                continue
+            mapping = sub_spec["mapping"]
+            if mapping == None or not isinstance(mapping, dict):
+                self.show_warning(title="Operation Skipped",
+                            message="field `mapping` has an invalid data type")
+                logger.warning("field `mapping` has an invalid data type. "
+                        "Skipping current entry")
+                continue
+
+            suffix: str = ""
+            if "suffix" in sub_spec:
+                if not isinstance(sub_spec["suffix"], str):
+                    logger.warning("`suffix` is not a str. Disable "
+                            "substring filtering")
+                else:
+                    suffix = sub_spec["suffix"]
+            prefix: str = ""
+            if "prefix" in sub_spec:
+                if not isinstance(sub_spec["prefix"], str):
+                    logger.warning("`prefix` is not a str. Disable "
+                            "substring filtering")
+                else:
+                    prefix = sub_spec["prefix"]
+
+            progress_window = self.create_progress(title="Loading Files",
+                                             max_progress=len(sub_spec.items()))
+            progress_window.show()
+
+            for src, dest in mapping.items():
+                logger.info(f"Loading {src} into {dest}")
+                progress_window.set_text(f"Loading {src} into {dest}")
+
+                src = prefix + src + suffix
+
+                abs_src = os.path.join(workspace, src)
+                if not abs_src.endswith(".wem"):
+                    logger.info("Require import file missing .wem extension. "
+                            "Adding extension.")
+                    abs_src += ".wem"
+                if not os.path.exists(abs_src):
+                    logger.warning(f"Required import file does not exist "
+                            "Skipping the current entry.")
+                    continue
+
+                if isinstance(dest, str):
+                    file_id: int | None = self.get_number_prefix(dest)
+                    if file_id == None:
+                        logger.warning(f"{dest} does not contain a valid game "
+                                       "asset file id. Skipping the current "
+                                       "entry.")
+                        continue
+                    audio: str | None = self.get_audio_by_id(file_id)
+                    if audio == None:
+                        logger.warning(f"No audio source is associated with "
+                                       "game asset file id {file_id}. Skipping "
+                                       "the current entry.")
+                        continue
+                    with open(abs_src, "rb") as f:
+                        self.set_audio_data(audio, f.read())
+                    progress_window.step()
+
+                    patched_ids.append(file_id)
+                elif isinstance(dest, list):
+                    for d in dest:
+                        if not isinstance(d, str):
+                            logger.warning(f"{d} is not a string. Skipping the "
+                                    "current entry.")
+                        file_id: int | None = self.get_number_prefix(d)
+                        if file_id == None:
+                            logger.warning(f"{d} does not contain a valid game "
+                                           "asset file id. Skipping the current "
+                                           "entry.")
+                            continue
+                        audio: str | None = self.get_audio_by_id(file_id)
+                        if audio == None:
+                            logger.warning(f"No audio source is associated with "
+                                    "game asset file id {file_id}. Skipping the "
+                                    "current entry.")
+                            continue
+                        with open(abs_src, "rb") as f:
+                            self.set_audio_data(audio, f.read())
+                        progress_window.step()
+
+                        patched_ids.append(file_id)
+                else:
+                    logger.warning(f"{dest} is not a string or list of string. "
+                            "Skipping the current entry.")
+
+            progress_window.destroy()
+
+            out: str | None = None
+            if "write_patch_to" not in sub_spec:
+                return
+            out = sub_spec["write_patch_to"]
+            if not isinstance(out, str):
+                self.show_warning(title="Operation Skipped",
+                            message="field `write_patch_to` has an invalid data "
+                            "type. Write patch operation cancelled.")
+                logger.warning("field `write_patch_to` has an invalid data "
+                               "type. Write patch operation cancelled.")
+                continue
+            if not os.path.exists(out):
+                # Relative path
+                out = os.path.join(spec_dir, out)
+                if not os.path.exists(out):
+                    self.show_warning(title="Operation Skipped", 
+                                message=f"{out} does not exist. Write patch "
+                                "operation cancelled.")
+                    logger.warning(f"{out} does not exist. Write patch operation "
+                                   "cancelled.")
+                    continue
+            if not self.write_patch(folder=out):
+                self.show_error(title="Operation Failed",
+                          message="Write patch operation failed. Check "
+                          "log.txt for detailed.")
+            is_revert = "revert" in sub_spec and \
+                    isinstance(sub_spec["revert"], bool) and \
+                    sub_spec["revert"]
+            if is_revert:
+                for patched_id in patched_ids:
+                    self.revert_audio(patched_id)
+            patched_ids.clear()
+            
+        out: str | None = None
+        if "write_patch_to" not in root_spec:
+            return
+        out = root_spec["write_patch_to"]
+        if not isinstance(out, str):
+            self.show_error(title="Operation Failed", message="field `write_patch_to` has an invalid data "
+                        "type. Write patch operation cancelled.")
+            logger.warning("field `write_patch_to` has an invalid data "
+                           "type. Write patch operation cancelled.")
+            return
+        if not os.path.exists(out):
+            # Relative path
+            out = os.path.join(spec_dir, out)
+            if not os.path.exists(out):
+                self.show_error(title="Operation Failed", message=f"{out} does not exist. Write patch "
+                            "operation cancelled.")
+                logger.warning(f"{out} does not exist. Write patch operation "
+                               "cancelled.")
+                return
+        if not self.write_patch(folder=out):
+            self.show_error(title="Operation Failed", message="Write patch operation failed. Check "
+                            "log.txt for detailed.")
+
+        is_revert = "revert" in root_spec and \
+                isinstance(root_spec["revert"], bool) and \
+                root_spec["revert"]
+        if is_revert:
+            for patched_id in patched_ids:
+                self.revert_audio(patched_id)
+        patched_ids.clear()
@@ -1,5 +1,5 @@
+import hashlib
 import sqlite3
-import uuid
 
 from logging import Logger
 from typing import Callable
@@ -12,6 +12,11 @@ def config_sqlite_conn(db_path: str):
         if conn != None:
             return conn
         conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.OperationalError:
+            pass
         return conn
 
     return _get_sqlite_conn
@@ -45,6 +50,31 @@ class HelldiverAudioSource:
         self.linked_audio_archive_ids = linked_audio_archive_ids
         self.linked_audio_archive_name_ids = linked_audio_archive_name_ids
 
+class HelldiverAudioArchiveFingerprint:
+
+    def __init__(self,
+                 audio_archive_id: str,
+                 file_size: int,
+                 mtime_ns: int,
+                 toc_hash: str = ""):
+        self.audio_archive_id = audio_archive_id
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.toc_hash = toc_hash
+
+    def is_changed(self, other: "HelldiverAudioArchiveFingerprint") -> bool:
+        """
+        @return (bool): True if the archive needs to be re-scanned. Matching 
+        size and mtime means unchanged. Otherwise, if both sides carry a TOC 
+        hash, the hash decides (e.g. a file touched by a verify pass).
+        """
+        if self.file_size == other.file_size and \
+           self.mtime_ns == other.mtime_ns:
+            return False
+        if self.toc_hash != "" and other.toc_hash != "":
+            return self.toc_hash != other.toc_hash
+        return True
+
 """
 Database Access Interface
 """
@@ -60,21 +90,149 @@ class LookupStore:
     def query_helldiver_audio_archive_category(self) -> list[str]:
         return []
 
-    def write_helldiver_audio_source_bulk(self,
-                                          sources: list[HelldiverAudioSource]):
+    def query_helldiver_audio_archive_search(self, 
+                                             query: str, 
+                                             category: str = "",
+                                             limit: int = 50) -> \
+            list[HelldiverAudioArchive]:
+        return []
+
+    def query_helldiver_audio_source(self) -> list[HelldiverAudioSource]:
+        return []
+
+    def query_helldiver_audio_archive_by_source(self, audio_source_id: int) -> \
+            list[HelldiverAudioArchive]:
+        return []
+
+    def query_helldiver_audio_archive_by_sources(
+            self, audio_source_ids: list[int]) -> \
+            dict[int, list[HelldiverAudioArchive]]:
+        return {}
+
+    def query_helldiver_audio_source_by_archive(self, audio_archive_id: str) -> \
+            list[int]:
+        return []
+
+    def query_helldiver_audio_archive_fingerprint(self) -> \
+            dict[str, HelldiverAudioArchiveFingerprint]:
+        return {}
+
+    def write_helldiver_audio_source_bulk(
+            self,
+            links: list[tuple[int, str, str]],
+            fingerprints: list[HelldiverAudioArchiveFingerprint] | None = None):
+        pass
+
+    def update_helldiver_audio_source_links(
+            self,
+            stale_audio_archive_ids: list[str],
+            links: list[tuple[int, str, str]],
+            fingerprints: list[HelldiverAudioArchiveFingerprint],
+            removed_audio_archive_ids: list[str]):
         pass
 
 class SQLiteLookupStore (LookupStore):
 
+    link_table_version: int = 1
+
     def __init__(self, initializer: Callable[[], sqlite3.Connection | None], 
                  logger: Logger):
         self.conn = initializer()
         self.logger = logger
+        self.cursor: sqlite3.Cursor | None = None
         if self.conn != None:
             self.cursor = self.conn.cursor()
+            self._init_audio_source_link_table()
+            self._init_archive_search_index()
         else:
             logger.warning("Builtin audio source lookup is disabled due to \
                     database connection error")
+
+    def _init_audio_source_link_table(self):
+        """
+        Create the normalized audio source link table and its indexes. A 
+        database still using the legacy helldiver_audio_source layout 
+        (comma-joined archive ids / name ids per source) is migrated once, 
+        gated on PRAGMA user_version. The legacy table is dropped only after
+        every one of its links is found in the link table.
+        """
+        if self.conn == None or self.cursor == None:
+            return
+        try:
+            self.cursor.execute("CREATE TABLE IF NOT EXISTS \
+                    helldiver_audio_source_link (\
+                    audio_source_id TEXT NOT NULL, \
+                    audio_archive_id TEXT NOT NULL, \
+                    audio_archive_name_id TEXT NOT NULL, \
+                    PRIMARY KEY (audio_source_id, audio_archive_id)\
+                    ) WITHOUT ROWID")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS \
+                    helldiver_audio_source_link_archive_idx ON \
+                    helldiver_audio_source_link (audio_archive_id)")
+            self.conn.commit()
+            user_version = self.cursor.execute(
+                    "PRAGMA user_version").fetchone()[0]
+            if user_version >= self.link_table_version:
+                return
+            rows = self.cursor.execute("SELECT name FROM sqlite_master \
+                    WHERE type = 'table' AND name = 'helldiver_audio_source'")
+            if rows.fetchone() != None:
+                legacy_rows = self.cursor.execute("SELECT \
+                        audio_source_id, \
+                        linked_audio_archive_ids, \
+                        linked_audio_archive_name_ids \
+                        FROM helldiver_audio_source").fetchall()
+                links = self._legacy_audio_source_links(legacy_rows)
+                self.cursor.executemany("INSERT OR IGNORE INTO \
+                        helldiver_audio_source_link (\
+                        audio_source_id, \
+                        audio_archive_id, \
+                        audio_archive_name_id) VALUES (?, ?, ?)", links)
+                copied = set(self.cursor.execute("SELECT \
+                        audio_source_id, audio_archive_id \
+                        FROM helldiver_audio_source_link").fetchall())
+                if any((str(link[0]), link[1]) not in copied 
+                       for link in links):
+                    self.conn.rollback()
+                    self.logger.error("Audio source link migration is "
+                                      "incomplete. Legacy table is kept.")
+                    return
+                self.cursor.execute("DROP TABLE helldiver_audio_source")
+                self.logger.info(f"Migrated {len(legacy_rows)} audio sources "
+                                 "to the audio source link table")
+            self.cursor.execute(
+                    f"PRAGMA user_version = {self.link_table_version}")
+            self.conn.commit()
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.conn.rollback()
+            self.logger.critical(err, stack_info=True)
+
+    def _legacy_audio_source_links(self, legacy_rows: list[tuple]) -> \
+            list[tuple[str, str, str]]:
+        """
+        Legacy rows only record the two id lists as unordered sets. An archive 
+        is paired with its name id through the archive table, falling back to 
+        the position in the list when the archive table is ambiguous.
+        """
+        name_ids: dict[str, set[str]] = {}
+        for row in self.cursor.execute("SELECT audio_archive_id, \
+                audio_archive_name_id FROM helldiver_audio_archive"):
+            name_ids.setdefault(row[0], set()).add(row[1])
+        links: list[tuple[int, str, str]] = []
+        for row in legacy_rows:
+            audio_archive_ids = [i for i in row[1].split(",") if i != ""]
+            audio_archive_name_ids = [i for i in row[2].split(",") if i != ""]
+            for i, audio_archive_id in enumerate(audio_archive_ids):
+                candidates = name_ids.get(audio_archive_id, set()).intersection(
+                        audio_archive_name_ids)
+                if len(candidates) == 1:
+                    audio_archive_name_id = candidates.pop()
+                elif i < len(audio_archive_name_ids):
+                    audio_archive_name_id = audio_archive_name_ids[i]
+                else:
+                    audio_archive_name_id = ""
+                links.append((row[0], audio_archive_id, audio_archive_name_id))
+        return links
     
     def query_helldiver_audio_archive(self, category: str = "") -> \
             list[HelldiverAudioArchive]:
@@ -108,6 +266,141 @@ class SQLiteLookupStore (LookupStore):
         finally:
             return archives 
 
+    def _init_archive_search_index(self):
+        """
+        Build a trigram FTS5 index over archive ids, names and categories. A 
+        checksum of the catalogue rows is kept in 
+        helldiver_audio_archive_search_meta and the index is rebuilt whenever
+        it no longer matches, so renamed or recategorized archives are picked
+        up as well as added or removed ones. Without FTS5 / trigram support, 
+        searches fall back to LIKE over the catalogue.
+        """
+        self.archive_search_index = False
+        if self.conn == None or self.cursor == None:
+            return
+        try:
+            self.cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS \
+                    helldiver_audio_archive_search USING fts5(\
+                    audio_archive_id, \
+                    audio_archive_name_id UNINDEXED, \
+                    audio_archive_name, \
+                    audio_archive_category, \
+                    tokenize = 'trigram')")
+            self.cursor.execute("CREATE TABLE IF NOT EXISTS \
+                    helldiver_audio_archive_search_meta (\
+                    key TEXT PRIMARY KEY, \
+                    value TEXT NOT NULL)")
+            indexed = self.cursor.execute("SELECT value \
+                    FROM helldiver_audio_archive_search_meta \
+                    WHERE key = 'catalogue_checksum'").fetchone()
+            catalogued = self._archive_catalogue_checksum()
+            if indexed == None or indexed[0] != catalogued:
+                self.cursor.execute(
+                    "DELETE FROM helldiver_audio_archive_search")
+                self.cursor.execute("INSERT INTO \
+                        helldiver_audio_archive_search (\
+                        audio_archive_id, \
+                        audio_archive_name_id, \
+                        audio_archive_name, \
+                        audio_archive_category) SELECT \
+                        audio_archive_id, \
+                        helldiver_audio_archive.audio_archive_name_id, \
+                        audio_archive_name, \
+                        audio_archive_category \
+                        FROM helldiver_audio_archive INNER JOIN \
+                        helldiver_audio_archive_name ON \
+                        helldiver_audio_archive.audio_archive_name_id = \
+                        helldiver_audio_archive_name.audio_archive_name_id")
+                self.cursor.execute("INSERT OR REPLACE INTO \
+                        helldiver_audio_archive_search_meta (key, value) \
+                        VALUES ('catalogue_checksum', ?)", (catalogued,))
+            self.conn.commit()
+            self.archive_search_index = True
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.conn.rollback()
+            self.logger.warning(f"Archive search index is unavailable: {err}")
+
+    def _archive_catalogue_checksum(self) -> str:
+        """
+        @return (str): SHA-1 over every row the search index is built from
+        """
+        rows = self.cursor.execute("SELECT \
+                audio_archive_id, \
+                helldiver_audio_archive.audio_archive_name_id, \
+                audio_archive_name, \
+                audio_archive_category \
+                FROM helldiver_audio_archive INNER JOIN \
+                helldiver_audio_archive_name ON \
+                helldiver_audio_archive.audio_archive_name_id = \
+                helldiver_audio_archive_name.audio_archive_name_id \
+                ORDER BY 1, 2, 3, 4")
+        checksum = hashlib.sha1()
+        for row in rows:
+            checksum.update(repr(row).encode())
+        return checksum.hexdigest()
+
+    def query_helldiver_audio_archive_search(self, 
+                                             query: str, 
+                                             category: str = "",
+                                             limit: int = 50) -> \
+            list[HelldiverAudioArchive]:
+        """
+        Search archives whose id or name contains the query, optionally within
+        a category. Results are ranked (bm25 over the trigram index) and capped at limit. Queries 
+        shorter than a trigram use a LIKE scan of the index instead.
+        """
+        archives: list[HelldiverAudioArchive] = []
+        query = query.strip()
+        if query == "" or self.cursor == None:
+            return archives
+        try:
+            category_filter = ""
+            if category != "":
+                category_filter = "AND audio_archive_category = ?"
+            if self.archive_search_index and len(query) >= 3:
+                # Only ids and names are matched. The category column is 
+                # filtered on, so results agree with a plain substring match.
+                args = ("{audio_archive_id audio_archive_name} : \"" + 
+                        query.replace("\"", "\"\"") + "\"",)
+                if category != "":
+                    args += (category,)
+                rows = self.cursor.execute("SELECT \
+                        audio_archive_id, \
+                        audio_archive_name_id, \
+                        audio_archive_name \
+                        FROM helldiver_audio_archive_search \
+                        WHERE helldiver_audio_archive_search MATCH ? " \
+                        f"{category_filter} \
+                        GROUP BY audio_archive_id \
+                        ORDER BY min(rank) LIMIT ?", args + (limit,))
+            else:
+                table = "helldiver_audio_archive_search"
+                if not self.archive_search_index:
+                    table = "helldiver_audio_archive INNER JOIN \
+                            helldiver_audio_archive_name USING \
+                            (audio_archive_name_id)"
+                pattern = "%" + query.replace("\\", "\\\\") \
+                        .replace("%", "\\%").replace("_", "\\_") + "%"
+                args = (pattern, pattern)
+                if category != "":
+                    args += (category,)
+                rows = self.cursor.execute("SELECT \
+                        audio_archive_id, \
+                        audio_archive_name_id, \
+                        audio_archive_name \
+                        FROM " + table + " \
+                        WHERE (audio_archive_id LIKE ? ESCAPE '\\' OR \
+                        audio_archive_name LIKE ? ESCAPE '\\') " \
+                        f"{category_filter} \
+                        GROUP BY audio_archive_id \
+                        ORDER BY audio_archive_name LIMIT ?", args + (limit,))
+            archives = [HelldiverAudioArchive(row[0], row[1], row[2]) 
+                        for row in rows]
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return archives
+
     def query_helldiver_audio_archive_category(self) -> list[str]:
         audio_archive_categories: list[str] = []
         try:
@@ -131,28 +424,203 @@ class SQLiteLookupStore (LookupStore):
 #        rows = self.cursor.execute("", args)
 #        return {row[0]: row[1] for row in rows} 
 
-    def write_helldiver_audio_source_bulk(self,
-                                          sources: list[HelldiverAudioSource]):
+    def _create_fingerprint_table(self):
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS \
+                helldiver_audio_archive_fingerprint (\
+                audio_archive_id TEXT PRIMARY KEY, \
+                file_size INTEGER NOT NULL, \
+                mtime_ns INTEGER NOT NULL, \
+                toc_hash TEXT NOT NULL DEFAULT '')")
+
+    def _write_fingerprints(self, 
+                            fingerprints: list[HelldiverAudioArchiveFingerprint]):
+        self._create_fingerprint_table()
+        data = [
+                (
+                    fingerprint.audio_archive_id,
+                    fingerprint.file_size,
+                    fingerprint.mtime_ns,
+                    fingerprint.toc_hash
+                )
+                for fingerprint in fingerprints
+                ]
+        self.cursor.executemany("INSERT OR REPLACE INTO \
+                helldiver_audio_archive_fingerprint (\
+                audio_archive_id, \
+                file_size, \
+                mtime_ns, \
+                toc_hash) VALUES (?, ?, ?, ?)", data)
+
+    def query_helldiver_audio_source(self) -> list[HelldiverAudioSource]:
+        sources: dict[int, HelldiverAudioSource] = {}
+        try:
+            rows = self.cursor.execute("SELECT \
+                    audio_source_id, \
+                    audio_archive_id, \
+                    audio_archive_name_id \
+                    FROM helldiver_audio_source_link")
+            for row in rows:
+                audio_source_id = int(row[0])
+                if audio_source_id not in sources:
+                    sources[audio_source_id] = HelldiverAudioSource(
+                            audio_source_id, set(), set())
+                sources[audio_source_id].linked_audio_archive_ids.add(row[1])
+                sources[audio_source_id].linked_audio_archive_name_ids.add(row[2])
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return list(sources.values())
+
+    def query_helldiver_audio_archive_by_source(self, audio_source_id: int) -> \
+            list[HelldiverAudioArchive]:
+        archives: list[HelldiverAudioArchive] = []
+        try:
+            rows = self.cursor.execute("SELECT \
+                    audio_archive_id, \
+                    helldiver_audio_source_link.audio_archive_name_id, \
+                    COALESCE(audio_archive_name, '') \
+                    FROM helldiver_audio_source_link LEFT JOIN \
+                    helldiver_audio_archive_name ON \
+                    helldiver_audio_source_link.audio_archive_name_id = \
+                    helldiver_audio_archive_name.audio_archive_name_id \
+                    WHERE audio_source_id = ?", (str(audio_source_id),))
+            archives = [HelldiverAudioArchive(row[0], row[1], row[2]) 
+                        for row in rows]
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return archives
+
+    def query_helldiver_audio_archive_by_sources(
+            self, audio_source_ids: list[int]) -> \
+            dict[int, list[HelldiverAudioArchive]]:
+        """
+        Batch variant of query_helldiver_audio_archive_by_source. Ids are 
+        looked up through the link table's primary key in chunks that stay 
+        under SQLite's bound parameter limit.
+
+        @return (dict[int, list[HelldiverAudioArchive]]): archives by audio 
+        source id. Every requested id is present, possibly with no archives.
+        """
+        archives: dict[int, list[HelldiverAudioArchive]] = {
+            audio_source_id: [] for audio_source_id in audio_source_ids
+        }
+        ids = [str(audio_source_id) for audio_source_id in archives]
+        try:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self.cursor.execute("SELECT \
+                        audio_source_id, \
+                        audio_archive_id, \
+                        helldiver_audio_source_link.audio_archive_name_id, \
+                        COALESCE(audio_archive_name, '') \
+                        FROM helldiver_audio_source_link LEFT JOIN \
+                        helldiver_audio_archive_name ON \
+                        helldiver_audio_source_link.audio_archive_name_id = \
+                        helldiver_audio_archive_name.audio_archive_name_id \
+                        WHERE audio_source_id IN " \
+                        f"({','.join('?' * len(chunk))})", chunk)
+                for row in rows:
+                    archives[int(row[0])].append(
+                        HelldiverAudioArchive(row[1], row[2], row[3]))
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return archives
+
+    def query_helldiver_audio_source_by_archive(self, audio_archive_id: str) -> \
+            list[int]:
+        audio_source_ids: list[int] = []
+        try:
+            rows = self.cursor.execute("SELECT audio_source_id \
+                    FROM helldiver_audio_source_link \
+                    WHERE audio_archive_id = ?", (audio_archive_id,))
+            audio_source_ids = [int(row[0]) for row in rows]
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return audio_source_ids
+
+    def query_helldiver_audio_archive_fingerprint(self) -> \
+            dict[str, HelldiverAudioArchiveFingerprint]:
+        fingerprints: dict[str, HelldiverAudioArchiveFingerprint] = {}
+        try:
+            self._create_fingerprint_table()
+            rows = self.cursor.execute("SELECT \
+                    audio_archive_id, file_size, mtime_ns, toc_hash \
+                    FROM helldiver_audio_archive_fingerprint")
+            fingerprints = {
+                row[0]: HelldiverAudioArchiveFingerprint(
+                    row[0], row[1], row[2], row[3]
+                ) for row in rows
+            }
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.logger.critical(err, stack_info=True)
+        finally:
+            return fingerprints
+
+    def _write_audio_source_links(self, links: list[tuple[int, str, str]]):
+        # source ids are unsigned 64 bit, which do not fit SQLite INTEGER
+        self.cursor.executemany("INSERT OR IGNORE INTO \
+                helldiver_audio_source_link (\
+                audio_source_id, \
+                audio_archive_id, \
+                audio_archive_name_id) VALUES (?, ?, ?)", 
+                [(str(link[0]), link[1], link[2]) for link in links])
+
+    def write_helldiver_audio_source_bulk(
+            self,
+            links: list[tuple[int, str, str]],
+            fingerprints: list[HelldiverAudioArchiveFingerprint] | None = None):
+        """
+        Replace every (audio_source_id, audio_archive_id, 
+        audio_archive_name_id) link in one transaction. When fingerprints 
+        are given, the fingerprint table is replaced in the same transaction.
+        """
         if self.conn == None or self.cursor == None:
             return
         try:
-            self.cursor.execute("DELETE FROM helldiver_audio_source")
+            self.cursor.execute("DELETE FROM helldiver_audio_source_link")
+            self._write_audio_source_links(links)
+            if fingerprints != None:
+                self._create_fingerprint_table()
+                self.cursor.execute(
+                    "DELETE FROM helldiver_audio_archive_fingerprint")
+                self._write_fingerprints(fingerprints)
             self.conn.commit()
-            data = [
-                    (
-                        uuid.uuid4().hex,
-                        str(source.audio_source_id),
-                        ",".join(source.linked_audio_archive_ids),
-                        ",".join(source.linked_audio_archive_name_ids)
-                    )
-                    for source in sources
-                    ]
-            self.cursor.executemany("INSERT INTO helldiver_audio_source (\
-                    audio_source_db_id, \
-                    audio_source_id, \
-                    linked_audio_archive_ids, \
-                    linked_audio_archive_name_ids) VALUES (\
-                    ?, ?, ?, ?)", data)
+        except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.conn.rollback()
+            self.logger.error(err)
+
+    def update_helldiver_audio_source_links(
+            self,
+            stale_audio_archive_ids: list[str],
+            links: list[tuple[int, str, str]],
+            fingerprints: list[HelldiverAudioArchiveFingerprint],
+            removed_audio_archive_ids: list[str]):
+        """
+        Drop the links of stale archives (re-scanned or removed), insert the 
+        new (audio_source_id, audio_archive_id, audio_archive_name_id) links 
+        and record the archive fingerprints. Everything is committed in one 
+        transaction so fingerprints never get ahead of the links they describe.
+        """
+        if self.conn == None or self.cursor == None:
+            return
+        try:
+            self.cursor.executemany(
+                "DELETE FROM helldiver_audio_source_link \
+                WHERE audio_archive_id = ?",
+                [(audio_archive_id,) 
+                 for audio_archive_id in stale_audio_archive_ids])
+            self._write_audio_source_links(links)
+            self._create_fingerprint_table()
+            self.cursor.executemany(
+                "DELETE FROM helldiver_audio_archive_fingerprint \
+                WHERE audio_archive_id = ?",
+                [(audio_archive_id,) 
+                 for audio_archive_id in removed_audio_archive_ids])
+            self._write_fingerprints(fingerprints)
             self.conn.commit()
         except (sqlite3.OperationalError, sqlite3.IntegrityError) as err:
+            self.conn.rollback()
             self.logger.error(err)
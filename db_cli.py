@@ -1,80 +1,237 @@
+import argparse
+import hashlib
+import multiprocessing
 import os
-import platform
 
 import config as cfg
+import core
 import db
 from log import logger
-from audio_modder import FileHandler, AudioSource
-from audio_modder import VGMSTREAM, VORBIS
+from core import FileHandler, AudioSource
+from core import VORBIS
+
+def _init_scan_worker(game_data_path: str):
+    core.GAME_FILE_LOCATION = game_data_path
+    # archives are scanned once per change; caching them only costs disk
+    core.FileReader.use_archive_cache = False
+
+def fingerprint_audio_archive(
+        archive_file: str,
+        audio_archive_id: str,
+        previous: db.HelldiverAudioArchiveFingerprint | None = None,
+        with_toc_hash: bool = False,
+        ) -> db.HelldiverAudioArchiveFingerprint | None:
+    """
+    Fingerprint an archive by the size and mtime of its TOC and .stream 
+    files. The TOC hash is only computed when requested and the cheap 
+    fingerprint differs from the previous one.
+
+    @return (db.HelldiverAudioArchiveFingerprint | None): None if the archive 
+    is missing from the game data folder
+    """
+    if not os.path.exists(archive_file):
+        return None
+    file_size = 0
+    mtime_ns = 0
+    for path in (archive_file, archive_file + ".stream"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            file_size += stat.st_size
+            mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+    fingerprint = db.HelldiverAudioArchiveFingerprint(
+        audio_archive_id, file_size, mtime_ns)
+    if previous != None and not previous.is_changed(fingerprint):
+        fingerprint.toc_hash = previous.toc_hash
+    elif with_toc_hash:
+        toc_hash = hashlib.blake2b(digest_size=16)
+        with open(archive_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                toc_hash.update(chunk)
+        fingerprint.toc_hash = toc_hash.hexdigest()
+    return fingerprint
+
+def scan_audio_archive(task: tuple[str, str, str]) -> \
+        tuple[str, list[tuple[int, str, str]] | None]:
+    """
+    Parse one audio archive and collect the Vorbis audio sources referenced
+    by its banks' hierarchies. Runs inside a pool worker so it only returns
+    plain tuples, which are cheap to pickle back to the parent.
+
+    @param task: (archive_file, audio_archive_id, audio_archive_name_id)
+    @return (tuple[str, list[tuple[int, str, str]] | None]): the archive id 
+    and (source_id, audio_archive_id, audio_archive_name_id) for every audio 
+    source found, or None if the archive failed to load
+    """
+    archive_file, audio_archive_id, audio_archive_name_id = task
+    file_handler = FileHandler()
+    if not file_handler.load_archive_file(archive_file=archive_file):
+        logger.warning(f"Failed to load audio archive {audio_archive_id}")
+        return audio_archive_id, None
+
+    results: list[tuple[int, str, str]] = []
+    found_sources: set[int] = set()
+    viewed_sources: set[int] = set()
+    for bank in file_handler.get_wwise_banks().values():
+        viewed_sources.clear()
+        for hierarchy_entry in bank.hierarchy.entries.values():
+            for source in hierarchy_entry.sources:
+                source_id = source.source_id
+                is_vorbis = source.plugin_id == VORBIS
+                if not is_vorbis or source_id in viewed_sources:
+                    continue
+                viewed_sources.add(source_id)
+                audio = file_handler.get_audio_by_id(source_id)
+                if not isinstance(audio, AudioSource):
+                    continue
+                audio_id: int = audio.get_id()
+                if audio_id in found_sources:
+                    continue
+                found_sources.add(audio_id)
+                results.append(
+                    (audio_id, audio_archive_id, audio_archive_name_id))
+    return audio_archive_id, results
+
+def scan_audio_archives(
+        tasks: list[tuple[str, str, str]],
+        game_data_path: str,
+        workers: int | None = None,
+        ) -> dict[str, list[tuple[int, str, str]]]:
+    """
+    @param workers: number of worker processes used to scan archives. 
+    Defaults to the number of CPUs. 1 scans in the current process.
+    @return (dict[str, list[tuple[int, str, str]]]): scan results by archive 
+    id. Archives that failed to load are left out.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    scanned: dict[str, list[tuple[int, str, str]]] = {}
+    if workers == 1:
+        _init_scan_worker(game_data_path)
+        for task in tasks:
+            audio_archive_id, results = scan_audio_archive(task)
+            if results != None:
+                scanned[audio_archive_id] = results
+    else:
+        with multiprocessing.Pool(workers, 
+                                  initializer=_init_scan_worker, 
+                                  initargs=(game_data_path,)) as pool:
+            for audio_archive_id, results in pool.imap_unordered(
+                    scan_audio_archive, tasks):
+                if results != None:
+                    scanned[audio_archive_id] = results
+    return scanned
 
 def generate_audio_source_table(
         app_state: cfg.Config,
         lookup_store: db.LookupStore,
-        file_handler: FileHandler,
+        workers: int | None = None,
+        full_rebuild: bool = False,
+        with_toc_hash: bool = False,
         ):
-    audio_sources: dict[int, db.HelldiverAudioSource] = {}
-    loaded_audio_archives: set[str] = set()
+    """
+    Only archives whose fingerprint changed since the last run are re-scanned
+    and only their audio source links are rewritten. The
+    whole table is rebuilt when there are no stored fingerprints yet or when
+    full_rebuild is set.
+
+    @param workers: see scan_audio_archives
+    @param with_toc_hash: also hash the TOC of archives whose size / mtime 
+    changed, so archives that were only touched are not re-scanned
+    """
+    tasks: list[tuple[str, str, str]] = []
+    audio_archive_name_ids: dict[str, str] = {}
     loaded_audio_archive_name_ids: set[str] = set()
     audio_archives = lookup_store.query_helldiver_audio_archive()
     for audio_archive in audio_archives:
         audio_archive_id = audio_archive.audio_archive_id
         audio_archive_name_id = audio_archive.audio_archive_name_id
-        if audio_archive_id in loaded_audio_archives:
+        if audio_archive_id in audio_archive_name_ids:
             continue
         if audio_archive_name_id in loaded_audio_archive_name_ids:
             continue
-        loaded_audio_archives.add(audio_archive_id)
+        audio_archive_name_ids[audio_archive_id] = audio_archive_name_id
         loaded_audio_archive_name_ids.add(audio_archive_name_id)
 
         archive_file = os.path.join(app_state.game_data_path, audio_archive_id)
-        file_handler.load_archive_file(archive_file=archive_file)
-
-        banks = file_handler.get_wwise_banks()
-        viewed_sources: set[int] = set()
-        for bank in banks.values():
-            viewed_sources.clear()
-            for hierarchy_entry in bank.hierarchy.entries.values():
-                for source in hierarchy_entry.sources:
-                    source_id = source.source_id
-                    is_vorbis = source.plugin_id == VORBIS
-                    if not is_vorbis or source_id in viewed_sources:
-                        continue
-                    viewed_sources.add(source_id)
-                    audio = file_handler.get_audio_by_id(source_id)
-                    if not isinstance(audio, AudioSource):
-                        continue
-                    audio_id: int = audio.get_id()
-                    if audio_id not in audio_sources:
-                        audio_sources[audio_id] = db.HelldiverAudioSource(
-                                audio_id, set([audio_archive_id]), set([audio_archive_name_id]))
-                    else:
-                        audio_sources[audio_id].linked_audio_archive_ids.add(
-                                audio_archive_id)
-                        audio_sources[audio_id].linked_audio_archive_name_ids.add(
-                                audio_archive_name_id)
-    sources = [value for _, value in audio_sources.items()]
-    lookup_store.write_helldiver_audio_source_bulk(sources)
+        tasks.append((archive_file, audio_archive_id, audio_archive_name_id))
+
+    previous_fingerprints: dict[str, db.HelldiverAudioArchiveFingerprint] = {}
+    if not full_rebuild:
+        previous_fingerprints = \
+                lookup_store.query_helldiver_audio_archive_fingerprint()
+    full_rebuild = full_rebuild or len(previous_fingerprints) == 0
+
+    fingerprints: dict[str, db.HelldiverAudioArchiveFingerprint] = {}
+    changed_tasks: list[tuple[str, str, str]] = []
+    for task in tasks:
+        archive_file, audio_archive_id, _ = task
+        previous = previous_fingerprints.get(audio_archive_id)
+        fingerprint = fingerprint_audio_archive(
+            archive_file, audio_archive_id, previous, with_toc_hash)
+        if fingerprint == None:
+            continue
+        if full_rebuild or previous == None or previous.is_changed(fingerprint):
+            fingerprints[audio_archive_id] = fingerprint
+            changed_tasks.append(task)
+
+    removed_audio_archive_ids = [
+        audio_archive_id for audio_archive_id in previous_fingerprints
+        if audio_archive_id not in audio_archive_name_ids or 
+        not os.path.exists(os.path.join(app_state.game_data_path, audio_archive_id))
+    ]
+
+    if not full_rebuild and len(changed_tasks) == 0 and \
+       len(removed_audio_archive_ids) == 0:
+        logger.info("Audio source table is up to date")
+        return
+
+    logger.info(f"Scanning {len(changed_tasks)} of {len(tasks)} audio archives")
+    scanned = scan_audio_archives(changed_tasks, app_state.game_data_path, workers)
+    # failed archives keep no fingerprint so the next run retries them
+    for audio_archive_id in list(fingerprints.keys()):
+        if audio_archive_id not in scanned:
+            fingerprints.pop(audio_archive_id)
+
+    links = [link for results in scanned.values() for link in results]
+    if full_rebuild:
+        lookup_store.write_helldiver_audio_source_bulk(
+            links, list(fingerprints.values()))
+        return
+
+    stale_audio_archive_ids = list(scanned.keys()) + removed_audio_archive_ids
+    logger.info(f"Updating links of {len(stale_audio_archive_ids)} audio "
+                f"archives ({len(links)} audio source links)")
+    lookup_store.update_helldiver_audio_source_links(
+        stale_audio_archive_ids,
+        links,
+        list(fingerprints.values()),
+        removed_audio_archive_ids)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate the audio source table of the lookup database"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of worker processes scanning archives "
+                             "(default: number of CPUs)")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-scan every archive instead of only the ones "
+                             "that changed since the last run")
+    parser.add_argument("--toc-hash", action="store_true",
+                        help="Hash archive TOCs so archives with a new mtime "
+                             "but identical content are not re-scanned")
+    args = parser.parse_args()
+
     app_state: cfg.Config | None = cfg.load_config()
     if app_state == None:
         exit(1)
-    GAME_FILE_LOCATION = app_state.game_data_path
-
-    system = platform.system()
-    if system == "Windows":
-        VGMSTREAM = "vgmstream-win64/vgmstream-cli.exe"
-        FFMPEG = "ffmpeg.exe"
-    elif system == "Linux":
-        VGMSTREAM = "vgmstream-linux/vgmstream-cli"
-        FFMPEG = "ffmpeg"
-    elif system == "Darwin":
-        VGMSTREAM = "vgmstream-macos/vgmstream-cli"
-        FFMPEG = "ffmpeg"
-        
-    if not os.path.exists(VGMSTREAM):
+    core.configure_environment(app_state.game_data_path)
+
+    if not os.path.exists(core.VGMSTREAM):
         logger.error(f"Cannot find vgmstream distribution! Ensure the \
-                {os.path.dirname(VGMSTREAM)} folder is in the same folder \
+                {os.path.dirname(core.VGMSTREAM)} folder is in the same folder \
                 as the executable")
 
     lookup_store: db.LookupStore | None = None
@@ -83,8 +240,8 @@ if __name__ == "__main__":
         try:
             lookup_store = db.SQLiteLookupStore(sqlite_initializer, logger)
         except Exception as err:
-            logger.error("Failed to connect to audio archive database", 
-                         stack_info=True)
+            logger.error("Failed to connect to audio archive database: "
+                         f"{err}", stack_info=True)
             lookup_store = None
             exit(1)
     else:
@@ -92,5 +249,5 @@ if __name__ == "__main__":
                 the executable when generating audio sources table.")
         exit(1)
 
-    file_handler = FileHandler()
-    generate_audio_source_table(app_state, lookup_store, file_handler)
+    generate_audio_source_table(app_state, lookup_store, args.workers,
+                                args.full, args.toc_hash)
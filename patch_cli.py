@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+
+import core
+from log import logger
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Load an audio archive, apply patches, wems and specs, "
+                    "and write the result without the GUI."
+    )
+    parser.add_argument("archive", help="Path to the audio archive to load")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Folder to write the patch (or archive) into")
+    parser.add_argument("--game-data", default="",
+                        help="Game data folder used to resolve dependencies")
+    parser.add_argument("--patch", action="append", default=[],
+                        help="Patch file to apply (repeatable)")
+    parser.add_argument("--wem", action="append", default=[],
+                        help="Wem file to import, named by file id (repeatable)")
+    parser.add_argument("--wem-spec", action="append", default=[],
+                        help="Wem spec file to apply (repeatable)")
+    parser.add_argument("--convert-spec", action="append", default=[],
+                        help="Wav conversion spec file to apply (repeatable)")
+    parser.add_argument("--no-duration", action="store_true",
+                        help="Skip vgmstream duration probing on wem import")
+    parser.add_argument("--save-archive", action="store_true",
+                        help="Write the whole archive instead of a patch")
+    parser.add_argument("--vgmstream", default="",
+                        help="Override the vgmstream-cli executable path")
+    return parser
+
+def run(args: argparse.Namespace) -> int:
+    """
+    @return (int): process exit code
+    """
+    core.configure_environment(args.game_data, args.vgmstream)
+
+    file_handler = core.FileHandler()
+    if not file_handler.load_archive_file(args.archive):
+        logger.error(f"Failed to load archive {args.archive}")
+        return 1
+
+    for patch_file in args.patch:
+        if not file_handler.load_patch(patch_file):
+            logger.error(f"Failed to apply patch {patch_file}")
+            return 1
+
+    if len(args.wem) > 0:
+        file_handler.load_wems(args.wem, set_duration=not args.no_duration)
+
+    for spec_path in args.wem_spec:
+        file_handler.load_wems_spec(spec_path)
+
+    for spec_path in args.convert_spec:
+        file_handler.load_convert_spec(spec_path)
+
+    os.makedirs(args.output, exist_ok=True)
+    if args.save_archive:
+        if not file_handler.save_archive_file(args.output):
+            logger.error(f"Failed to write archive into {args.output}")
+            return 1
+    else:
+        if not file_handler.write_patch(args.output):
+            logger.error(f"Failed to write patch into {args.output}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run(build_parser().parse_args()))
@@ -0,0 +1,31 @@
+"""
+Time the 7.1 stereo downmix of one output callback buffer against the time 
+the callback has to fill it. Not collected by pytest; run it directly:
+
+    python tests/benchmark_downmix.py
+"""
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core
+
+RATE = 48000
+CALLBACK_FRAMES = 1024
+RUNS = 200
+
+if __name__ == "__main__":
+    data = numpy.random.default_rng(0).integers(
+        -32768, 32767, size=(CALLBACK_FRAMES, 8), dtype=numpy.int16).tobytes()
+    core.downmix_to_stereo(data, 2, 8)
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        core.downmix_to_stereo(data, 2, 8)
+    elapsed = (time.perf_counter() - start) / RUNS
+    budget = CALLBACK_FRAMES / RATE
+    print(f"7.1 downmix of {CALLBACK_FRAMES} frames: {elapsed * 1e6:.0f} us "
+          f"({elapsed / budget:.1%} of the {budget * 1e6:.0f} us callback budget)")
@@ -0,0 +1,54 @@
+import io
+import os
+import pickle
+import zlib
+
+import core
+
+from test_stream_patch import ARCHIVE_NAME, SOURCE_ID, build_archive
+
+calls = []
+
+def record(command):
+    calls.append(command)
+
+class Exploit:
+
+    def __reduce__(self):
+        return (record, ("echo pwned",))
+
+def load(path: str) -> core.FileReader:
+    reader = core.FileReader()
+    reader.from_file(path)
+    return reader
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "ARCHIVE_CACHE", str(tmp_path / "cache"))
+    path = str(tmp_path / ARCHIVE_NAME)
+    payload = bytes(range(200))
+    build_archive(path, payload)
+
+    parsed = load(path)
+    cached = core.FileReader()
+    cached.name = os.path.basename(path)
+    assert cached.read_cache(path)
+    assert (cached.toc_index == parsed.toc_index).all()
+    assert cached.toc_index.dtype == core.TOC_HEADER_DTYPE
+    assert sorted(cached.wwise_banks) == sorted(parsed.wwise_banks)
+    assert bytes(cached.audio_sources[SOURCE_ID].get_data()) == payload
+
+def test_cache_only_restores_allowed_classes(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "ARCHIVE_CACHE", str(tmp_path / "cache"))
+    path = str(tmp_path / ARCHIVE_NAME)
+    build_archive(path, bytes(range(200)))
+    load(path)
+
+    # a forged cache with a valid header but a hostile body
+    body = io.BytesIO()
+    pickle.Pickler(body).dump({"wwise_banks": Exploit()})
+    with open(core.FileReader.get_cache_path(path), "wb") as f:
+        core._write_cache_header(f, [core._file_key(path)])
+        f.write(zlib.compress(body.getvalue()))
+    reader = core.FileReader()
+    assert not reader.read_cache(path)
+    assert calls == []
@@ -0,0 +1,82 @@
+import logging
+import sqlite3
+
+import db
+
+logger = logging.getLogger("test_db")
+
+def make_conn(legacy: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE helldiver_audio_archive_name (\
+            audio_archive_name_id TEXT, audio_archive_name TEXT)")
+    conn.execute("CREATE TABLE helldiver_audio_archive (\
+            audio_archive_id TEXT, audio_archive_name_id TEXT, \
+            audio_archive_category TEXT)")
+    conn.executemany("INSERT INTO helldiver_audio_archive_name \
+            VALUES (?, ?)", [("n1", "Name 1"), ("n2", "Name 2")])
+    conn.executemany("INSERT INTO helldiver_audio_archive VALUES (?, ?, ?)",
+                     [("a1", "n1", "c"), ("a2", "n2", "c")])
+    if legacy:
+        conn.execute("CREATE TABLE helldiver_audio_source (\
+                audio_source_id INTEGER, linked_audio_archive_ids TEXT, \
+                linked_audio_archive_name_ids TEXT)")
+        conn.executemany("INSERT INTO helldiver_audio_source \
+                VALUES (?, ?, ?)", [(1, "a1,a2", "n1,n2"), (2, "a3", "")])
+    conn.commit()
+    return conn
+
+def legacy_table_exists(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' \
+            AND name = 'helldiver_audio_source'").fetchone() != None
+
+def test_migration_copies_links_and_drops_legacy_table():
+    conn = make_conn()
+    store = db.SQLiteLookupStore(lambda: conn, logger)
+    assert not legacy_table_exists(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == \
+            db.SQLiteLookupStore.link_table_version
+    archives = store.query_helldiver_audio_archive_by_source(1)
+    assert sorted(a.audio_archive_id for a in archives) == ["a1", "a2"]
+
+def test_migration_runs_once():
+    conn = make_conn()
+    db.SQLiteLookupStore(lambda: conn, logger)
+    # a legacy table showing up after the migration is left alone
+    conn.execute("CREATE TABLE helldiver_audio_source (x TEXT)")
+    conn.commit()
+    db.SQLiteLookupStore(lambda: conn, logger)
+    assert legacy_table_exists(conn)
+
+def test_failed_migration_keeps_legacy_table():
+    conn = make_conn(legacy=False)
+    conn.execute("CREATE TABLE helldiver_audio_source (audio_source_id TEXT)")
+    conn.commit()
+    db.SQLiteLookupStore(lambda: conn, logger)
+    assert legacy_table_exists(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+
+def test_links_without_archive_name_are_kept():
+    conn = make_conn()
+    store = db.SQLiteLookupStore(lambda: conn, logger)
+    archives = store.query_helldiver_audio_archive_by_source(2)
+    assert [(a.audio_archive_id, a.audio_archive_name) for a in archives] == \
+            [("a3", "")]
+    by_sources = store.query_helldiver_audio_archive_by_sources([1, 2])
+    assert len(by_sources[1]) == 2
+    assert [a.audio_archive_id for a in by_sources[2]] == ["a3"]
+
+def test_search_index_follows_catalogue_changes():
+    conn = make_conn()
+    store = db.SQLiteLookupStore(lambda: conn, logger)
+    assert [a.audio_archive_id for a in
+            store.query_helldiver_audio_archive_search("Name 1")] == ["a1"]
+    # a rename keeps the row count, so only the checksum notices it
+    conn.execute("UPDATE helldiver_audio_archive_name \
+            SET audio_archive_name = 'Renamed' \
+            WHERE audio_archive_name_id = 'n1'")
+    conn.commit()
+    store = db.SQLiteLookupStore(lambda: conn, logger)
+    assert store.query_helldiver_audio_archive_search("Name 1") == []
+    assert [a.audio_archive_name for a in
+            store.query_helldiver_audio_archive_search("Renamed")] == \
+            ["Renamed"]
@@ -0,0 +1,87 @@
+import numpy
+import pytest
+
+import core
+
+RATE = 48000
+CALLBACK_FRAMES = 1024
+
+def legacy_downmix(arr):
+    """
+    Frozen per-frame formulas of the original 4 and 6 channel downmix.
+    """
+    out = []
+    for frame in arr.astype(numpy.float64):
+        if len(frame) == 4:
+            out.append((0.42265 * frame[0] + 0.366025 * frame[2] + 0.211325 * frame[3],
+                        0.42265 * frame[1] + 0.366025 * frame[3] + 0.211325 * frame[2]))
+        else:
+            out.append((0.374107*frame[1] + 0.529067*frame[0] + 0.458186*frame[3] + 0.264534*frame[4] + 0.374107*frame[5],
+                        0.374107*frame[1] + 0.529067*frame[2] + 0.458186*frame[4] + 0.264534*frame[3] + 0.374107*frame[5]))
+    return numpy.array(out)
+
+@pytest.mark.parametrize("channels", [4, 6])
+def test_matches_legacy_coefficients(channels):
+    arr = numpy.random.default_rng(channels).integers(-8000, 8000, size=(256, channels), dtype=numpy.int16)
+    stereo = core.downmix_to_stereo(arr.tobytes(), 2, channels) * 32768
+    assert numpy.abs(stereo - legacy_downmix(arr)).max() < 0.05
+
+@pytest.mark.parametrize("channels", [3, 4, 6, 8])
+def test_layouts_are_symmetric(channels):
+    matrix = core.get_downmix_matrix(channels)
+    assert matrix.shape == (channels, 2)
+    assert numpy.isclose(matrix[:, 0].sum(), matrix[:, 1].sum())
+
+def test_mono_and_unknown_layouts():
+    mono = numpy.array([100, -200], dtype=numpy.int16)
+    assert numpy.array_equal(core.downmix_to_stereo(mono.tobytes(), 2, 1) * 32768, 
+                             [[100, 100], [-200, -200]])
+    five = numpy.arange(10, dtype=numpy.int16).reshape(2, 5)
+    assert numpy.array_equal(core.downmix_to_stereo(five.tobytes(), 2, 5) * 32768, 
+                             [[0, 1], [5, 6]])
+
+@pytest.mark.parametrize("sample_width, data, expected", [
+    (1, bytes([0, 128, 255]), [-1.0, 0.0, 127 / 128]),
+    (2, numpy.array([-32768, 0, 32767], dtype=numpy.int16).tobytes(), [-1.0, 0.0, 32767 / 32768]),
+    (4, numpy.array([-2**31, 0, 2**31 - 1], dtype=numpy.int32).tobytes(), [-1.0, 0.0, 1.0]),
+])
+def test_pcm_to_float(sample_width, data, expected):
+    assert numpy.allclose(core.pcm_to_float(data, sample_width, 1)[:, 0], expected)
+
+class ConstantVoice:
+    """
+    Stand-in voice rendering one constant stereo frame.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.finished = False
+        self.on_finish = None
+
+    def render(self, frame_count):
+        return numpy.tile(numpy.asarray(self.frame, dtype=numpy.float32), 
+                          (frame_count, 1))
+
+def test_mixer_saturates_full_scale_7_1():
+    arr = numpy.full((CALLBACK_FRAMES, 8), 32767, dtype=numpy.int16)
+    stereo = core.downmix_to_stereo(arr.tobytes(), 2, 8)
+    assert stereo.max() > 1.0
+    mixer = core.Mixer(RATE)
+    mixer.add_all([ConstantVoice(stereo[0]), ConstantVoice((-0.25, -4.0))])
+    out = numpy.frombuffer(mixer.mix(CALLBACK_FRAMES), dtype=numpy.float32)
+    out = out.reshape((CALLBACK_FRAMES, 2))
+    # left sums to above full scale and saturates, right saturates negative
+    assert numpy.array_equal(out[:, 0], numpy.ones(CALLBACK_FRAMES))
+    assert numpy.array_equal(out[:, 1], -numpy.ones(CALLBACK_FRAMES))
+
+def test_mixer_keeps_headroom_and_drops_finished_voices():
+    mixer = core.Mixer(RATE)
+    voice = ConstantVoice((0.25, -0.5))
+    finished = []
+    voice.on_finish = finished.append
+    mixer.add_all([voice, ConstantVoice((0.25, 0.25))])
+    out = numpy.frombuffer(mixer.mix(4), dtype=numpy.float32).reshape((4, 2))
+    assert numpy.array_equal(out, numpy.tile([0.5, -0.25], (4, 1)))
+    voice.finished = True
+    mixer.mix(4)
+    assert finished == [voice] and voice not in mixer.voices
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+import core
+
+def make_bank(entries: list[tuple[int, int, int]], data_size: int):
+    didx = b"".join(core.DIDX_ENTRY_STRUCT.pack(*entry) for entry in entries)
+    data = bytes(random.randrange(256) for _ in range(data_size))
+    return didx, data
+
+def test_later_bank_overrides_and_order_is_kept():
+    random.seed(7)
+    media_index = core.MediaIndex()
+    expected: dict[int, tuple[bytes, int, int]] = {}
+    for _ in range(20):
+        entries = [(random.randrange(64), random.randrange(100),
+                    random.randrange(40)) for _ in range(10)]
+        didx, data = make_bank(entries, 120)
+        media_index.load(didx, data)
+        for source_id, offset, size in entries:
+            expected[source_id] = (data, offset, size)
+
+    for source_id, (data, offset, size) in expected.items():
+        assert source_id in media_index
+        chunk, ref_offset, ref_size = media_index.get_data_ref(source_id)
+        assert chunk is data and (ref_offset, ref_size) == (offset, size)
+        assert media_index.get_media(source_id) == data[offset:offset + size]
+
+    table = b"".join(core.DIDX_ENTRY_STRUCT.pack(source_id, offset, size)
+                     for source_id, (_, offset, size) in expected.items())
+    media = b"".join(data[offset:offset + size]
+                     for data, offset, size in expected.values())
+    assert media_index.get_data() == table + media
+
+def test_missing_id_and_late_load():
+    media_index = core.MediaIndex()
+    assert 1 not in media_index
+    with pytest.raises(KeyError):
+        media_index.get_data_ref(1)
+    media_index.load(*make_bank([(1, 0, 4)], 8))
+    assert 1 in media_index and -1 not in media_index
+    assert 2 ** 32 not in media_index
+    media_index.load(*make_bank([(1, 4, 4)], 8))
+    assert media_index.get_data_ref(1)[1] == 4
+
+def test_size_is_clamped_to_data_chunk():
+    media_index = core.MediaIndex()
+    didx, data = make_bank([(1, 6, 10), (2, 12, 4)], 8)
+    media_index.load(didx, data)
+    assert media_index.get_data_ref(1)[2] == 2
+    assert media_index.get_data_ref(2)[2] == 0
@@ -0,0 +1,101 @@
+import pytest
+
+import core
+
+def bytes_to_long(bytes):
+    assert len(bytes) == 8
+    return sum((b << (k * 8) for k, b in enumerate(bytes)))
+
+def baseline_murmur64_hash(data, seed = 0):
+    """
+    Frozen copy of the original per-byte implementation.
+    """
+    m = 0xc6a4a7935bd1e995
+    r = 47
+
+    MASK = 2 ** 64 - 1
+
+    data_as_bytes = bytearray(data)
+
+    h = seed ^ ((m * len(data_as_bytes)) & MASK)
+
+    off = int(len(data_as_bytes)/8)*8
+    for ll in range(0, off, 8):
+        k = bytes_to_long(data_as_bytes[ll:ll + 8])
+        k = (k * m) & MASK
+        k = k ^ ((k >> r) & MASK)
+        k = (k * m) & MASK
+        h = (h ^ k)
+        h = (h * m) & MASK
+
+    l = len(data_as_bytes) & 7
+
+    if l >= 7:
+        h = (h ^ (data_as_bytes[off+6] << 48))
+
+    if l >= 6:
+        h = (h ^ (data_as_bytes[off+5] << 40))
+
+    if l >= 5:
+        h = (h ^ (data_as_bytes[off+4] << 32))
+
+    if l >= 4:
+        h = (h ^ (data_as_bytes[off+3] << 24))
+
+    if l >= 3:
+        h = (h ^ (data_as_bytes[off+2] << 16))
+
+    if l >= 2:
+        h = (h ^ (data_as_bytes[off+1] << 8))
+
+    if l >= 1:
+        h = (h ^ data_as_bytes[off])
+        h = (h * m) & MASK
+
+    h = h ^ ((h >> r) & MASK)
+    h = (h * m) & MASK
+    h = h ^ ((h >> r) & MASK)
+
+    return h
+
+SEEDS = [0, 1, 0xfedcba9876543210]
+
+# every tail length 0-7 over zero, one and several 8 byte blocks, plus
+# high bytes to catch sign or carry mistakes
+KEYS = [bytes(range(1, n + 1)) for n in range(0, 25)] + [
+    b"\xff" * n for n in range(0, 17)
+] + [
+    b"content/audio/sfx/1234567",
+    "content/audio/mus/é".encode("utf-8"),
+]
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("key", KEYS)
+def test_scalar_matches_baseline(key, seed):
+    assert core.murmur64_hash(key, seed) == baseline_murmur64_hash(key, seed)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_matches_baseline(seed):
+    assert core.murmur64_hash_batch(KEYS, seed) == [baseline_murmur64_hash(key, seed) for key in KEYS]
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_accepts_memoryview_and_bytearray(seed):
+    keys = [memoryview(b"abcdefghij"), bytearray(b"abc")]
+    assert core.murmur64_hash_batch(keys, seed) == [baseline_murmur64_hash(bytes(key), seed) for key in keys]
+
+def test_batch_empty():
+    assert core.murmur64_hash_batch([]) == []
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_duplicates(seed):
+    keys = [b"dup", b"other key", b"dup", b"", b"", b"dup"]
+    hashes = core.murmur64_hash_batch(keys, seed)
+    assert hashes == [baseline_murmur64_hash(key, seed) for key in keys]
+    assert hashes[0] == hashes[2] == hashes[5]
+
+def test_stream_resource_ids_memo():
+    memo = {}
+    ids = core.get_stream_resource_ids("content/audio/sfx.bnk", [1, 2, 1], memo)
+    assert ids == [baseline_murmur64_hash(f"content/audio/{i}".encode()) for i in (1, 2, 1)]
+    assert memo == {("content/audio", 1): ids[0], ("content/audio", 2): ids[1]}
+    assert core.get_stream_resource_id("content/audio/sfx.bnk", 2) == ids[1]
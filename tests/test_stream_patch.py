@@ -0,0 +1,112 @@
+import os
+import struct
+
+import core
+
+BANK_ID = 0x1111000
+DEP_NAME = "content/audio/sfx.bnk"
+SOURCE_ID = 1001
+PREFETCH_SIZE = 32
+ARCHIVE_NAME = "9ba626afa44a3aa3"
+
+def chunk(tag: str, data: bytes) -> bytes:
+    return tag.encode() + struct.pack("<I", len(data)) + data
+
+def align(offset: int) -> int:
+    return (offset + 15) // 16 * 16
+
+def build_archive(path: str, payload: bytes):
+    """
+    Write an archive holding one bank with a single prefetch stream source,
+    its stream and the bank dep.
+    """
+    source = core.BANK_SOURCE_STRUCT.pack(core.VORBIS, core.PREFETCH_STREAM,
+                                          SOURCE_ID, PREFETCH_SIZE, 0)
+    sound = struct.pack("<I", 50000) + source + b"\x07" * 10
+    hirc = struct.pack("<I", 1) + struct.pack("<BI", 2, len(sound)) + sound
+    didx = core.DIDX_ENTRY_STRUCT.pack(SOURCE_ID, 0, PREFETCH_SIZE)
+    bank = chunk("BKHD", b"\x11" * 20) + chunk("DIDX", didx) \
+         + chunk("DATA", payload[:PREFETCH_SIZE]) + chunk("HIRC", hirc)
+    bank_blob = bytearray(16) + bank
+    bank_blob[4:8] = struct.pack("<I", len(bank))
+    dep = DEP_NAME.encode() + b"\x00"
+    dep_blob = struct.pack("<II", 0xAB, len(dep)) + dep
+    stream_toc = b"\x00" * 8 + struct.pack("<I", len(payload)) + b"\x00" * 4
+    resource_id = core.murmur64_hash(
+        (os.path.dirname(DEP_NAME) + "/" + str(SOURCE_ID)).encode())
+
+    types = [core.WWISE_STREAM, core.WWISE_BANK, core.WWISE_DEP]
+    blobs = [(resource_id, core.WWISE_STREAM, stream_toc, len(payload)),
+             (BANK_ID, core.WWISE_BANK, bytes(bank_blob), 0),
+             (BANK_ID, core.WWISE_DEP, dep_blob, 0)]
+    offset = align(80 + 32 * len(types) + 80 * len(blobs))
+    headers = b""
+    data = b""
+    for index, (file_id, type_id, blob, stream_size) in enumerate(blobs):
+        headers += struct.pack("<QQQQQQQIIIIII", file_id, type_id,
+                               offset + len(data), 0, 0, 0, 0, len(blob),
+                               stream_size, 0, 0, 0, index)
+        data += blob + b"\x00" * (align(len(blob)) - len(blob))
+    toc = struct.pack("<IIII", 4026531857, len(types), len(blobs), 0) \
+        + b"\x00" * 56
+    for type_id in types:
+        toc += struct.pack("<QQQII", 0, type_id, 1, 16, 64)
+    toc += headers
+    toc += b"\x00" * (offset - len(toc)) + data
+    with open(path, "wb") as f:
+        f.write(toc)
+    with open(path + ".stream", "wb") as f:
+        f.write(payload)
+
+def prefetch_data(bank: core.WwiseBank) -> bytes:
+    parser = core.BankParser()
+    parser.load(bank.get_data())
+    return bytes(parser.chunks["DATA"])
+
+def test_stream_only_patch_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(core.FileReader, "use_archive_cache", False)
+    game = tmp_path / "game"
+    game.mkdir()
+    monkeypatch.setattr(core, "GAME_FILE_LOCATION", str(game))
+    build_archive(str(game / ARCHIVE_NAME), bytes(range(200)))
+
+    file_handler = core.FileHandler()
+    assert file_handler.load_archive_file(str(game / ARCHIVE_NAME))
+    base = file_handler.file_reader
+    patched_payload = b"PATCHED!" * 25
+    base.audio_sources[SOURCE_ID].set_data(patched_payload)
+
+    # a patch holding only the modified stream, like older patches did
+    patch = core.FileReader()
+    patch.name = base.name + ".patch_0"
+    patch.magic, patch.unknown, patch.unk4Data = \
+        base.magic, base.unknown, base.unk4Data
+    patch.audio_sources = base.audio_sources
+    patch.wwise_streams = {key: stream for key, stream
+                           in base.wwise_streams.items()
+                           if stream.content.modified}
+    patch.rebuild_headers()
+    stream_only = tmp_path / "stream_only"
+    stream_only.mkdir()
+    patch.to_file(str(stream_only))
+
+    # the banks come from the base game through load_banks
+    file_handler = core.FileHandler()
+    assert file_handler.load_archive_file(
+        str(stream_only / (ARCHIVE_NAME + ".patch_0")))
+    reader = file_handler.file_reader
+    assert list(reader.wwise_banks) == [BANK_ID]
+    reader.rebuild_headers()
+    bank = reader.wwise_banks[BANK_ID]
+    assert prefetch_data(bank) == patched_payload[:PREFETCH_SIZE]
+
+    saved = tmp_path / "saved"
+    saved.mkdir()
+    reader.to_file(str(saved))
+    file_handler = core.FileHandler()
+    assert file_handler.load_archive_file(
+        str(saved / (ARCHIVE_NAME + ".patch_0")))
+    reader = file_handler.file_reader
+    assert bytes(reader.audio_sources[SOURCE_ID].get_data()) == patched_payload
+    assert prefetch_data(reader.wwise_banks[BANK_ID]) == \
+        patched_payload[:PREFETCH_SIZE]